@@ -0,0 +1,153 @@
+"""
+Answer Cache - Tam Eşleşme ve Anlamsal Cevap Önbelleği
+Aynı veya çok benzer sorular LLM'e tekrar gönderilmez
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS,
+                    ANSWER_CACHE_SIMILARITY_THRESHOLD)
+
+logger = logging.getLogger(__name__)
+
+# numbers and dates in a question ("3", "2024-03-01", "15.03.2024")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,:/-]\d+)*")
+
+
+# Normalize a question for exact-match lookups (Turkish-aware lowercase)
+def normalize_question(question: str) -> str:
+    text = question.replace("İ", "i").replace("I", "ı").lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!. ")
+
+
+# Get what a semantic hit must share with the cached question: the named symbols and every number/date
+def question_terms(question: str, symbols: List[str]) -> Tuple:
+    return tuple(sorted(symbols)), tuple(NUMBER_PATTERN.findall(normalize_question(question)))
+
+
+class AnswerCache:
+    """İki katmanlı (tam eşleşme + embedding benzerliği) LRU cevap önbelleği"""
+
+    # Initialize cache with size, TTL and similarity bounds
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY_THRESHOLD):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_keys: List[str] = []
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "invalidations": 0}
+
+    # Check whether an entry is still valid: every shard it read still serves the same generation (lock must be held)
+    def _is_valid(self, entry: Dict, versions: Dict[str, int]) -> bool:
+        if time.monotonic() - entry["created_at"] > self.ttl_seconds:
+            return False
+        return all(versions.get(name) == version for name, version in entry["versions"].items())
+
+    # Drop an entry (lock must be held)
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._matrix = None
+
+    # Look up an answer by normalized question text
+    def get_exact(self, question: str, versions: Dict[str, int]) -> Optional[Dict]:
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if not self._is_valid(entry, versions):
+                self._drop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            return dict(entry["result"])
+
+    # Look up an answer whose question embedding is similar enough and whose terms match exactly
+    # (template questions differing only by ticker or date embed almost identically)
+    def get_semantic(self, embedding: List[float], versions: Dict[str, int], terms: Tuple) -> Optional[Dict]:
+        with self._lock:
+            if not self._entries:
+                self.stats["misses"] += 1
+                return None
+
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries)
+                self._matrix = np.vstack([self._entries[key]["embedding"] for key in self._matrix_keys])
+
+            query = np.array(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1.0
+            scores = self._matrix @ query
+
+            # best valid match above the threshold
+            for position in np.argsort(-scores):
+                if scores[position] < self.similarity_threshold:
+                    break
+                key = self._matrix_keys[position]
+                entry = self._entries.get(key)
+                if entry is not None and entry["terms"] == terms and self._is_valid(entry, versions):
+                    self._entries.move_to_end(key)
+                    self.stats["semantic_hits"] += 1
+                    return dict(entry["result"])
+
+            self.stats["misses"] += 1
+            return None
+
+    # Store an answer computed against the given shard generations (only the shards it read)
+    def put(self, question: str, embedding: List[float], result: Dict, versions: Dict[str, int],
+            terms: Tuple) -> None:
+        vector = np.array(embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        key = normalize_question(question)
+
+        with self._lock:
+            self._entries[key] = {
+                "result": dict(result),
+                "embedding": vector,
+                "versions": dict(versions),
+                "terms": terms,
+                "created_at": time.monotonic()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    # Drop entries that read any of the given shards (None drops every entry)
+    def invalidate(self, shards: Optional[List[str]] = None) -> None:
+        with self._lock:
+            if shards is None:
+                stale = list(self._entries)
+            else:
+                changed = set(shards)
+                stale = [key for key, entry in self._entries.items() if changed & entry["versions"].keys()]
+            if stale:
+                logger.info(f"Cevap cache temizlendi ({len(stale)} kayıt)")
+            for key in stale:
+                del self._entries[key]
+            self._matrix = None
+            self.stats["invalidations"] += 1
+
+    # Get hit/miss counters and current size
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["exact_hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+            hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
@@ -1,10 +1,18 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import json
 import logging
+import threading
 from datetime import datetime
 import os
-from finance_rag_service import FinanceRAGService
-from config import validate_config
+from typing import TYPE_CHECKING
+from initialization_job import InitializationJob, InitializationProgress
+from config import validate_config, BACKGROUND_REFRESH_ENABLED
+from instrumentation import timed, REGISTRY, DOCUMENTS
+
+# the RAG stack (langchain, FAISS, pandas, ...) is imported when the service is built
+if TYPE_CHECKING:
+    from finance_rag_service import FinanceRAGService
 
 app = Flask(__name__)
 CORS(app)
@@ -15,31 +23,62 @@ logger = logging.getLogger(__name__)
 class FinanceWebApp:
     
     # Initialize FinanceWebApp with default state
-    def __init__(self):
+    def __init__(self, background_refresh: bool = BACKGROUND_REFRESH_ENABLED):
         self.rag_service = None
+        self.background_refresh = background_refresh
         self.is_initialized = False
+        self.init_job = None
+        self._init_lock = threading.Lock()
         
     # Initialize RAG service with configuration validation
     def initialize_rag_service(self):
-        try:
-            validate_config()
-            self.rag_service = FinanceRAGService()
+        job = self.start_initialization()
+        job.wait()
+        return job.state == InitializationJob.SUCCEEDED
+    
+    # Start initialization in the background; concurrent calls share one job
+    def start_initialization(self) -> InitializationJob:
+        with self._init_lock:
+            if self.init_job and self.init_job.state != InitializationJob.FAILED:
+                return self.init_job
+            
+            self.init_job = InitializationJob(self._build_rag_service,
+                                              is_success=lambda service: service.is_ready,
+                                              error_of=lambda service: service.init_error).start()
+            return self.init_job
+    
+    # Build the RAG service inside the initialization job
+    def _build_rag_service(self, progress: InitializationProgress) -> "FinanceRAGService":
+        from finance_rag_service import FinanceRAGService
+        
+        validate_config()
+        service = FinanceRAGService(progress=progress, background_refresh=self.background_refresh)
+        
+        if service.is_ready:
+            self.rag_service = service
             self.is_initialized = True
             logger.info("RAG servisi başarıyla başlatıldı!")
-            return True
-        except Exception as e:
-            logger.error(f"RAG servisi başlatılamadı: {str(e)}")
-            return False
+        else:
+            logger.error(f"RAG servisi başlatılamadı: {service.init_error}")
+        return service
     
     # Get current system status and initialization state
     def get_status(self):
         if self.rag_service and self.rag_service.is_ready:
             self.is_initialized = True
         
+        if self.is_initialized:
+            message = "RAG servisi hazır"
+        elif self.init_job and self.init_job.state == InitializationJob.FAILED:
+            message = f"RAG servisi başlatılamadı: {self.init_job.error}"
+        else:
+            message = "RAG servisi başlatılıyor..."
+        
         return {
             "initialized": self.is_initialized,
             "timestamp": datetime.now().isoformat(),
-            "message": "RAG servisi hazır" if self.is_initialized else "RAG servisi başlatılıyor..."
+            "message": message,
+            "initialization": self.init_job.snapshot() if self.init_job else None
         }
 
 # Global uygulama instance'ı
@@ -55,7 +94,7 @@ def index():
 def api_status():
     return jsonify(web_app.get_status())
 
-# Initialize RAG service with data loading
+# Start RAG service initialization in the background
 @app.route('/api/initialize', methods=['POST'])
 def api_initialize():
     try:
@@ -66,21 +105,14 @@ def api_initialize():
                 "status": web_app.get_status()
             })
         
-        web_app.rag_service = FinanceRAGService()
+        # progress is reported through /api/status
+        web_app.start_initialization()
         
-        if web_app.rag_service.is_ready:
-            web_app.is_initialized = True
-            return jsonify({
-                "success": True,
-                "message": "RAG servisi başarıyla başlatıldı!",
-                "status": web_app.get_status()
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "message": "RAG servisi başlatılamadı. Lütfen API anahtarlarını kontrol edin.",
-                "status": web_app.get_status()
-            }), 500
+        return jsonify({
+            "success": True,
+            "message": "RAG servisi arka planda başlatılıyor...",
+            "status": web_app.get_status()
+        }), 202
     except Exception as e:
         logger.error(f"Başlatma hatası: {str(e)}")
         return jsonify({
@@ -111,21 +143,106 @@ def api_ask():
         # send question to RAG service
         result = web_app.rag_service.ask_question(question)
         
+        with timed("serialization"):
+            return jsonify({
+                "success": True,
+                "question": result["question"],
+                "answer": result["answer"],
+                "sources": result["sources"],
+                "context_tokens": result.get("context_tokens"),
+                "timestamp": datetime.now().isoformat()
+            })
+        
+    except Exception as e:
+        logger.error(f"Soru cevaplama hatası: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": f"Soru cevaplanırken hata oluştu: {str(e)}"
+        }), 500
+
+# Answer a batch of questions in one request
+@app.route('/api/ask/batch', methods=['POST'])
+def api_ask_batch():
+    try:
+        if not web_app.is_initialized:
+            return jsonify({
+                "success": False,
+                "message": "RAG servisi henüz başlatılmadı. Lütfen önce 'Başlat' butonuna tıklayın."
+            }), 400
+        
+        data = request.get_json()
+        questions = data.get('questions')
+        
+        if not isinstance(questions, list) or not questions:
+            return jsonify({
+                "success": False,
+                "message": "Lütfen 'questions' alanında bir soru listesi gönderin."
+            }), 400
+        
+        results = web_app.rag_service.ask_batch(questions)
+        
         return jsonify({
             "success": True,
-            "question": result["question"],
-            "answer": result["answer"],
-            "sources": result["sources"],
+            "results": results,
             "timestamp": datetime.now().isoformat()
         })
-        
+    
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
     except Exception as e:
-        logger.error(f"Soru cevaplama hatası: {str(e)}")
+        logger.error(f"Toplu soru cevaplama hatası: {str(e)}")
         return jsonify({
             "success": False,
-            "message": f"Soru cevaplanırken hata oluştu: {str(e)}"
+            "message": f"Sorular cevaplanırken hata oluştu: {str(e)}"
         }), 500
 
+# Format one Server-Sent Events message
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+# Stream sources and answer tokens as Server-Sent Events
+@app.route('/api/ask/stream', methods=['POST'])
+def api_ask_stream():
+    if not web_app.is_initialized:
+        return jsonify({
+            "success": False,
+            "message": "RAG servisi henüz başlatılmadı. Lütfen önce 'Başlat' butonuna tıklayın."
+        }), 400
+    
+    data = request.get_json()
+    question = data.get('question', '').strip()
+    
+    if not question:
+        return jsonify({
+            "success": False,
+            "message": "Lütfen bir soru girin."
+        }), 400
+    
+    def generate():
+        try:
+            for event in web_app.rag_service.stream_question(question):
+                yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            logger.error(f"Soru stream hatası: {str(e)}")
+            yield sse_event("error", {"message": f"Soru cevaplanırken hata oluştu: {str(e)}"})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Expose per-stage latencies, cache hit rates and token usage in Prometheus text format
+@app.route('/api/metrics')
+def api_metrics():
+    if web_app.rag_service and web_app.rag_service.rag_system:
+        for name, stats in web_app.rag_service.rag_system.get_shard_stats().items():
+            DOCUMENTS.set(stats["documents"], shard=name)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
 # Get predefined sample questions for user guidance
 @app.route('/api/sample-questions')
 def api_sample_questions():
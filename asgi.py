@@ -0,0 +1,146 @@
+"""
+ASGI Entry Point - /api/ask İçin Asenkron Servis Yolu
+Sorular event loop üzerinde beklenir (istek başına thread yok); diğer uç noktalar Flask'a devredilir
+
+Kullanım:
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app, web_app
+from config import ASYNC_MAX_IN_FLIGHT
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+flask_application = WsgiToAsgi(app)
+
+
+class ConcurrencyLimiter:
+    """Eşzamanlı istek sınırı; dolu olduğunda bekletmeden reddeder"""
+
+    # Initialize with the maximum number of in-flight requests
+    def __init__(self, limit: int = ASYNC_MAX_IN_FLIGHT):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.rejected = 0
+
+    # Take a slot if one is free (single event loop, so no lock is needed)
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    # Give a slot back
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+limiter = ConcurrencyLimiter()
+
+
+# Read the full request body
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+# Send a JSON response
+async def send_json(send, status: int, payload: Dict, headers: List[Tuple[bytes, bytes]] = ()) -> None:
+    with timed("serialization"):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"access-control-allow-origin", b"*"),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# Handle question asking on the event loop
+async def api_ask(receive, send) -> None:
+    # backpressure: reject instead of queueing once the limit is reached
+    if not limiter.try_acquire():
+        await send_json(send, 429, {
+            "success": False,
+            "message": "Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin."
+        }, headers=[(b"retry-after", b"1")])
+        return
+
+    try:
+        if not web_app.is_initialized:
+            await send_json(send, 400, {
+                "success": False,
+                "message": "RAG servisi henüz başlatılmadı. Lütfen önce 'Başlat' butonuna tıklayın."
+            })
+            return
+
+        try:
+            data = json.loads(await read_body(receive) or b"{}")
+        except ValueError:
+            data = {}
+        question = str(data.get('question', '')).strip()
+
+        if not question:
+            await send_json(send, 400, {
+                "success": False,
+                "message": "Lütfen bir soru girin."
+            })
+            return
+
+        result = await web_app.rag_service.aask_question(question)
+
+        await send_json(send, 200, {
+            "success": True,
+            "question": result["question"],
+            "answer": result["answer"],
+            "sources": result["sources"],
+            "context_tokens": result.get("context_tokens"),
+            "timestamp": datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Soru cevaplama hatası: {str(e)}")
+        await send_json(send, 500, {
+            "success": False,
+            "message": f"Soru cevaplanırken hata oluştu: {str(e)}"
+        })
+    finally:
+        limiter.release()
+
+
+# Acknowledge server startup and shutdown
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+# ASGI entry point: POST /api/ask is served natively, everything else by the Flask app
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+    elif scope["type"] == "http" and scope["path"] == "/api/ask" and scope["method"] == "POST":
+        await api_ask(receive, send)
+    else:
+        await flask_application(scope, receive, send)
@@ -0,0 +1,181 @@
+"""
+Background Refresher - Arka Planda Periyodik Veri Yenileme
+Her iş kendi aralığında çalışır, canlı index'i atomik olarak günceller
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # no file locks (Windows): single-process development server only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """Periyodik yenileme işlerini zamanlayan sınıf; her iş kendi thread'inde, birbirini beklemeden çalışır"""
+
+    # Initialize refresher with no jobs
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    # Register a job that runs every `interval` seconds
+    def add_job(self, name: str, interval: float, fn: Callable[[], bool]) -> None:
+        if interval <= 0:
+            logger.info(f"'{name}' yenileme işi devre dışı (interval={interval})")
+            return
+
+        with self._lock:
+            self._jobs[name] = {
+                "interval": interval,
+                "fn": fn,
+                "next_run": time.monotonic() + interval,
+                "last_run": None,
+                "last_duration_sec": None,
+                "last_success": None,
+                "last_error": None,
+                "runs": 0,
+                "skipped": 0,
+                "running": False
+            }
+
+    # Start the scheduler thread and one worker thread per job
+    def start(self) -> None:
+        if self.is_running():
+            return
+
+        self._stop_event.clear()
+        # a slow job (e.g. a stock refetch) must not delay the others (e.g. the index reload)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self._jobs)), thread_name_prefix="refresh")
+        self._thread = threading.Thread(target=self._run, name="background-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Arka plan yenileyici başlatıldı: {list(self._jobs)}")
+
+    # Stop the scheduler thread; without a timeout, also wait for the running jobs to finish
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=timeout is None)
+        self._executor = None
+
+    # Check whether the refresher thread is alive
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # Hand due jobs to the worker threads until stopped
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            with self._lock:
+                if not self._jobs:
+                    return
+                now = time.monotonic()
+                due = [name for name, job in self._jobs.items() if job["next_run"] <= now]
+                for name in due:
+                    self._jobs[name]["next_run"] = now + self._jobs[name]["interval"]
+                wait = min(job["next_run"] for job in self._jobs.values()) - now
+
+            for name in due:
+                if self._stop_event.is_set():
+                    return
+                self._executor.submit(self.run_job, name)
+
+            self._stop_event.wait(max(0.0, wait))
+
+    # Run one job now, unless its previous run is still going (then it is skipped and returns False)
+    def run_job(self, name: str) -> bool:
+        job = self._jobs[name]
+        with self._lock:
+            if job["running"]:
+                job["skipped"] += 1
+                logger.warning(f"'{name}' önceki çalışması sürdüğü için atlandı")
+                return False
+            job["running"] = True
+
+        start = time.monotonic()
+        logger.info(f"'{name}' arka planda yenileniyor...")
+
+        try:
+            success = bool(job["fn"]())
+            error = None
+        except Exception as e:
+            success = False
+            error = str(e)
+            logger.error(f"'{name}' yenileme hatası: {error}")
+
+        with self._lock:
+            job["last_run"] = datetime.now()
+            job["last_duration_sec"] = round(time.monotonic() - start, 3)
+            job["last_success"] = success
+            job["last_error"] = error
+            job["runs"] += 1
+            job["running"] = False
+
+        logger.info(f"'{name}' yenilemesi {job['last_duration_sec']} sn sürdü (başarılı: {success})")
+        return success
+
+    # Get per-job refresh status
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "running": self.is_running(),
+                "jobs": {
+                    name: {
+                        "interval": job["interval"],
+                        "runs": job["runs"],
+                        "skipped": job["skipped"],
+                        "running": job["running"],
+                        "last_run": job["last_run"].isoformat() if job["last_run"] else None,
+                        "last_duration_sec": job["last_duration_sec"],
+                        "last_success": job["last_success"],
+                        "last_error": job["last_error"]
+                    }
+                    for name, job in self._jobs.items()
+                }
+            }
+
+
+class LeaderLock:
+    """Çok süreçli sunucuda veri yenilemeyi tek bir sürece veren dosya kilidi"""
+
+    # Initialize lock on the given file path
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    # Try to become (or stay) the leader without blocking; the lock is released when the process exits
+    def acquire(self) -> bool:
+        if self._file is not None or fcntl is None:
+            return True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._file = lock_file
+        logger.info(f"Veri yenileme liderliği alındı (pid={os.getpid()})")
+        return True
+
+    # Check whether this process holds the lock
+    def is_leader(self) -> bool:
+        return self._file is not None
@@ -0,0 +1,110 @@
+"""
+FAISS Index Benchmark - Index Tiplerinin Recall/Gecikme/Bellek Karşılaştırması
+Sentetik kümelenmiş vektörler üzerinde flat index'e göre recall@k, p50/p99 arama süresi ve bellek
+
+Kullanım:
+    python benchmarks/faiss_index_benchmark.py --sizes 10000 100000 --dim 384
+    python benchmarks/faiss_index_benchmark.py --sizes 1000000 --types flat ivf ivf+pq --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import build_index, configure_index  # noqa: E402
+
+# "type" or "type+pq"
+DEFAULT_TYPES = ["flat", "ivf", "hnsw", "ivf+pq", "hnsw+pq"]
+
+
+# Generate a clustered synthetic corpus and queries near corpus points
+def synthetic_corpus(n: int, dim: int, n_queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 1000), dim), dtype=np.float32)
+    corpus = centers[rng.integers(len(centers), size=n)]
+    corpus += 0.3 * rng.standard_normal((n, dim), dtype=np.float32)
+    queries = corpus[rng.integers(n, size=n_queries)] + 0.1 * rng.standard_normal((n_queries, dim), dtype=np.float32)
+    return corpus, queries
+
+
+# Fraction of the exact top-k neighbours found by the approximate search
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f[f != -1])) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+# Benchmark one index configuration
+def run_case(corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, spec: str, k: int,
+             pq_m: int, nprobe: int, ef_search: int) -> Dict:
+    index_type, _, pq = spec.partition("+")
+    start = time.perf_counter()
+    index = build_index(corpus, index_type, pq_m=pq_m if pq else 0, min_vectors=0)
+    build_sec = time.perf_counter() - start
+    configure_index(index, nprobe=nprobe, ef_search=ef_search)
+
+    # single-query searches, like the web API
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[i] = ids[0]
+
+    return {
+        "index": spec,
+        "n": len(corpus),
+        "dim": corpus.shape[1],
+        "build_sec": round(build_sec, 3),
+        f"recall@{k}": round(recall_at_k(truth, found), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "memory_mb": round(faiss.serialize_index(index).nbytes / 1024 ** 2, 2)
+    }
+
+
+# Run all configurations for every corpus size
+def run(sizes: List[int], types: List[str], dim: int, k: int, n_queries: int,
+        pq_m: int, nprobe: int, ef_search: int) -> List[Dict]:
+    results = []
+    for n in sizes:
+        corpus, queries = synthetic_corpus(n, dim, n_queries)
+        exact = faiss.IndexFlatL2(dim)
+        exact.add(corpus)
+        _, truth = exact.search(queries, k)
+
+        for spec in types:
+            result = run_case(corpus, queries, truth, spec, k, pq_m, nprobe, ef_search)
+            results.append(result)
+            print(" | ".join(f"{key}={value}" for key, value in result.items()), flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS index tipi benchmark'ı (sentetik veri)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--types", nargs="+", default=DEFAULT_TYPES)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--json", help="sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.types, args.dim, args.k, args.queries, args.pq_m, args.nprobe, args.ef_search)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Load Test - /api/ask Uç Noktası İçin Eşzamanlı Yük Testi
+Throughput ve p50/p95/p99 gecikme ölçer; LLM maliyeti olmadan ölçmek için sunucu sahte LLM ile başlatılmalı
+
+Kullanım:
+    LLM_PROVIDER=stub EMBEDDING_PROVIDER=hash gunicorn -c gunicorn.conf.py wsgi:application
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 32 --requests 2000
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import requests
+
+DEFAULT_QUESTIONS = [
+    "ASELS hissesinin son durumu nedir?",
+    "Bitcoin'in son 30 günlük performansı nasıl?",
+    "Hangi hisse en çok kazandı?",
+    "THYAO ve GARAN'ı karşılaştır",
+    "Ethereum volatilitesi ne kadar?",
+    "En volatil kripto para hangisi?"
+]
+
+_local = threading.local()
+
+
+# Get a pooled HTTP session for the current thread
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+# Send one question and measure its latency
+def ask(url: str, question: str, timeout: float) -> Dict:
+    start = time.perf_counter()
+    try:
+        response = _session().post(f"{url}/api/ask", json={"question": question}, timeout=timeout)
+        ok = response.status_code == 200 and response.json().get("success", False)
+        status = response.status_code
+    except requests.RequestException:
+        ok, status = False, None
+    return {"ok": ok, "status": status, "latency_ms": (time.perf_counter() - start) * 1000}
+
+
+# Run the load test and summarize latencies
+def run(url: str, questions: List[str], total: int, concurrency: int, unique: bool, timeout: float) -> Dict:
+    # a counter suffix defeats the exact-match answer cache
+    payloads = [f"{questions[i % len(questions)]} #{i}" if unique else questions[i % len(questions)]
+                for i in range(total)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda q: ask(url, q, timeout), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([r["latency_ms"] for r in results if r["ok"]])
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "succeeded": int(len(latencies)),
+        "statuses": statuses,
+        "duration_sec": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/ask yük testi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--unique", action="store_true", help="cevap cache'ini atlamak için soruları benzersiz yap")
+    parser.add_argument("--questions-file", help="satır başına bir soru içeren dosya")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions_file:
+        with open(args.questions_file, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+    print(json.dumps(run(args.url, questions, args.requests, args.concurrency, args.unique, args.timeout),
+                     indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
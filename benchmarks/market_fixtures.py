@@ -0,0 +1,271 @@
+"""
+Market Fixtures - Kaydedilmiş Piyasa Verisi ve Tekrar Oynatma İstemcileri
+yfinance/CoinGecko cevapları JSON'a kaydedilir ve ağ olmadan DataFetcher'a aynı arayüzle geri verilir
+
+Kullanım:
+    python benchmarks/market_fixtures.py record --out benchmarks/fixtures/market.json
+    python benchmarks/market_fixtures.py synthetic --out /tmp/market.json --stocks 5 --coins 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeseries_store import period_to_days  # noqa: E402
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class MarketFixtures:
+    """Hisse geçmişleri (yfinance biçimi) ve coin market chart'ları (CoinGecko biçimi)"""
+
+    # Initialize with stock frames, crypto charts and where the data came from
+    def __init__(self, stocks: Dict[str, pd.DataFrame], crypto: Dict[str, Dict], source: str):
+        self.stocks = stocks
+        self.crypto = crypto
+        self.source = source
+
+    # Shift all timestamps so the latest point lands on the given time
+    def anchored(self, now: Optional[pd.Timestamp] = None) -> "MarketFixtures":
+        now = now or pd.Timestamp.now().floor("D")
+        latest = [frame.index[-1] for frame in self.stocks.values() if len(frame)]
+        latest += [pd.Timestamp(chart["prices"][-1][0], unit="ms") for chart in self.crypto.values() if chart["prices"]]
+        if not latest:
+            return self
+
+        shift = now.floor("D") - max(latest).floor("D")
+        shift_ms = int(shift.total_seconds() * 1000)
+        stocks = {ticker: frame.set_axis(frame.index + shift) for ticker, frame in self.stocks.items()}
+        crypto = {coin: {key: [[ts + shift_ms, value] for ts, value in points] for key, points in chart.items()}
+                  for coin, chart in self.crypto.items()}
+        return MarketFixtures(stocks, crypto, self.source)
+
+    # Replay the fixtures under n_stocks/n_coins names; copies are rescaled so documents differ
+    def expanded(self, n_stocks: int, n_coins: int) -> "MarketFixtures":
+        stocks = {}
+        tickers = list(self.stocks)
+        for i in range(n_stocks if tickers else 0):
+            base, copy = tickers[i % len(tickers)], i // len(tickers)
+            name = base if copy == 0 else f"{base.split('.')[0]}{copy}.IS"
+            frame = self.stocks[base].copy()
+            frame[["Open", "High", "Low", "Close"]] *= 1 + 0.01 * copy
+            stocks[name] = frame
+
+        crypto = {}
+        coins = list(self.crypto)
+        for i in range(n_coins if coins else 0):
+            base, copy = coins[i % len(coins)], i // len(coins)
+            name = base if copy == 0 else f"{base}-{copy}"
+            chart = self.crypto[base]
+            crypto[name] = {
+                "prices": [[ts, value * (1 + 0.01 * copy)] for ts, value in chart["prices"]],
+                "total_volumes": [list(point) for point in chart.get("total_volumes", [])]
+            }
+        return MarketFixtures(stocks, crypto, self.source)
+
+    # Serialize to JSON-compatible data
+    def to_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "created_at": datetime.now().isoformat(),
+            "stocks": {ticker: {"timestamps": [int(ts.value // 10 ** 6) for ts in frame.index],
+                                **{column: frame[column].astype(float).tolist() for column in OHLCV}}
+                       for ticker, frame in self.stocks.items()},
+            "crypto": self.crypto
+        }
+
+    # Build from JSON-compatible data
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MarketFixtures":
+        stocks = {ticker: pd.DataFrame({column: series[column] for column in OHLCV},
+                                       index=pd.to_datetime(series["timestamps"], unit="ms"))
+                  for ticker, series in data.get("stocks", {}).items()}
+        return cls(stocks, data.get("crypto", {}), data.get("source", "unknown"))
+
+    # Write the fixtures to a JSON file
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    # Read fixtures from a JSON file
+    @classmethod
+    def load(cls, path: str) -> "MarketFixtures":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# Record real yfinance/CoinGecko responses (needs network access)
+def record_fixtures(tickers: List[str], coins: List[str], period: str = "3mo", days: int = 90,
+                    vs_currency: str = "usd") -> MarketFixtures:
+    import yfinance as yf
+    from pycoingecko import CoinGeckoAPI
+
+    stocks = {}
+    for ticker in tickers:
+        hist = yf.Ticker(ticker).history(period=period, auto_adjust=True)
+        if not hist.empty:
+            index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+            stocks[ticker] = hist[OHLCV].set_axis(index)
+
+    cg = CoinGeckoAPI()
+    crypto = {}
+    for coin in coins:
+        chart = cg.get_coin_market_chart_by_id(id=coin, vs_currency=vs_currency, days=days)
+        crypto[coin] = {"prices": chart["prices"], "total_volumes": chart.get("total_volumes", [])}
+        # stay under the public API quota
+        time.sleep(2.5)
+    return MarketFixtures(stocks, crypto, source="recorded")
+
+
+# Generate random-walk fixtures; marked as synthetic, for runs without recorded data
+def synthetic_fixtures(tickers: List[str], coins: List[str], days: int = 90, seed: int = 0) -> MarketFixtures:
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().floor("D")
+
+    stocks = {}
+    dates = pd.bdate_range(end=end, periods=max(1, days * 5 // 7))
+    for ticker in tickers:
+        close = rng.uniform(10, 300) * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        spread = close * rng.uniform(0, 0.02, len(dates))
+        stocks[ticker] = pd.DataFrame({
+            "Open": close + rng.normal(0, 1, len(dates)) * spread,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(10 ** 5, 10 ** 7, len(dates)).astype(float)
+        }, index=dates)
+
+    crypto = {}
+    hours = pd.date_range(end=end, periods=days * 24, freq="h")
+    timestamps = [int(ts.value // 10 ** 6) for ts in hours]
+    for coin in coins:
+        prices = rng.uniform(0.5, 50000) * np.exp(np.cumsum(rng.normal(0, 0.005, len(hours))))
+        volumes = rng.uniform(10 ** 6, 10 ** 9, len(hours))
+        crypto[coin] = {"prices": [list(p) for p in zip(timestamps, prices.tolist())],
+                        "total_volumes": [list(v) for v in zip(timestamps, volumes.tolist())]}
+    return MarketFixtures(stocks, crypto, source="synthetic")
+
+
+class FixtureStockClient:
+    """yfinance download()/Ticker().history() arayüzünü fixture'lardan cevaplayan istemci"""
+
+    # Initialize with stock frames and an optional simulated per-call latency
+    def __init__(self, stocks: Dict[str, pd.DataFrame], latency_sec: float = 0.0):
+        self.stocks = stocks
+        self.latency_sec = latency_sec
+        self.calls = 0
+
+    # Cut a history to a yfinance period or start date
+    def _window(self, frame: pd.DataFrame, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        if start:
+            return frame[frame.index >= pd.Timestamp(start)]
+        days = period_to_days(period) if period else None
+        if days and len(frame):
+            return frame[frame.index >= frame.index[-1] - pd.Timedelta(days=days)]
+        return frame
+
+    # Simulate one upstream request
+    def _request(self) -> None:
+        self.calls += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+
+    # Multi-ticker download grouped by ticker (MultiIndex columns)
+    def download(self, tickers, period: Optional[str] = None, start: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        self._request()
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {ticker: self._window(self.stocks[ticker], period, start)
+                  for ticker in tickers if ticker in self.stocks}
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+    # Single-ticker handle
+    def Ticker(self, ticker: str) -> "FixtureTicker":
+        return FixtureTicker(self, ticker)
+
+
+class FixtureTicker:
+    """Tek ticker için history() cevabı"""
+
+    # Initialize with the owning client and ticker
+    def __init__(self, client: FixtureStockClient, ticker: str):
+        self.client = client
+        self.ticker = ticker
+
+    # Return the history window (empty for unknown tickers, like yfinance)
+    def history(self, period: Optional[str] = None, start: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        self.client._request()
+        frame = self.client.stocks.get(self.ticker)
+        return self.client._window(frame, period, start) if frame is not None else pd.DataFrame(columns=OHLCV)
+
+
+class FixtureCoinGeckoClient:
+    """CoinGecko market chart uç noktalarını fixture'lardan cevaplayan istemci"""
+
+    # Initialize with market charts and an optional simulated per-call latency
+    def __init__(self, charts: Dict[str, Dict], latency_sec: float = 0.0):
+        self.charts = charts
+        self.latency_sec = latency_sec
+        self.calls = 0
+
+    # Return the chart points within [from_ms, to_ms]
+    def _slice(self, coin: str, from_ms: float, to_ms: float) -> Dict:
+        self.calls += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        if coin not in self.charts:
+            raise ValueError(f"coin not found: {coin}")
+
+        chart = self.charts[coin]
+        return {key: [point for point in points if from_ms <= point[0] <= to_ms] for key, points in chart.items()}
+
+    # Chart for the last `days` days of the series
+    def get_coin_market_chart_by_id(self, id: str, vs_currency: str, days: int, **kwargs) -> Dict:
+        prices = self.charts.get(id, {}).get("prices") or [[0, 0]]
+        last = prices[-1][0]
+        return self._slice(id, last - int(days) * 86400 * 1000, last)
+
+    # Chart between two unix timestamps (seconds)
+    def get_coin_market_chart_range_by_id(self, id: str, vs_currency: str, from_timestamp: int,
+                                          to_timestamp: int, **kwargs) -> Dict:
+        return self._slice(id, int(from_timestamp) * 1000, int(to_timestamp) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Piyasa verisi fixture'ları")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="gerçek yfinance/CoinGecko cevaplarını kaydet")
+    record.add_argument("--out", required=True)
+    record.add_argument("--tickers", nargs="+", default=["ASELS.IS", "THYAO.IS", "GARAN.IS", "AKBNK.IS", "BIMAS.IS"])
+    record.add_argument("--coins", nargs="+", default=["bitcoin", "ethereum", "cardano", "solana"])
+    record.add_argument("--period", default="3mo")
+    record.add_argument("--days", type=int, default=90)
+
+    synthetic = sub.add_parser("synthetic", help="sentetik (rastgele yürüyüş) fixture üret")
+    synthetic.add_argument("--out", required=True)
+    synthetic.add_argument("--stocks", type=int, default=5)
+    synthetic.add_argument("--coins", type=int, default=4)
+    synthetic.add_argument("--days", type=int, default=90)
+    synthetic.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        fixtures = record_fixtures(args.tickers, args.coins, args.period, args.days)
+    else:
+        fixtures = synthetic_fixtures([f"SYN{i}.IS" for i in range(args.stocks)],
+                                      [f"synthcoin{i}" for i in range(args.coins)], args.days, args.seed)
+    fixtures.save(args.out)
+    print(f"{len(fixtures.stocks)} hisse, {len(fixtures.crypto)} coin ({fixtures.source}) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Pipeline Benchmark - Uçtan Uca RAG Hattının Ağsız Ölçümü
+Fixture verisi DataFetcher'dan, hash embedding ve sahte LLM ile geçirilir; initialize (özet ve detay index'i ayrı),
+reload_data, ask_question ve /api/ask süreleri sembol sayısına göre JSON olarak raporlanır
+
+Kullanım:
+    python benchmarks/pipeline_benchmark.py --sizes 10 50 200 --json results.json
+    python benchmarks/pipeline_benchmark.py --fixtures benchmarks/fixtures/market.json --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# offline providers and throwaway state directories unless explicitly overridden
+_STATE_DIR = tempfile.mkdtemp(prefix="finance-rag-bench-")
+os.environ.setdefault("EMBEDDING_PROVIDER", "hash")
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("INDEX_DIR", os.path.join(_STATE_DIR, "index"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_STATE_DIR, "embeddings.sqlite"))
+os.environ.setdefault("TIMESERIES_DIR", os.path.join(_STATE_DIR, "timeseries"))
+
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import EMBEDDING_PROVIDER, LLM_PROVIDER, FAISS_INDEX_TYPE, TIMESERIES_DIR  # noqa: E402
+from data_fetcher import DataFetcher  # noqa: E402
+from finance_rag_service import FinanceRAGService  # noqa: E402
+from instrumentation import STAGE_SECONDS  # noqa: E402
+from rate_limiter import TokenBucket, RequestScheduler  # noqa: E402
+from timeseries_store import TimeSeriesStore  # noqa: E402
+from market_fixtures import (MarketFixtures, FixtureStockClient, FixtureCoinGeckoClient,  # noqa: E402
+                             synthetic_fixtures)
+
+QUESTION_TEMPLATES = [
+    "{symbol} hakkında genel bir değerlendirme yap",
+    "{symbol} son dönemde nasıl bir trend izledi?",
+    "{symbol} için risk durumu nedir?",
+    "{symbol} ile {other} arasındaki farklar neler?"
+]
+
+# metrics compared against a baseline (lower is better)
+REGRESSION_KEYS = ["initialize_cold_sec", "initialize_warm_sec", "reload_data.p50_ms",
+                   "ask_question.p50_ms", "api_ask.p50_ms"]
+
+# index build stages of a cold start: summary documents (FAISS) and detail chunks (DetailIndex) apart
+BUILD_STAGES = {
+    "summary_embed_sec": {"stage": "index_embed", "level": "summary"},
+    "summary_index_sec": {"stage": "index_build"},
+    "detail_embed_sec": {"stage": "index_embed", "level": "detail"}
+}
+
+
+# Summarize latencies in milliseconds
+def summarize(latencies_ms: List[float]) -> Dict:
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": round(float(np.mean(latencies_ms)), 3),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3)
+    }
+
+
+# Get the seconds spent so far in each index build stage
+def build_seconds() -> Dict[str, float]:
+    return {key: STAGE_SECONDS.total(**labels)[1] for key, labels in BUILD_STAGES.items()}
+
+
+# Time repeated calls of fn
+def measure(fn: Callable[[int], object], repeats: int) -> List[float]:
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+# Build RAG-path questions over the case's symbols; a suffix keeps them distinct
+def build_questions(symbols: List[str], count: int) -> List[str]:
+    questions = []
+    for i in range(count):
+        symbol, other = symbols[i % len(symbols)], symbols[(i * 7 + 1) % len(symbols)]
+        template = QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)]
+        questions.append(f"{template.format(symbol=symbol.split('.')[0], other=other.split('.')[0])} ({i})")
+    return questions
+
+
+# Create a DataFetcher replaying the fixtures, with no CoinGecko quota
+def fixture_fetcher(fixtures: MarketFixtures, timeseries_root: str, latency_sec: float) -> DataFetcher:
+    return DataFetcher(
+        stock_client=FixtureStockClient(fixtures.stocks, latency_sec),
+        cg_client=FixtureCoinGeckoClient(fixtures.crypto, latency_sec),
+        crypto_scheduler=RequestScheduler(TokenBucket(10 ** 9, burst=64), max_in_flight=8),
+        timeseries_store=TimeSeriesStore(timeseries_root)
+    )
+
+
+# Drive /api/ask through the Flask test client from several threads
+def measure_api(service: FinanceRAGService, questions: List[str], concurrency: int) -> Dict:
+    from app import app, web_app
+
+    web_app.rag_service = service
+    web_app.is_initialized = True
+    local = threading.local()
+
+    def ask(question: str) -> Dict:
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        response = local.client.post("/api/ask", json={"question": question})
+        return {"ok": response.status_code == 200, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(ask, questions))
+    elapsed = time.perf_counter() - start
+
+    return {
+        **summarize([r["latency_ms"] for r in results if r["ok"]]),
+        "errors": sum(1 for r in results if not r["ok"]),
+        "concurrency": concurrency,
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None
+    }
+
+
+# Benchmark one corpus size
+def run_case(fixtures: MarketFixtures, n_symbols: int, crypto_share: float, args) -> Dict:
+    n_coins = int(round(n_symbols * crypto_share)) if fixtures.crypto else 0
+    case = fixtures.expanded(n_symbols - n_coins, n_coins)
+    tickers, coins = list(case.stocks), list(case.crypto)
+    timeseries_root = os.path.join(TIMESERIES_DIR, f"case-{n_symbols}")
+
+    # cold: fetch, embed and build from scratch
+    stages_before = build_seconds()
+    start = time.perf_counter()
+    service = FinanceRAGService(background_refresh=False, tickers=tickers, coins=coins,
+                                data_fetcher=fixture_fetcher(case, timeseries_root, args.fetch_latency))
+    cold_sec = time.perf_counter() - start
+    cold_stages = {key: round(seconds - stages_before[key], 3) for key, seconds in build_seconds().items()}
+    if not service.is_ready:
+        raise RuntimeError(f"{n_symbols} sembollük servis başlatılamadı")
+
+    # warm: the persisted index for the same data is loaded instead
+    start = time.perf_counter()
+    service.initialize()
+    warm_sec = time.perf_counter() - start
+
+    reload_latencies = measure(lambda _: service.reload_data(), args.reloads)
+
+    # the answer cache would turn repeated runs into lookups
+    if not args.answer_cache:
+        service.rag_system.answer_cache = None
+    symbols = tickers + coins
+    routes: Dict[str, int] = {}
+
+    def ask(i: int) -> None:
+        route = service.ask_question(questions[i])["route"]
+        routes[route] = routes.get(route, 0) + 1
+
+    questions = build_questions(symbols, args.questions)
+    ask_latencies = measure(ask, len(questions))
+    api = measure_api(service, build_questions(symbols[::-1], args.api_requests), args.concurrency)
+
+    result = {
+        "symbols": n_symbols,
+        "stocks": len(tickers),
+        "coins": len(coins),
+        "summary_documents": service.document_count,
+        "detail_chunks": service.rag_system.get_detail_count(),
+        "initialize_cold_sec": round(cold_sec, 3),
+        "cold_index_build": cold_stages,
+        "initialize_warm_sec": round(warm_sec, 3),
+        "reload_data": summarize(reload_latencies),
+        "ask_question": {**summarize(ask_latencies), "routes": routes},
+        "api_ask": api
+    }
+    service.stop_background_refresh()
+    return result
+
+
+# Read a dotted key ("ask_question.p50_ms") from a result
+def _lookup(result: Dict, dotted: str) -> Optional[float]:
+    value = result
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+# Compare results with a baseline run; returns human-readable regressions
+def find_regressions(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    previous = {case["symbols"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results:
+        old = previous.get(case["symbols"])
+        if not old:
+            continue
+        for key in REGRESSION_KEYS:
+            new_value, old_value = _lookup(case, key), _lookup(old, key)
+            if new_value is not None and old_value and new_value > old_value * (1 + tolerance):
+                regressions.append(f"{case['symbols']} sembol {key}: {old_value} -> {new_value}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca RAG hattı benchmark'ı (ağsız)")
+    parser.add_argument("--fixtures", help="market_fixtures.py ile kaydedilmiş JSON (yoksa sentetik veri)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="sembol sayıları")
+    parser.add_argument("--crypto-share", type=float, default=0.4)
+    parser.add_argument("--reloads", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--api-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--history-days", type=int, default=90,
+                        help="sentetik fiyat geçmişi (gün); detay katmanı en çok DETAIL_HISTORY_DAYS kullanır")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="sahte ağ gecikmesi (sn/istek)")
+    parser.add_argument("--answer-cache", action="store_true", help="cevap önbelleğini açık bırak")
+    parser.add_argument("--json", help="sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="izin verilen göreli yavaşlama")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = MarketFixtures.load(args.fixtures).anchored()
+    else:
+        fixtures = synthetic_fixtures(["ASELS.IS", "THYAO.IS", "GARAN.IS", "AKBNK.IS", "BIMAS.IS"],
+                                      ["bitcoin", "ethereum", "cardano", "solana"], days=args.history_days)
+
+    cases = []
+    for n in args.sizes:
+        case = run_case(fixtures, n, args.crypto_share, args)
+        cases.append(case)
+        build = case["cold_index_build"]
+        print(f"symbols={case['symbols']} | summaries={case['summary_documents']} "
+              f"(embed={build['summary_embed_sec']}s, faiss={build['summary_index_sec']}s) | "
+              f"details={case['detail_chunks']} (embed={build['detail_embed_sec']}s) | "
+              f"cold={case['initialize_cold_sec']}s | "
+              f"warm={case['initialize_warm_sec']}s | reload_p50={case['reload_data'].get('p50_ms')}ms | "
+              f"ask_p50={case['ask_question'].get('p50_ms')}ms | "
+              f"api_rps={case['api_ask'].get('throughput_rps')}", flush=True)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "fixtures": fixtures.source,
+        "embedding_provider": EMBEDDING_PROVIDER,
+        "llm_provider": LLM_PROVIDER,
+        "faiss_index_type": FAISS_INDEX_TYPE,
+        "python": platform.python_version(),
+        "cases": cases
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(cases, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"YAVAŞLAMA: {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
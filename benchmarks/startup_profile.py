@@ -0,0 +1,134 @@
+"""
+Startup Profile - Modül Import Süresi ve Bellek (RSS) Raporu
+Her giriş modülü (ve her embedding sağlayıcısıyla FinanceRAG kurulumu) ayrı bir süreçte `-X importtime` ile çalıştırılır; en pahalı paketler ve yüklenen ağır bağımlılıklar raporlanır
+
+Kullanım:
+    python benchmarks/startup_profile.py
+    python benchmarks/startup_profile.py --modules app finance_rag_service --providers hash local --top 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# dependencies that should only load when the RAG service is actually built
+HEAVY_MODULES = ["langchain", "langchain_community", "langchain_openai", "langchain_core", "openai",
+                 "faiss", "yfinance", "pycoingecko", "pandas", "numpy", "sentence_transformers", "torch"]
+
+# runs inside the child process: run ACTION and report time, RSS and loaded heavy modules
+CHILD = """
+import importlib, json, sys, time
+start = time.perf_counter()
+ACTION
+elapsed = time.perf_counter() - start
+rss_kb = 0
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except (OSError, StopIteration):
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_kb //= 1024 if sys.platform == "darwin" else 1
+print(json.dumps({"import_sec": elapsed, "rss_kb": rss_kb, "module_count": len(sys.modules),
+                  "loaded": sorted(m for m in json.loads(sys.argv[2]) if m in sys.modules)}))
+"""
+
+
+# Parse `-X importtime` output into cumulative seconds per top-level package
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    packages: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+
+        # only top-level entries; nested imports are already in their parent's cumulative time
+        name = parts[2]
+        if line.split("|")[2].startswith("  "):
+            continue
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(parts[1]) / 1e6
+    return packages
+
+
+# Import one module in the child
+IMPORT_ACTION = "importlib.import_module(sys.argv[1])"
+
+# Construct the RAG system in the child (the embedding provider comes from the environment);
+# with lazy providers no model or API client should be created here
+CONSTRUCT_ACTION = "from rag_system import FinanceRAG; FinanceRAG()"
+
+
+# Profile importing one module in a fresh interpreter
+def profile_module(module: str, top: int) -> Dict:
+    return _profile(module, IMPORT_ACTION, top)
+
+
+# Profile constructing FinanceRAG with one embedding provider (the LLM is the offline stub)
+def profile_provider(provider: str, top: int) -> Dict:
+    env = {**os.environ, "EMBEDDING_PROVIDER": provider, "LLM_PROVIDER": "stub"}
+    return _profile(f"FinanceRAG(embedding={provider})", CONSTRUCT_ACTION, top, env)
+
+
+# Run one action in a fresh interpreter and collect its import profile
+def _profile(module: str, action: str, top: int, env: Optional[Dict[str, str]] = None) -> Dict:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.replace("ACTION", action), module,
+         json.dumps(HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, env=env
+    )
+    if completed.returncode != 0:
+        tail = completed.stderr.strip().splitlines()[-1:] or ["?"]
+        return {"module": module, "error": tail[0]}
+
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    packages = parse_importtime(completed.stderr)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "import_sec": round(report["import_sec"], 3),
+        "rss_mb": round(report["rss_kb"] / 1024, 1),
+        "module_count": report["module_count"],
+        "heavy_loaded": report["loaded"],
+        "top_packages": [{"package": name, "cumulative_sec": round(sec, 3)} for name, sec in ranked]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Başlangıç import süresi ve RSS profili")
+    parser.add_argument("--modules", nargs="+", default=["app", "asgi", "finance_rag_service", "rag_system"])
+    parser.add_argument("--providers", nargs="*", default=["hash", "local"],
+                        help="FinanceRAG kurulumu profillenecek embedding sağlayıcıları")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    profiles = [lambda module=module: profile_module(module, args.top) for module in args.modules]
+    profiles += [lambda provider=provider: profile_provider(provider, args.top) for provider in args.providers]
+    for profile in profiles:
+        result = profile()
+        module = result["module"]
+        results.append(result)
+        if "error" in result:
+            print(f"{module}: HATA {result['error']}")
+            continue
+
+        print(f"{module}: {result['import_sec']} sn, {result['rss_mb']} MB RSS, {result['module_count']} modül, "
+              f"ağır bağımlılıklar: {', '.join(result['heavy_loaded']) or '-'}")
+        for entry in result["top_packages"]:
+            print(f"    {entry['package']:<28} {entry['cumulative_sec']:.3f} sn")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,155 @@ DEFAULT_STOCK_PERIOD = "1mo"
 DEFAULT_CRYPTO_DAYS = 30
 DEFAULT_VS_CURRENCY = "usd"
 
+
+# batched stock fetching
+STOCK_BATCH_SIZE = 20
+STOCK_FETCH_WORKERS = 4  # yfinance download threads per batch and per-ticker retry workers
+
+
+# CoinGecko rate limiting
+COINGECKO_REQUESTS_PER_MINUTE = 30
+COINGECKO_BURST = 5
+COINGECKO_MAX_IN_FLIGHT = 5
+COINGECKO_MAX_RETRIES = 3
+COINGECKO_BACKOFF_BASE = 2.0
+COINGECKO_BACKOFF_MAX = 60.0
+
+
+# persistent vector index
+INDEX_PERSIST_ENABLED = True
+INDEX_DIR = os.getenv("INDEX_DIR", ".index_cache")
+INDEX_KEEP_VERSIONS = 3
+INDEX_MAX_AGE_SECONDS = 6 * 60 * 60
+INDEX_MMAP = True
+
+
+# embedding cache
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".embedding_cache/embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 50000
+EMBEDDING_BATCH_SIZE = 64
+
+
+# background refresh (seconds, 0 disables a job)
+BACKGROUND_REFRESH_ENABLED = True
+STOCK_REFRESH_INTERVAL = 15 * 60
+CRYPTO_REFRESH_INTERVAL = 5 * 60
+
+
+# answer cache
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_MAX_ENTRIES = 500
+ANSWER_CACHE_TTL_SECONDS = 15 * 60
+ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.97
+
+
+# batch questions
+BATCH_MAX_QUESTIONS = 100
+BATCH_LLM_CONCURRENCY = 8
+
+
+# numeric fast path (ranking/comparison/filter questions answered from metadata)
+QUERY_ROUTER_ENABLED = True
+
+
+# local OHLCV store (refreshes fetch only new bars)
+TIMESERIES_ENABLED = True
+TIMESERIES_DIR = os.getenv("TIMESERIES_DIR", ".timeseries")
+
+
+# technical indicators (windows in bars: trading days for stocks, days for crypto)
+INDICATOR_MA_SHORT = 20
+INDICATOR_MA_LONG = 50
+INDICATOR_RSI_WINDOW = 14
+INDICATOR_VOLATILITY_WINDOW = 20
+INDICATOR_MIN_CORRELATION_PERIODS = 10
+STOCK_PERIODS_PER_YEAR = 252
+# minimum history fetched/read for indicators (~62 BIST trading days covers the 50-bar MA);
+# documents still describe only the requested period
+INDICATOR_HISTORY_DAYS = 90
+CRYPTO_PERIODS_PER_YEAR = 365
+
+
+# model providers: "openai", "local" (sentence-transformers on CPU) or "hash" for embeddings;
+# "openai" or "stub" (deterministic, offline) for the LLM
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+LOCAL_EMBEDDING_DEVICE = os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu")
+HASH_EMBEDDING_DIM = 384
+
+
+# FAISS index type: "flat", "ivf" or "hnsw"; ANN types are used only above FAISS_MIN_ANN_VECTORS
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_MIN_ANN_VECTORS = 10000
+FAISS_IVF_NLIST = 0  # 0 = 4 * sqrt(n)
+FAISS_IVF_NPROBE = 16
+FAISS_HNSW_M = 32
+FAISS_HNSW_EF_CONSTRUCTION = 200
+FAISS_HNSW_EF_SEARCH = 64
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "0"))  # PQ sub-vectors (0 disables, must divide the dimension)
+FAISS_PQ_NBITS = 8
+FAISS_TRAIN_SAMPLE = 100000
+
+
+# hybrid retrieval (symbol/type pre-filter + BM25 + dense, fused with reciprocal rank fusion)
+HYBRID_RETRIEVAL_ENABLED = True
+HYBRID_DENSE_FETCH_K = 20
+HYBRID_BM25_K1 = 1.5
+HYBRID_BM25_B = 0.75
+HYBRID_RRF_K = 60
+HYBRID_DENSE_WEIGHT = 1.0
+HYBRID_BM25_WEIGHT = 1.0
+
+
+# production serving (gunicorn.conf.py / wsgi.py)
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "4"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+SERVER_TIMEOUT = 120
+INDEX_RELOAD_INTERVAL = 30  # seconds between worker checks for a newer saved index
+
+
+# async serving (asgi.py): in-flight /api/ask limit (429 above it) and LLM connection pool
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "64"))
+LLM_MAX_CONNECTIONS = 100
+LLM_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+# prompt context: token budget; retrieved chunks farther (L2) than CONTEXT_MAX_DISTANCE_RATIO times the
+# best chunk's distance are dropped (the best distance is floored so a near-exact match doesn't drop the rest)
+CONTEXT_MAX_TOKENS = 1500
+CONTEXT_MAX_DISTANCE_RATIO = 1.5
+CONTEXT_MIN_BEST_DISTANCE = 0.05
+
+
+# hierarchical documents: one summary per asset in the main index, per-period detail chunks
+# (weekly for the last DETAIL_RECENT_WEEKS, monthly before) searched only for the top summaries
+HIERARCHICAL_ENABLED = True
+DETAIL_RECENT_WEEKS = 12
+DETAIL_HISTORY_DAYS = int(os.getenv("DETAIL_HISTORY_DAYS", "730"))
+DETAIL_MAX_PARENTS = 3
+DETAIL_TOP_K = 4
+
+
+# one FAISS index per market (stock/crypto), updated independently; questions naming one market
+# search only its shard, the rest fan out to all shards in parallel
+SHARDED_INDEX_ENABLED = True
+SHARD_SEARCH_WORKERS = 4
+
+
+# coalesce concurrent identical questions (per process)
+SINGLE_FLIGHT_ENABLED = True
+
+
+# /api/metrics latency histogram buckets (seconds)
+METRICS_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
 def validate_config():
-    if not OPENAI_API_KEY:
+    # the key is only needed when an OpenAI provider is used
+    if not OPENAI_API_KEY and "openai" in (EMBEDDING_PROVIDER, LLM_PROVIDER):
         raise ValueError(
             "OPENAI_API_KEY bulunamadı! "
             "Lütfen .env dosyası oluşturun ve OPENAI_API_KEY=your_key_here ekleyin"
@@ -0,0 +1,208 @@
+"""
+Context Builder - Token Bütçeli Prompt Bağlamı
+Düşük skorlu ve tekrar eden içerik atılır, sayısal metadata tek bir kompakt tabloya toplanır
+"""
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config import (DEFAULT_MODEL, CONTEXT_MAX_TOKENS, CONTEXT_MAX_DISTANCE_RATIO, CONTEXT_MIN_BEST_DISTANCE,
+                    INDICATOR_MA_SHORT, INDICATOR_MA_LONG)
+
+logger = logging.getLogger(__name__)
+
+# (metadata key, column title, format) in table order; columns nobody has are left out
+TABLE_COLUMNS = [
+    ("latest_price", "Fiyat", "price"),
+    ("price_change_pct", "Değişim %", "{:.2f}"),
+    ("volatility", "Volatilite %", "{:.2f}"),
+    ("rolling_volatility_pct", "Yıllık vol. %", "{:.2f}"),
+    ("max_drawdown_pct", "Maks. düşüş %", "{:.2f}"),
+    ("drawdown_pct", "Zirveden %", "{:.2f}"),
+    ("rsi", "RSI", "{:.1f}"),
+    ("ma_short", "Kısa MA", "price"),
+    ("ma_long", "Uzun MA", "price"),
+    ("most_correlated", "En yüksek korelasyon", "{}")
+]
+
+# document lines whose every figure the table carries, with the row keys that must be present;
+# lines with figures the table lacks (absolute change, correlation coefficient) are always kept
+COVERED_LINES = [
+    (re.compile(r"^- (Son kapanış fiyatı|Son fiyat):"), ("latest_price",)),
+    (re.compile(r"^- Volatilite:"), ("volatility",)),
+    (re.compile(r"^- Yıllık volatilite\b"), ("rolling_volatility_pct",)),
+    (re.compile(r"^- Maksimum düşüş:"), ("max_drawdown_pct", "drawdown_pct")),
+    (re.compile(rf"^- {INDICATOR_MA_SHORT} günlük ortalama:"), ("ma_short",)),
+    (re.compile(rf"^- {INDICATOR_MA_LONG} günlük ortalama:"), ("ma_long",)),
+    (re.compile(r"^- RSI\b"), ("rsi",))
+]
+
+_encoding = None
+_encoding_loaded = False
+
+
+# Get the tiktoken encoding for the chat model (None if tiktoken is unavailable)
+def _get_encoding(model: str):
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.info(f"tiktoken kullanılamıyor, token sayısı tahmin edilecek: {str(e)}")
+    return _encoding
+
+
+# Check whether a table row already carries every figure of a document line
+def is_covered(line: str, row: Dict[str, str]) -> bool:
+    return any(pattern.match(line) and all(key in row for key in keys) for pattern, keys in COVERED_LINES)
+
+
+# Convert a 1/(1+d) similarity back to the L2 distance it came from
+def score_distance(score: float) -> float:
+    return 1.0 / score - 1.0 if score > 0 else float("inf")
+
+
+# Count prompt tokens (tiktoken when installed, otherwise ~4 characters per token)
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class ContextBuilder:
+    """Retrieval ile LLM arasında token bütçeli bağlam oluşturucu"""
+
+    # Initialize with the context token budget and the relative distance cutoff
+    def __init__(self, max_tokens: int = CONTEXT_MAX_TOKENS, max_distance_ratio: float = CONTEXT_MAX_DISTANCE_RATIO,
+                 model: str = DEFAULT_MODEL):
+        self.max_tokens = max_tokens
+        self.max_distance_ratio = max_distance_ratio
+        self.model = model
+
+    # Build the context for ranked (document, 1/(1+d) score) pairs; a None score means always keep
+    def build(self, scored_docs: List[Tuple[object, Optional[float]]]) -> Dict:
+        docs = self._select(scored_docs)
+        budget = self.max_tokens
+        parts = []
+        used = []
+
+        rows = [(doc, self._table_row(doc)) for doc in docs]
+        columns = [column for column in TABLE_COLUMNS if any(column[0] in row for _, row in rows if row)]
+        in_table: Dict[int, Dict[str, str]] = {}
+        if columns:
+            header = " | ".join(["Sembol", "Tip"] + [title for _, title, _ in columns])
+            lines = [header]
+            budget -= count_tokens(header, self.model)
+            for doc, row in rows:
+                if not row:
+                    continue
+                line = " | ".join([row["symbol"], row["type"]] + [row.get(key, "-") for key, _, _ in columns])
+                cost = count_tokens(line, self.model) + 1
+                if cost > budget:
+                    break
+                lines.append(line)
+                budget -= cost
+                in_table[id(doc)] = row
+                used.append(doc)
+            if len(lines) > 1:
+                parts.append("Özet tablo:\n" + "\n".join(lines))
+
+        # remaining detail, minus lines the table or an overlapping chunk of the same asset already has
+        seen_lines = set()
+        for doc in docs:
+            block = self._detail_lines(doc, in_table.get(id(doc)), seen_lines)
+            if not block:
+                continue
+
+            kept = []
+            for line in block:
+                cost = count_tokens(line, self.model) + 1
+                if cost > budget:
+                    break
+                kept.append(line)
+                budget -= cost
+            # a lone heading adds nothing
+            if len(kept) > 1:
+                parts.append("\n".join(kept))
+                if id(doc) not in in_table:
+                    used.append(doc)
+            if budget <= 0:
+                break
+
+        text = "\n\n".join(parts)
+        return {
+            "text": text,
+            "documents": used,
+            "tokens": count_tokens(text, self.model),
+            "dropped": len(scored_docs) - len(used)
+        }
+
+    # Drop distant and duplicate documents, keeping rank order
+    def _select(self, scored_docs: List[Tuple[object, Optional[float]]]) -> List:
+        # 1/(1+d) scores bunch up near each other, so the cutoff compares the distances themselves
+        distances = [score_distance(score) for _, score in scored_docs if score is not None]
+        cutoff = max(min(distances), CONTEXT_MIN_BEST_DISTANCE) * self.max_distance_ratio if distances else None
+
+        docs = []
+        seen = set()
+        for doc, score in scored_docs:
+            if score is not None and score_distance(score) > cutoff:
+                continue
+            digest = hashlib.sha1(re.sub(r"\s+", " ", doc.page_content).strip().encode("utf-8")).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            docs.append(doc)
+        return docs
+
+    # Format a document's numeric metadata as a table row (None if it has no figures)
+    def _table_row(self, doc) -> Optional[Dict[str, str]]:
+        metadata = doc.metadata
+        if "latest_price" not in metadata:
+            return None
+
+        is_stock = metadata.get("type") == "stock"
+        currency = "TL" if is_stock else str(metadata.get("vs_currency", "usd")).upper()
+        row = {
+            "symbol": str(metadata.get("ticker") or metadata.get("coin")),
+            "type": "hisse" if is_stock else "kripto"
+        }
+        for key, _, fmt in TABLE_COLUMNS:
+            value = metadata.get(key)
+            if value is None:
+                continue
+            row[key] = f"{value:,.2f} {currency}" if fmt == "price" else fmt.format(value)
+        return row
+
+    # Get a document's lines without blanks, figures its table row covers, repeats and empty sections
+    def _detail_lines(self, doc, row: Optional[Dict[str, str]], seen_lines: set) -> List[str]:
+        symbol = doc.metadata.get("ticker") or doc.metadata.get("coin")
+        sections: List[List[str]] = []
+        for raw in doc.page_content.splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            is_heading = line.endswith(":") and not line.startswith("-")
+            if is_heading or not sections:
+                sections.append([line])
+                continue
+            if row and is_covered(line, row):
+                continue
+            if (symbol, line) in seen_lines:
+                continue
+            seen_lines.add((symbol, line))
+            sections[-1].append(line)
+
+        # the first heading names the asset; other headings need at least one line under them
+        lines = sections[0] if sections else []
+        for section in sections[1:]:
+            if len(section) > 1:
+                lines.extend(section)
+        return lines
@@ -2,60 +2,366 @@
 Data Fetcher - OOP Tabanlı Veri Çekme Sınıfı
 Sadece çalışan ve gerekli fonksiyonları içerir
 """
-import yfinance as yf
-from pycoingecko import CoinGeckoAPI
+import pandas as pd
 from langchain_core.documents import Document
-from config import DEFAULT_STOCK_PERIOD, DEFAULT_CRYPTO_DAYS, DEFAULT_VS_CURRENCY
+from config import (DEFAULT_STOCK_PERIOD, DEFAULT_CRYPTO_DAYS, DEFAULT_VS_CURRENCY,
+                    STOCK_BATCH_SIZE, STOCK_FETCH_WORKERS,
+                    COINGECKO_REQUESTS_PER_MINUTE, COINGECKO_BURST, COINGECKO_MAX_IN_FLIGHT,
+                    COINGECKO_MAX_RETRIES, COINGECKO_BACKOFF_BASE, COINGECKO_BACKOFF_MAX,
+                    INDICATOR_MA_SHORT, INDICATOR_MA_LONG, INDICATOR_RSI_WINDOW,
+                    INDICATOR_VOLATILITY_WINDOW, STOCK_PERIODS_PER_YEAR, CRYPTO_PERIODS_PER_YEAR,
+                    INDICATOR_HISTORY_DAYS,
+                    HIERARCHICAL_ENABLED, DETAIL_HISTORY_DAYS)
+from hierarchical_index import daily_bars, period_chunks
+from indicators import price_panel, compute_indicators
+from instrumentation import timed, STAGE_SECONDS
+from rate_limiter import TokenBucket, RequestScheduler
+from timeseries_store import TimeSeriesStore, normalize_frame, period_to_days, days_to_period
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
 import time
-from typing import List, Dict, Optional
+from datetime import timedelta
+from typing import Callable, List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# yf.download resets module-level result state on every call; concurrent calls (refresh jobs,
+# request threads, other DataFetcher instances) would clobber each other's results
+YF_DOWNLOAD_LOCK = threading.Lock()
+
+# stored history may start a few days after a fetch window opens (weekends, holidays)
+HISTORY_START_SLACK = timedelta(days=7)
+
+# CoinGecko range queries return ~5-minute points below 1 day and hourly ones from 1 to 90 days;
+# incremental requests span at least this much so they match the stored hourly series
+CRYPTO_MIN_RANGE = timedelta(days=2)
+
+
+# Get the days of history a fetch needs: the requested window, the indicator lookback and the detail layer
+def history_days(days: int) -> int:
+    return max(days, INDICATOR_HISTORY_DAYS, DETAIL_HISTORY_DAYS if HIERARCHICAL_ENABLED else 0)
+
+
+# Widen a yfinance period so the indicator windows and the detail chunks get enough bars
+def history_period(period: str) -> str:
+    days = period_to_days(period)
+    return period if days is None or days >= history_days(days) else days_to_period(history_days(days))
+
+
+# Get the days indicators are computed over (at least the indicator lookback; None means everything)
+def indicator_days(days: Optional[int]) -> Optional[int]:
+    return None if days is None else max(days, INDICATOR_HISTORY_DAYS)
+
+
+# Keep only the last `days` days of a frame (None keeps everything)
+def window(frame: pd.DataFrame, days: Optional[int]) -> pd.DataFrame:
+    if days is None or frame.empty:
+        return frame
+    return frame[frame.index >= frame.index[-1] - pd.Timedelta(days=days)]
+
+
 class DataFetcher:
     """Veri çekme sınıfı - OOP Tabanlı"""
     
-    # Initialize DataFetcher with CoinGecko API
-    def __init__(self):
-        self.cg = CoinGeckoAPI()
+    # Initialize DataFetcher with CoinGecko API and yfinance (or compatible stub clients)
+    def __init__(self, stock_batch_size: int = STOCK_BATCH_SIZE, stock_fetch_workers: int = STOCK_FETCH_WORKERS,
+                 cg_client=None, crypto_scheduler: Optional[RequestScheduler] = None,
+                 timeseries_store: Optional[TimeSeriesStore] = None, stock_client=None):
+        # clients (and the yfinance/pycoingecko imports) are created on first fetch
+        self._cg = cg_client
+        # anything exposing yfinance's download() and Ticker(ticker).history()
+        self._yf = stock_client
+        self.timeseries_store = timeseries_store
+        self.crypto_scheduler = crypto_scheduler or RequestScheduler(
+            TokenBucket(COINGECKO_REQUESTS_PER_MINUTE, burst=COINGECKO_BURST),
+            max_in_flight=COINGECKO_MAX_IN_FLIGHT,
+            max_retries=COINGECKO_MAX_RETRIES,
+            backoff_base=COINGECKO_BACKOFF_BASE,
+            backoff_max=COINGECKO_BACKOFF_MAX
+        )
+        self.stock_batch_size = max(1, stock_batch_size)
+        self.stock_fetch_workers = max(1, stock_fetch_workers)
+        self.last_stock_fetch_stats = []
+        self.last_crypto_fetch_stats = {}
         logger.info("DataFetcher başlatıldı")
     
+    # Get the CoinGecko client, creating it on first use
+    @property
+    def cg(self):
+        if self._cg is None:
+            from pycoingecko import CoinGeckoAPI
+            self._cg = CoinGeckoAPI()
+        return self._cg
+    
+    # Get the yfinance module (or the injected stock client), importing it on first use
+    @property
+    def yf(self):
+        if self._yf is None:
+            import yfinance
+            self._yf = yfinance
+        return self._yf
+    
     # Fetch BIST stock data using YFinance
-    def fetch_stock_data(self, tickers: List[str], period: str = DEFAULT_STOCK_PERIOD) -> List[Document]:
+    def fetch_stock_data(self, tickers: List[str], period: str = DEFAULT_STOCK_PERIOD,
+                         batched: bool = True,
+                         progress_callback: Optional[Callable[[int], None]] = None) -> List[Document]:
         documents = []
         
         if not tickers:
             logger.warning("Hisse senedi ticker'ı bulunamadı!")
             return documents
         
+        self.last_stock_fetch_stats = []
+        # indicators and detail chunks need more bars than short periods hold; summaries are sliced back below
+        fetch_period = history_period(period)
+        if self.timeseries_store:
+            histories = self._fetch_stock_histories_incremental(tickers, fetch_period, progress_callback)
+        elif batched:
+            histories = self._fetch_stock_histories(tickers, fetch_period, progress_callback)
+        else:
+            histories = {}
+            for ticker in tickers:
+                histories[ticker] = self._fetch_single_stock_history(ticker, fetch_period)
+                if progress_callback and histories[ticker] is not None:
+                    progress_callback(1)
+        
+        frames = {ticker: normalize_frame(hist) for ticker, hist in histories.items()
+                  if hist is not None and not hist.empty}
+        indicators = self._compute_indicators(
+            {ticker: window(hist, indicator_days(period_to_days(period))) for ticker, hist in frames.items()},
+            STOCK_PERIODS_PER_YEAR
+        )
+        
+        # build documents in the requested ticker order
         for ticker in tickers:
+            hist = frames.get(ticker)
+            
+            if hist is None:
+                logger.warning(f"{ticker} için veri bulunamadı!")
+                continue
+            
             try:
-                logger.info(f"{ticker} verisi YFinance'den çekiliyor...")
-                
-                # fetch data using YFinance
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
-                
-                if hist.empty:
-                    logger.warning(f"{ticker} için veri bulunamadı!")
+                documents.append(self._build_stock_document(ticker, window(hist, period_to_days(period)),
+                                                            period, indicators.get(ticker)))
+                logger.info(f"{ticker} verisi YFinance'den başarıyla çekildi!")
+            except Exception as e:
+                logger.error(f"{ticker} verisi işlenirken hata: {str(e)}")
+                continue
+        
+        # detail chunks follow the summaries so callers keeping only summaries can slice them off
+        if HIERARCHICAL_ENABLED:
+            for ticker in (ticker for ticker in tickers if ticker in frames):
+                history = self.timeseries_store.read(ticker, DETAIL_HISTORY_DAYS) \
+                    if self.timeseries_store else frames[ticker]
+                documents.extend(self._build_detail_documents(
+                    ticker, history, {"ticker": ticker, "type": "stock", "source": "yfinance"},
+                    lambda value: f"{value:.2f} TL"
+                ))
+        
+        return documents
+    
+    # Fetch only bars after the last stored timestamp, then read windows from the local store
+    def _fetch_stock_histories_incremental(self, tickers: List[str], period: str,
+                                           progress_callback: Optional[Callable[[int], None]] = None
+                                           ) -> Dict[str, pd.DataFrame]:
+        store = self.timeseries_store
+        
+        days = period_to_days(period)
+        # tickers sharing a start date are fetched together; None means no (or too short) local history
+        groups: Dict[Optional[str], List[str]] = {}
+        for ticker in tickers:
+            last = self._stored_until(ticker, days)
+            # the last stored bar is fetched again since it may have been incomplete
+            start = last.strftime("%Y-%m-%d") if last is not None else None
+            groups.setdefault(start, []).append(ticker)
+        
+        for start, group in groups.items():
+            if start:
+                logger.info(f"{len(group)} ticker için {start} sonrası barlar çekiliyor...")
+            fetched = self._fetch_stock_histories(group, period, progress_callback,
+                                                  start=start, retry_missing=start is None)
+            for ticker, hist in fetched.items():
+                store.append(ticker, hist)
+        
+        return {ticker: store.read(ticker, days) for ticker in tickers}
+    
+    # Get the last stored timestamp, or None when the store doesn't cover `days` days (full fetch needed)
+    def _stored_until(self, symbol: str, days: Optional[int]) -> Optional[pd.Timestamp]:
+        last = self.timeseries_store.last_timestamp(symbol)
+        if last is None or days is None:
+            return last
+        
+        # a short series (e.g. stored before the indicator lookback grew) is backfilled
+        first = self.timeseries_store.first_timestamp(symbol)
+        return last if first <= last - timedelta(days=days) + HISTORY_START_SLACK else None
+    
+    # Fetch histories in multi-ticker batches, one yf.download call at a time
+    def _fetch_stock_histories(self, tickers: List[str], period: str,
+                               progress_callback: Optional[Callable[[int], None]] = None,
+                               start: Optional[str] = None, retry_missing: bool = True) -> Dict[str, pd.DataFrame]:
+        histories = {}
+        
+        batches = [tickers[i:i + self.stock_batch_size] for i in range(0, len(tickers), self.stock_batch_size)]
+        first_batch_no = len(self.last_stock_fetch_stats)
+        logger.info(f"{len(tickers)} ticker {len(batches)} batch halinde çekiliyor "
+                    f"(batch başına {self.stock_fetch_workers} thread)...")
+        
+        # yfinance keeps download state in module globals, so batches can't overlap; each call
+        # fetches its tickers on yfinance's own threads instead
+        for batch_no, batch in enumerate(batches):
+            batch_histories, stats = self._download_stock_batch(first_batch_no + batch_no, batch, period, start)
+            histories.update(batch_histories)
+            self.last_stock_fetch_stats.append(stats)
+            if progress_callback:
+                progress_callback(len(batch_histories))
+        
+        # tickers missing from a bulk response are retried one by one (Ticker.history has no shared state)
+        missing = [t for t in tickers if t not in histories] if retry_missing else []
+        if missing:
+            logger.info(f"Toplu indirmede eksik kalan {len(missing)} ticker tek tek çekiliyor...")
+            with ThreadPoolExecutor(max_workers=min(self.stock_fetch_workers, len(missing))) as executor:
+                for ticker, hist in zip(missing, executor.map(
+                        lambda t: self._fetch_single_stock_history(t, period, start), missing)):
+                    if hist is not None:
+                        histories[ticker] = hist
+                        if progress_callback:
+                            progress_callback(1)
+        
+        return histories
+    
+    # Download one batch of tickers with a single yf.download call
+    def _download_stock_batch(self, batch_no: int, batch: List[str], period: str,
+                              start: Optional[str] = None) -> Tuple[Dict[str, pd.DataFrame], Dict]:
+        started = time.perf_counter()
+        histories = {}
+        error = None
+        window = {"start": start} if start else {"period": period}
+        
+        try:
+            with timed("fetch_stock_batch"), YF_DOWNLOAD_LOCK:
+                downloading = time.perf_counter()
+                data = self.yf.download(batch, group_by="ticker", auto_adjust=True,
+                                        threads=min(self.stock_fetch_workers, len(batch)), progress=False, **window)
+                # per-ticker share of the download, so fetch_stock covers batched and single fetches alike
+                per_ticker = (time.perf_counter() - downloading) / len(batch)
+            for _ in batch:
+                STAGE_SECONDS.observe(per_ticker, stage="fetch_stock")
+            
+            for ticker in batch:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    hist = data[ticker]
+                elif len(batch) == 1:
+                    hist = data
+                else:
                     continue
                 
-                # price analysis
-                latest_price = hist['Close'].iloc[-1]
-                first_price = hist['Close'].iloc[0]
-                price_change = latest_price - first_price
-                price_change_pct = (price_change / first_price) * 100
-                
-                high_price = hist['High'].max()
-                low_price = hist['Low'].min()
-                avg_volume = hist['Volume'].mean()
-                
-                # last 5 days prices
-                recent_prices = hist['Close'].tail()
-                price_string = "\n".join([f"  {date.strftime('%Y-%m-%d')}: {price:.2f}" 
-                                        for date, price in recent_prices.items()])
-                
-                content = f"""
+                hist = hist.dropna(how="all")
+                if not hist.empty:
+                    histories[ticker] = hist
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Batch {batch_no} YFinance'den çekilirken hata: {error}")
+        
+        stats = {
+            "batch": batch_no,
+            "tickers": len(batch),
+            "fetched": len(histories),
+            "missing": [t for t in batch if t not in histories],
+            "duration_sec": round(time.perf_counter() - started, 3),
+            "error": error
+        }
+        logger.info(f"Batch {batch_no}: {stats['fetched']}/{stats['tickers']} ticker "
+                    f"{stats['duration_sec']} sn içinde çekildi")
+        return histories, stats
+    
+    # Fetch a single ticker history, isolating any error to that ticker
+    def _fetch_single_stock_history(self, ticker: str, period: str,
+                                    start: Optional[str] = None) -> Optional[pd.DataFrame]:
+        try:
+            logger.info(f"{ticker} verisi YFinance'den çekiliyor...")
+            window = {"start": start} if start else {"period": period}
+            with timed("fetch_stock"):
+                return self.yf.Ticker(ticker).history(**window)
+        except Exception as e:
+            logger.error(f"{ticker} verisi YFinance'den çekilirken hata: {str(e)}")
+            return None
+    
+    # Compute indicators for all symbols in one pass, keyed by symbol
+    def _compute_indicators(self, frames: Dict[str, pd.DataFrame], periods_per_year: int,
+                            freq: Optional[str] = None) -> Dict[str, Dict]:
+        try:
+            panel = price_panel({symbol: frame['close'] for symbol, frame in frames.items()}, freq=freq)
+            return compute_indicators(panel, periods_per_year).to_dict(orient="index")
+        except Exception as e:
+            logger.error(f"Teknik göstergeler hesaplanırken hata: {str(e)}")
+            return {}
+    
+    # Format indicator values as document lines (missing values are skipped)
+    def _indicator_lines(self, indicators: Optional[Dict], price_format: Callable[[float], str]) -> List[str]:
+        if not indicators:
+            return []
+        
+        def has(key: str) -> bool:
+            return pd.notna(indicators.get(key))
+        
+        lines = []
+        if has("return_pct"):
+            lines.append(f"- Son bar getirisi: {indicators['return_pct']:.2f}%")
+        if has("rolling_volatility_pct"):
+            lines.append(f"- Yıllık volatilite ({INDICATOR_VOLATILITY_WINDOW} bar): "
+                         f"{indicators['rolling_volatility_pct']:.2f}%")
+        if has("max_drawdown_pct"):
+            lines.append(f"- Maksimum düşüş: {indicators['max_drawdown_pct']:.2f}% "
+                         f"(zirveden uzaklık: {indicators['drawdown_pct']:.2f}%)")
+        if has("ma_short"):
+            lines.append(f"- {INDICATOR_MA_SHORT} günlük ortalama: {price_format(indicators['ma_short'])}")
+        if has("ma_long"):
+            lines.append(f"- {INDICATOR_MA_LONG} günlük ortalama: {price_format(indicators['ma_long'])}")
+        if has("rsi"):
+            lines.append(f"- RSI ({INDICATOR_RSI_WINDOW}): {indicators['rsi']:.1f}")
+        if has("correlation"):
+            lines.append(f"- En yüksek korelasyon: {indicators['most_correlated']} ({indicators['correlation']:.2f})")
+        return lines
+    
+    # Get finite indicator values for document metadata
+    def _indicator_metadata(self, indicators: Optional[Dict]) -> Dict:
+        if not indicators:
+            return {}
+        
+        keys = ("rolling_volatility_pct", "max_drawdown_pct", "drawdown_pct", "ma_short", "ma_long", "rsi")
+        metadata = {key: float(indicators[key]) for key in keys if pd.notna(indicators.get(key))}
+        if pd.notna(indicators.get("correlation")):
+            metadata["most_correlated"] = indicators["most_correlated"]
+        return metadata
+    
+    # Build the analysis document for one ticker history
+    def _build_stock_document(self, ticker: str, hist: pd.DataFrame, period: str,
+                              indicators: Optional[Dict] = None) -> Document:
+        # price analysis
+        latest_price = hist['close'].iloc[-1]
+        first_price = hist['close'].iloc[0]
+        price_change = latest_price - first_price
+        price_change_pct = (price_change / first_price) * 100
+        
+        high_price = hist['high'].max()
+        low_price = hist['low'].min()
+        avg_volume = hist['volume'].mean()
+        
+        # volatility calculation (same definition as crypto)
+        volatility = (hist['close'].max() - hist['close'].min()) / hist['close'].min() * 100
+        
+        # last 5 days prices
+        recent_prices = hist['close'].tail()
+        price_string = "\n".join([f"  {date.strftime('%Y-%m-%d')}: {price:.2f}" 
+                                for date, price in recent_prices.items()])
+        
+        indicator_lines = self._indicator_lines(indicators, lambda value: f"{value:.2f} TL")
+        indicator_string = "\n\nTeknik göstergeler:\n" + "\n".join(indicator_lines) if indicator_lines else ""
+        
+        content = f"""
 {ticker} Hisse Senedi Analizi:
 - Son kapanış fiyatı: {latest_price:.2f} TL
 - Dönem değişimi: {price_change:.2f} TL ({price_change_pct:.2f}%)
@@ -64,101 +370,223 @@ class DataFetcher:
 - Ortalama işlem hacmi: {avg_volume:,.0f}
 
 Son 5 günlük kapanış fiyatları:
-{price_string}
+{price_string}{indicator_string}
 """
-                
-                documents.append(Document(
-                    page_content=content, 
-                    metadata={
-                        "ticker": ticker,
-                        "type": "stock",
-                        "source": "yfinance",
-                        "period": period,
-                        "latest_price": latest_price,
-                        "price_change_pct": price_change_pct
-                    }
-                ))
-                logger.info(f"{ticker} verisi YFinance'den başarıyla çekildi!")
-                
-            except Exception as e:
-                logger.error(f"{ticker} verisi YFinance'den çekilirken hata: {str(e)}")
-                continue
         
-        return documents
+        return Document(
+            page_content=content, 
+            metadata={
+                "ticker": ticker,
+                "type": "stock",
+                "source": "yfinance",
+                "period": period,
+                "latest_price": float(latest_price),
+                "price_change_pct": float(price_change_pct),
+                "volatility": float(volatility),
+                **self._indicator_metadata(indicators)
+            }
+        )
     
     # Fetch cryptocurrency data using CoinGecko API
     def fetch_crypto_data(self, coins: List[str], days: int = DEFAULT_CRYPTO_DAYS, 
-                         vs_currency: str = DEFAULT_VS_CURRENCY) -> List[Document]:
+                         vs_currency: str = DEFAULT_VS_CURRENCY,
+                         progress_callback: Optional[Callable[[int], None]] = None) -> List[Document]:
         documents = []
         
         if not coins:
             logger.warning("Kripto para bulunamadı!")
             return documents
         
-        for coin in coins:
-            try:
-                logger.info(f"{coin} kripto verisi çekiliyor...")
-                
-                # Rate limiting için bekle
-                time.sleep(2)
+        # indicators and detail chunks need more days than short windows hold; summaries are sliced back
+        # below. CoinGecko answers ranges over 90 days with daily points; incremental refreshes add hourly ones
+        fetch_days = history_days(days)
+        
+        def fetch(coin: str) -> Dict:
+            logger.info(f"{coin} kripto verisi çekiliyor...")
+            last = self._stored_until(self._crypto_key(coin, vs_currency), fetch_days) \
+                if self.timeseries_store else None
+            
+            with timed("fetch_crypto"):
+                if last is None:
+                    return self.cg.get_coin_market_chart_by_id(id=coin, vs_currency=vs_currency,
+                                                               days=fetch_days)
                 
-                # Basit API çağrısı
-                market_data = self.cg.get_coin_market_chart_by_id(
-                    id=coin, 
-                    vs_currency=vs_currency, 
-                    days=days
+                # points after the last stored one (naive UTC timestamps); overlapping hours are replaced
+                now = time.time()
+                return self.cg.get_coin_market_chart_range_by_id(
+                    id=coin,
+                    vs_currency=vs_currency,
+                    from_timestamp=int(min(last.timestamp(), now - CRYPTO_MIN_RANGE.total_seconds())),
+                    to_timestamp=int(now)
                 )
-                
-                if not market_data or 'prices' not in market_data:
+        
+        def on_result(coin: str, market_data: Dict, error: Optional[Exception]) -> None:
+            if progress_callback and error is None:
+                progress_callback(1)
+        
+        # requests run concurrently under the CoinGecko quota
+        start = time.perf_counter()
+        results = self.crypto_scheduler.map(fetch, coins, on_result=on_result)
+        
+        frames = {}
+        for coin, market_data, error in results:
+            if error is not None:
+                logger.error(f"{coin} verisi çekilirken hata: {str(error)}")
+                continue
+            
+            try:
+                frame = self._market_chart_to_frame(market_data)
+                if self.timeseries_store:
+                    key = self._crypto_key(coin, vs_currency)
+                    self.timeseries_store.append(key, frame)
+                    frame = self.timeseries_store.read(key, fetch_days)
+                if frame.empty:
                     logger.warning(f"{coin} için veri bulunamadı!")
                     continue
+                frames[coin] = frame
+            except Exception as e:
+                logger.error(f"{coin} verisi işlenirken hata: {str(e)}")
+        
+        # hourly points are reduced to daily closes for the indicator panel
+        indicators = self._compute_indicators(
+            {coin: window(frame, indicator_days(days)) for coin, frame in frames.items()},
+            CRYPTO_PERIODS_PER_YEAR, freq="1D"
+        )
+        
+        for coin in (coin for coin in coins if coin in frames):
+            try:
+                documents.append(self._build_crypto_document(coin, window(frames[coin], days), days, vs_currency,
+                                                             indicators.get(coin)))
+                logger.info(f"{coin} verisi başarıyla çekildi!")
                 
-                prices = market_data['prices']
-                volumes = market_data.get('total_volumes', [])
-                
-                if not prices:
-                    continue
-                
-                # price analysis
-                latest_price = prices[-1][1]
-                first_price = prices[0][1]
-                price_change = latest_price - first_price
-                price_change_pct = (price_change / first_price) * 100
-                
-                # volatility calculation
-                price_values = [p[1] for p in prices]
-                volatility = (max(price_values) - min(price_values)) / min(price_values) * 100
-                
-                content = f"""
+            except Exception as e:
+                logger.error(f"{coin} verisi işlenirken hata: {str(e)}")
+                continue
+        fetched = len(documents)
+        
+        if HIERARCHICAL_ENABLED:
+            for coin in (coin for coin in coins if coin in frames):
+                history = self.timeseries_store.read(self._crypto_key(coin, vs_currency), DETAIL_HISTORY_DAYS) \
+                    if self.timeseries_store else frames[coin]
+                documents.extend(self._build_detail_documents(
+                    coin.upper(), history, {"coin": coin, "type": "crypto", "vs_currency": vs_currency},
+                    lambda value: f"${value:,.2f}"
+                ))
+        
+        self.last_crypto_fetch_stats = {
+            "coins": len(coins),
+            "fetched": fetched,
+            "duration_sec": round(time.perf_counter() - start, 3),
+            "scheduler": self.crypto_scheduler.get_stats()
+        }
+        return documents
+    
+    # Get the time series store key of a coin priced in a currency
+    def _crypto_key(self, coin: str, vs_currency: str) -> str:
+        return f"{coin}-{vs_currency}"
+    
+    # Convert a CoinGecko market chart into a price/volume frame
+    def _market_chart_to_frame(self, market_data: Dict) -> pd.DataFrame:
+        if not market_data or not market_data.get('prices'):
+            return pd.DataFrame(columns=["close", "volume"])
+        
+        prices = pd.DataFrame(market_data['prices'], columns=["timestamp", "close"])
+        volumes = pd.DataFrame(market_data.get('total_volumes') or [], columns=["timestamp", "volume"])
+        frame = prices.merge(volumes, on="timestamp", how="left")
+        # CoinGecko points sit at arbitrary minutes; flooring to the hour lets refetched points replace stored ones
+        frame.index = pd.to_datetime(frame.pop("timestamp"), unit="ms").dt.floor("h")
+        return frame[~frame.index.duplicated(keep="last")]
+    
+    # Build the analysis document for one coin's price series
+    def _build_crypto_document(self, coin: str, frame: Optional[pd.DataFrame], days: int,
+                               vs_currency: str, indicators: Optional[Dict] = None) -> Optional[Document]:
+        if frame is None or frame.empty:
+            return None
+        
+        prices = frame['close']
+        
+        # price analysis
+        latest_price = prices.iloc[-1]
+        first_price = prices.iloc[0]
+        price_change = latest_price - first_price
+        price_change_pct = (price_change / first_price) * 100
+        
+        # volatility calculation
+        high_price = prices.max()
+        low_price = prices.min()
+        volatility = (high_price - low_price) / low_price * 100
+        
+        indicator_lines = self._indicator_lines(indicators, lambda value: f"${value:,.2f}")
+        indicator_string = "\n\nTeknik göstergeler:\n" + "\n".join(indicator_lines) if indicator_lines else ""
+        
+        content = f"""
 {coin.upper()} Kripto Para Analizi:
 - Son fiyat: ${latest_price:,.2f} {vs_currency.upper()}
 - {days} günlük değişim: ${price_change:,.2f} ({price_change_pct:.2f}%)
 - Volatilite: {volatility:.2f}%
-- En yüksek fiyat: ${max(price_values):,.2f}
-- En düşük fiyat: ${min(price_values):,.2f}
+- En yüksek fiyat: ${high_price:,.2f}
+- En düşük fiyat: ${low_price:,.2f}
 
 Son 5 günlük fiyat trendi:
-{chr(10).join([f"Gün {i+1}: ${p[1]:,.2f}" for i, p in enumerate(prices[-5:])])}
+{chr(10).join([f"Gün {i+1}: ${price:,.2f}" for i, price in enumerate(prices.tail(5))])}{indicator_string}
 """
-                
-                documents.append(Document(
-                    page_content=content,
-                    metadata={
-                        "coin": coin,
-                        "type": "crypto",
-                        "days": days,
-                        "vs_currency": vs_currency,
-                        "latest_price": latest_price,
-                        "price_change_pct": price_change_pct,
-                        "volatility": volatility
-                    }
-                ))
-                logger.info(f"{coin} verisi başarıyla çekildi!")
-                
-            except Exception as e:
-                logger.error(f"{coin} verisi çekilirken hata: {str(e)}")
-                continue
         
+        return Document(
+            page_content=content,
+            metadata={
+                "coin": coin,
+                "type": "crypto",
+                "days": days,
+                "vs_currency": vs_currency,
+                "latest_price": float(latest_price),
+                "price_change_pct": float(price_change_pct),
+                "volatility": float(volatility),
+                **self._indicator_metadata(indicators)
+            }
+        )
+    
+    # Build weekly/monthly detail chunks of one asset's history, linked to its summary document
+    def _build_detail_documents(self, name: str, history: pd.DataFrame, base_metadata: Dict,
+                                price_format: Callable[[float], str]) -> List[Document]:
+        if history is None or history.empty:
+            return []
+        
+        symbol = base_metadata.get("ticker") or base_metadata.get("coin")
+        parent_id = f"{base_metadata['type']}:{symbol}"
+        documents = []
+        for granularity, bars in period_chunks(daily_bars(history)):
+            start, end = bars.index[0].strftime("%Y-%m-%d"), bars.index[-1].strftime("%Y-%m-%d")
+            open_price, close_price = bars['close'].iloc[0], bars['close'].iloc[-1]
+            change_pct = (close_price - open_price) / open_price * 100 if open_price else 0.0
+            
+            # weeks list every day, months only their week-end closes
+            closes = bars['close'] if granularity == "week" else bars['close'].resample("W").last().dropna()
+            close_string = "\n".join([f"  {date.strftime('%Y-%m-%d')}: {price_format(price)}"
+                                      for date, price in closes.items()])
+            volume_string = f"\n- Ortalama işlem hacmi: {bars['volume'].mean():,.0f}" \
+                if bars['volume'].notna().any() else ""
+            
+            content = f"""
+{name} {start} – {end} {"haftalık" if granularity == "week" else "aylık"} detay:
+- Dönem açılış/kapanış: {price_format(open_price)} → {price_format(close_price)} ({change_pct:.2f}%)
+- Dönem en yüksek: {price_format(bars['high'].max())}
+- Dönem en düşük: {price_format(bars['low'].min())}{volume_string}
+
+{"Günlük" if granularity == "week" else "Haftalık"} kapanışlar:
+{close_string}
+"""
+            
+            documents.append(Document(
+                page_content=content,
+                metadata={
+                    **base_metadata,
+                    "level": "detail",
+                    "parent_id": parent_id,
+                    "granularity": granularity,
+                    "period_start": start,
+                    "period_end": end
+                }
+            ))
         return documents
     
     # Get list of available BIST tickers
@@ -0,0 +1,174 @@
+"""
+Embedding Cache - İçerik Hash'ine Göre Disk Tabanlı Embedding Önbelleği
+Sadece yeni veya değişen metinler embedding modeline gönderilir
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_BATCH_SIZE
+from instrumentation import timed, CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+# Build the cache key for a text embedded with a given model
+def content_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite tabanlı, boyut sınırlı (LRU) embedding önbelleği"""
+
+    # Open (or create) the cache database
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connect()
+
+    # Open the database connection and create the schema if needed
+    def _connect(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+
+    # Get cached vectors for the given keys; missing keys are omitted
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        if not keys:
+            return found
+
+        with self._lock:
+            # stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                       [(now, key) for key in found])
+                self._conn.commit()
+
+        return found
+
+    # Store vectors and evict the least recently used entries over the limit
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)", (overflow,)
+                )
+                logger.info(f"Embedding cache'ten {overflow} eski kayıt silindi")
+            self._conn.commit()
+
+    # Get number of cached vectors
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # Open a fresh connection in a forked process (the inherited one belongs to the parent)
+    def reopen(self) -> None:
+        self._lock = threading.Lock()
+        self._connect()
+
+    # Close the database connection
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Önbellekte olmayan metinleri batch halinde embed eden sarmalayıcı"""
+
+    # Wrap an embeddings backend with a content-hash cache
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: str,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.stats = {"hits": 0, "misses": 0}
+
+    # Embed documents, calling the backend only for uncached texts
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [content_key(self.model_name, text) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+
+        # each distinct uncached text is embedded once
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                pending.setdefault(key, text)
+
+        self.stats["hits"] += len(texts) - len(pending)
+        self.stats["misses"] += len(pending)
+        CACHE_LOOKUPS.inc(len(texts) - len(pending), cache="embedding", result="hit")
+        CACHE_LOOKUPS.inc(len(pending), cache="embedding", result="miss")
+
+        if pending:
+            logger.info(f"{len(pending)}/{len(texts)} metin embed ediliyor (geri kalanı cache'ten)")
+            pending_keys = list(pending)
+            for i in range(0, len(pending_keys), self.batch_size):
+                batch_keys = pending_keys[i:i + self.batch_size]
+                with timed("embed_documents"):
+                    vectors = self.embeddings.embed_documents([pending[key] for key in batch_keys])
+                fresh = dict(zip(batch_keys, vectors))
+                self.cache.put_many(fresh)
+                cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+    # Embed a query with the backend (queries are not cached)
+    def embed_query(self, text: str) -> List[float]:
+        with timed("embed_query"):
+            return self.embeddings.embed_query(text)
+
+    # Embed many queries with one backend call, bypassing the cache so ad-hoc questions can't evict
+    # document vectors (every configured provider embeds queries and documents the same way)
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        with timed("embed_query"):
+            return self.embeddings.embed_documents(texts)
+
+    # Embed a query with the backend's async client
+    async def aembed_query(self, text: str) -> List[float]:
+        with timed("embed_query"):
+            return await self.embeddings.aembed_query(text)
+
+    # Get cache hit/miss counters
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
@@ -1,10 +1,21 @@
+import json
 import logging
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
 
+from background_refresher import BackgroundRefresher, LeaderLock
 from data_fetcher import DataFetcher
+from index_store import IndexStore
+from index_shards import UNSHARDED
+from initialization_job import InitializationProgress
+from query_router import QueryRouter
+from timeseries_store import TimeSeriesStore
 from rag_system import FinanceRAG
-from config import validate_config
+from instrumentation import QUESTIONS
+from config import (validate_config, INDEX_PERSIST_ENABLED, DEFAULT_STOCK_PERIOD, DEFAULT_CRYPTO_DAYS,
+                    BACKGROUND_REFRESH_ENABLED, STOCK_REFRESH_INTERVAL, CRYPTO_REFRESH_INTERVAL,
+                    BATCH_MAX_QUESTIONS, QUERY_ROUTER_ENABLED, TIMESERIES_ENABLED, INDEX_RELOAD_INTERVAL,
+                    SHARDED_INDEX_ENABLED)
 
 logger = logging.getLogger(__name__)
 
@@ -12,16 +23,26 @@ class FinanceRAGService:
     """Finance RAG Servis Sınıfı - OOP Tabanlı"""
     
     # Initialize FinanceRAGService with default settings
-    def __init__(self):
+    def __init__(self, progress: Optional[InitializationProgress] = None,
+                 background_refresh: bool = BACKGROUND_REFRESH_ENABLED,
+                 data_fetcher: Optional[DataFetcher] = None,
+                 tickers: Optional[List[str]] = None, coins: Optional[List[str]] = None):
         self.rag_system = None
-        self.data_fetcher = DataFetcher()
+        self.background_refresh = background_refresh
+        self.progress = progress or InitializationProgress()
+        self.data_fetcher = data_fetcher or DataFetcher(
+            timeseries_store=TimeSeriesStore() if TIMESERIES_ENABLED else None)
         self.is_ready = False
+        # why the last initialize() failed (None after a success)
+        self.init_error: Optional[str] = None
         self.initialization_time = None
         self.document_count = 0
+        self.refresher = None
+        self.query_router = QueryRouter() if QUERY_ROUTER_ENABLED else None
         
         # Default settings
-        self.default_tickers = self.data_fetcher.get_available_tickers()
-        self.default_coins = self.data_fetcher.get_available_coins()
+        self.default_tickers = list(tickers) if tickers is not None else self.data_fetcher.get_available_tickers()
+        self.default_coins = list(coins) if coins is not None else self.data_fetcher.get_available_coins()
         
         logger.info("FinanceRAGService başlatıldı")
         
@@ -37,51 +58,155 @@ class FinanceRAGService:
             validate_config()
             
             # create RAG system
-            self.rag_system = FinanceRAG()
+            self.rag_system = FinanceRAG(index_store=IndexStore() if INDEX_PERSIST_ENABLED else None)
             logger.info("RAG sistemi oluşturuldu")
             
-            # fetch data
-            self._load_financial_data()
-            
-            # create vector store
-            self.rag_system.build_vector_store()
-            logger.info("Vector store oluşturuldu")
+            # warm start from the persisted index when it is still fresh
+            self.progress.start_phase("load_index")
+            if self.rag_system.load_index(self._data_keys()):
+                logger.info("Kayıtlı vector store kullanılıyor, veri çekme atlandı")
+            else:
+                # fetch data
+                self.rag_system.load_documents(self._fetch_financial_data(self.progress))
+                
+                # create vector store
+                self.progress.start_phase("build_index")
+                self.rag_system.build_vector_store()
+                self.rag_system.save_index(self._data_keys())
+                logger.info("Vector store oluşturuldu")
+            self.progress.set("docs_embedded", self.rag_system.get_document_count())
             
             # create QA chain
+            self.progress.start_phase("build_qa_chain")
             self.rag_system.build_qa_chain()
             logger.info("QA chain oluşturuldu")
             
             self.is_ready = True
+            self.init_error = None
             self.initialization_time = datetime.now()
             self.document_count = self.rag_system.get_document_count()
             
             logger.info(f"RAG sistemi başarıyla başlatıldı! {self.document_count} doküman yüklendi.")
+            
+            if self.background_refresh:
+                self.start_background_refresh()
             return True
             
         except Exception as e:
             logger.error(f"RAG sistemi başlatılamadı: {str(e)}")
             self.is_ready = False
+            self.init_error = str(e)
             return False
+        finally:
+            self.progress.end_phase()
+    
+    # Identify the data each persisted index shard was built from (markets with no symbols have no shard)
+    def _data_keys(self) -> Dict[str, str]:
+        stock = {"tickers": sorted(self.default_tickers), "period": DEFAULT_STOCK_PERIOD}
+        crypto = {"coins": sorted(self.default_coins), "days": DEFAULT_CRYPTO_DAYS}
+        if not SHARDED_INDEX_ENABLED:
+            return {UNSHARDED: json.dumps({**stock, **crypto}, sort_keys=True)}
+        
+        keys = {}
+        if self.default_tickers:
+            keys["stock"] = json.dumps(stock, sort_keys=True)
+        if self.default_coins:
+            keys["crypto"] = json.dumps(crypto, sort_keys=True)
+        return keys
+    
+    # Start periodic background refresh of stock and crypto data
+    def start_background_refresh(self, stock_interval: float = STOCK_REFRESH_INTERVAL,
+                                 crypto_interval: float = CRYPTO_REFRESH_INTERVAL) -> None:
+        if self.refresher and self.refresher.is_running():
+            return
+        
+        self.refresher = BackgroundRefresher()
+        self.refresher.add_job("stocks", stock_interval, self.refresh_stock_data)
+        self.refresher.add_job("crypto", crypto_interval, self.refresh_crypto_data)
+        self.refresher.start()
+    
+    # Start per-worker jobs after fork: follow new index versions, refresh data only as leader
+    def start_worker_services(self, leader_lock: LeaderLock) -> None:
+        self.rag_system.after_fork()
+        self.data_fetcher = DataFetcher(timeseries_store=TimeSeriesStore() if TIMESERIES_ENABLED else None)
+        
+        # non-leaders skip the fetch and pick the result up through the index reload job
+        def as_leader(fn):
+            return lambda: fn() if leader_lock.acquire() else True
+        
+        self.refresher = BackgroundRefresher()
+        self.refresher.add_job("index_reload", INDEX_RELOAD_INTERVAL, self.reload_index)
+        if BACKGROUND_REFRESH_ENABLED:
+            self.refresher.add_job("stocks", STOCK_REFRESH_INTERVAL, as_leader(self.refresh_stock_data))
+            self.refresher.add_job("crypto", CRYPTO_REFRESH_INTERVAL, as_leader(self.refresh_crypto_data))
+        self.refresher.start()
+    
+    # Serve the latest saved index version if another process wrote a newer one
+    def reload_index(self, force: bool = False) -> bool:
+        self._adopt_saved_symbols()
+        if self.rag_system.reload_latest_index(self._data_keys(), force=force):
+            self.document_count = self.rag_system.get_document_count()
+        return True
+    
+    # Add symbols another worker added (add_custom_tickers/coins) from the saved index manifests,
+    # so this worker's data keys match the saved shards instead of rejecting them as stale
+    def _adopt_saved_symbols(self) -> None:
+        names = ["stock", "crypto"] if SHARDED_INDEX_ENABLED else [UNSHARDED]
+        for data_key in self.rag_system.saved_data_keys(names).values():
+            try:
+                saved = json.loads(data_key)
+            except ValueError:
+                continue
+            
+            if saved.get("period") == DEFAULT_STOCK_PERIOD:
+                new_tickers = [t for t in saved.get("tickers", []) if t not in self.default_tickers]
+                self.default_tickers.extend(new_tickers)
+            if saved.get("days") == DEFAULT_CRYPTO_DAYS:
+                new_coins = [c for c in saved.get("coins", []) if c not in self.default_coins]
+                self.default_coins.extend(new_coins)
+    
+    # Stop the background refresher
+    def stop_background_refresh(self) -> None:
+        if self.refresher:
+            self.refresher.stop()
+    
+    # Refetch all stocks and swap them into the live index
+    def refresh_stock_data(self) -> bool:
+        return self._upsert_documents(self.data_fetcher.fetch_stock_data(list(self.default_tickers)))
     
-    # Load financial data from stock and crypto sources
-    def _load_financial_data(self):
+    # Refetch all coins and swap them into the live index
+    def refresh_crypto_data(self) -> bool:
+        return self._upsert_documents(self.data_fetcher.fetch_crypto_data(list(self.default_coins)))
+    
+    # Fetch stock and crypto documents without touching the live index
+    def _fetch_financial_data(self, progress: Optional[InitializationProgress] = None) -> List:
         logger.info("Finansal veriler yükleniyor...")
         
         # stock data fetching
         logger.info("Hisse senedi verileri çekiliyor...")
-        stock_docs = self.data_fetcher.fetch_stock_data(self.default_tickers)
+        if progress:
+            progress.start_phase("fetch_stocks")
+        stock_docs = self.data_fetcher.fetch_stock_data(
+            self.default_tickers,
+            progress_callback=(lambda n: progress.increment("tickers_fetched", n)) if progress else None
+        )
         
         # crypto data fetching
         logger.info("Kripto para verileri çekiliyor...")
-        crypto_docs = self.data_fetcher.fetch_crypto_data(self.default_coins)
+        if progress:
+            progress.start_phase("fetch_crypto")
+        crypto_docs = self.data_fetcher.fetch_crypto_data(
+            self.default_coins,
+            progress_callback=(lambda n: progress.increment("coins_fetched", n)) if progress else None
+        )
         
         # all documents loading
         all_docs = stock_docs + crypto_docs
         if not all_docs:
             raise ValueError("Hiç veri çekilemedi!")
         
-        self.rag_system.load_documents(all_docs)
-        logger.info(f"Toplam {len(all_docs)} doküman yüklendi")
+        logger.info(f"Toplam {len(all_docs)} doküman çekildi")
+        return all_docs
     
     # Ask a question and get enriched answer with metadata
     def ask_question(self, question: str) -> Dict:
@@ -94,24 +219,122 @@ class FinanceRAGService:
         logger.info(f"Soru soruluyor: {question}")
         
         try:
-            result = self.rag_system.ask_question(question)
-            
-            enriched_result = {
-                "question": result["question"],
-                "answer": result["answer"],
-                "sources": result["sources"],
-                "timestamp": datetime.now().isoformat(),
-                "document_count": len(result["sources"]),
-                "source_types": self._analyze_sources(result["sources"])
-            }
+            # ranking/comparison/filter questions skip retrieval and the LLM
+            result = self._route_question(question) or self.rag_system.ask_question(question)
+            logger.info("Soru başarıyla cevaplandı")
+            return self._enrich_result(result)
             
+        except Exception as e:
+            logger.error(f"Soru cevaplanırken hata: {str(e)}")
+            raise
+    
+    # Async variant of ask_question for the ASGI server
+    async def aask_question(self, question: str) -> Dict:
+        if not self.is_ready:
+            raise ValueError("RAG sistemi henüz hazır değil!")
+        
+        if not question.strip():
+            raise ValueError("Soru boş olamaz!")
+        
+        try:
+            result = self._route_question(question) or await self.rag_system.aask_question(question)
             logger.info("Soru başarıyla cevaplandı")
-            return enriched_result
+            return self._enrich_result(result)
             
         except Exception as e:
             logger.error(f"Soru cevaplanırken hata: {str(e)}")
             raise
     
+    # Add timestamp and source summary to an answer
+    def _enrich_result(self, result: Dict) -> Dict:
+        QUESTIONS.inc(route=result.get("route", "rag"))
+        return {
+            "question": result["question"],
+            "answer": result["answer"],
+            "sources": result["sources"],
+            "timestamp": datetime.now().isoformat(),
+            "document_count": len(result["sources"]),
+            "source_types": self._analyze_sources(result["sources"]),
+            "route": result.get("route", "rag"),
+            "context_tokens": result.get("context_tokens")
+        }
+    
+    # Answer a batch of questions; results keep input order with per-item errors
+    def ask_batch(self, questions: List[str]) -> List[Dict]:
+        if not self.is_ready:
+            raise ValueError("RAG sistemi henüz hazır değil!")
+        
+        if not questions:
+            raise ValueError("Soru listesi boş olamaz!")
+        
+        if len(questions) > BATCH_MAX_QUESTIONS:
+            raise ValueError(f"Tek seferde en fazla {BATCH_MAX_QUESTIONS} soru sorulabilir!")
+        
+        timestamp = datetime.now().isoformat()
+        
+        # numeric questions are answered from the metrics table, the rest go through RAG
+        routed = [self._route_question(q) if isinstance(q, str) else None for q in questions]
+        rag_positions = [i for i, result in enumerate(routed) if result is None]
+        rag_results = self.rag_system.ask_batch([questions[i] for i in rag_positions]) if rag_positions else []
+        for position, result in zip(rag_positions, rag_results):
+            routed[position] = result
+        
+        results = []
+        for result in routed:
+            if "error" in result:
+                results.append({"success": False, **result})
+            else:
+                QUESTIONS.inc(route=result.get("route", "rag"))
+                results.append({
+                    "success": True,
+                    **result,
+                    "timestamp": timestamp,
+                    "document_count": len(result["sources"]),
+                    "source_types": self._analyze_sources(result["sources"]),
+                    "route": result.get("route", "rag"),
+                    "context_tokens": result.get("context_tokens")
+                })
+        return results
+    
+    # Stream answer events (sources, tokens, done) with enriched final result
+    def stream_question(self, question: str) -> Iterator[Dict]:
+        if not self.is_ready:
+            raise ValueError("RAG sistemi henüz hazır değil!")
+        
+        if not question.strip():
+            raise ValueError("Soru boş olamaz!")
+        
+        routed = self._route_question(question)
+        events = self._routed_events(routed) if routed else self.rag_system.stream_question(question)
+        
+        for event in events:
+            if event["event"] == "done":
+                result = event["data"]
+                QUESTIONS.inc(route=result.get("route", "rag"))
+                event = {"event": "done", "data": {
+                    **result,
+                    "timestamp": datetime.now().isoformat(),
+                    "document_count": len(result["sources"]),
+                    "source_types": self._analyze_sources(result["sources"]),
+                    "route": result.get("route", "rag"),
+                    "context_tokens": result.get("context_tokens")
+                }}
+            yield event
+    
+    # Answer from the metrics table if the question is a numeric one
+    def _route_question(self, question: str) -> Optional[Dict]:
+        if not self.query_router or not question.strip():
+            return None
+        
+        result = self.query_router.route(question, self.rag_system.metrics_table)
+        return {**result, "question": question} if result else None
+    
+    # Emit a routed answer with the same events as a streamed RAG answer
+    def _routed_events(self, result: Dict) -> Iterator[Dict]:
+        yield {"event": "sources", "data": result["sources"]}
+        yield {"event": "token", "data": result["answer"]}
+        yield {"event": "done", "data": result}
+    
     # Analyze source types from retrieved documents
     def _analyze_sources(self, sources: List[Dict]) -> Dict:
         source_types = {
@@ -134,10 +357,18 @@ class FinanceRAGService:
             "is_ready": self.is_ready,
             "initialization_time": self.initialization_time.isoformat() if self.initialization_time else None,
             "document_count": self.document_count,
+            "detail_chunk_count": self.rag_system.get_detail_count() if self.rag_system else 0,
+            "shards": self.rag_system.get_shard_stats() if self.rag_system else None,
             "default_tickers": self.default_tickers,
             "default_coins": self.default_coins,
             "available_tickers": self.data_fetcher.get_available_tickers(),
-            "available_coins": self.data_fetcher.get_available_coins()
+            "available_coins": self.data_fetcher.get_available_coins(),
+            "stock_fetch_stats": self.data_fetcher.last_stock_fetch_stats,
+            "crypto_fetch_stats": self.data_fetcher.last_crypto_fetch_stats,
+            "background_refresh": self.refresher.get_status() if self.refresher else None,
+            "initialization_progress": self.progress.snapshot(),
+            "answer_cache": self.rag_system.get_cache_stats() if self.rag_system else None,
+            "single_flight": self.rag_system.get_single_flight_stats() if self.rag_system else None
         }
     
     # Reload all financial data and rebuild vector store
@@ -145,12 +376,14 @@ class FinanceRAGService:
         try:
             logger.info("Veriler yeniden yükleniyor...")
             
-            if self.rag_system:
-                self.rag_system.clear_documents()
+            if not self.rag_system:
+                return self.initialize()
             
-            self._load_financial_data()
-            self.rag_system.build_vector_store()
-            self.rag_system.build_qa_chain()
+            # the new index is built off to the side; queries keep using the old one
+            self.rag_system.replace_documents(self._fetch_financial_data())
+            self.rag_system.save_index(self._data_keys())
+            if not self.rag_system.qa_ready:
+                self.rag_system.build_qa_chain()
             
             self.document_count = self.rag_system.get_document_count()
             logger.info("Veriler başarıyla yeniden yüklendi")
@@ -160,7 +393,18 @@ class FinanceRAGService:
             logger.error(f"Veri yeniden yükleme hatası: {str(e)}")
             return False
     
-    # Add custom tickers with validation and reload data
+    # Upsert fetched documents into the live index and persist it
+    def _upsert_documents(self, docs: List) -> bool:
+        if not docs:
+            logger.warning("Eklenecek yeni veri çekilemedi!")
+            return False
+        
+        self.rag_system.upsert_documents(docs)
+        self.rag_system.save_index(self._data_keys())
+        self.document_count = self.rag_system.get_document_count()
+        return True
+    
+    # Add custom tickers with validation and upsert them into the index
     def add_custom_tickers(self, tickers: List[str]) -> bool:
         try:
             if not tickers:
@@ -175,16 +419,23 @@ class FinanceRAGService:
             logger.info(f"Özel ticker'lar ekleniyor: {valid_tickers}")
             
             # Yeni ticker'ları varsayılan listeye ekle
-            self.default_tickers.extend(valid_tickers)
-            self.default_tickers = list(set(self.default_tickers))  # Duplikatları kaldır
+            new_tickers = [t for t in dict.fromkeys(valid_tickers) if t not in self.default_tickers]
+            self.default_tickers.extend(new_tickers)
 
-            return self.reload_data()
+            if not self.is_ready:
+                return self.reload_data()
+            
+            if not new_tickers:
+                return True
+            
+            # only the new tickers are fetched and embedded
+            return self._upsert_documents(self.data_fetcher.fetch_stock_data(new_tickers))
             
         except Exception as e:
             logger.error(f"Özel ticker ekleme hatası: {str(e)}")
             return False
     
-    # Add custom cryptocurrencies with validation and reload data
+    # Add custom cryptocurrencies with validation and upsert them into the index
     def add_custom_coins(self, coins: List[str]) -> bool:
         try:
             if not coins:
@@ -197,10 +448,16 @@ class FinanceRAGService:
             
             logger.info(f"Özel kripto paralar ekleniyor: {valid_coins}")
 
-            self.default_coins.extend(valid_coins)
-            self.default_coins = list(set(self.default_coins)) 
+            new_coins = [c for c in dict.fromkeys(valid_coins) if c not in self.default_coins]
+            self.default_coins.extend(new_coins)
+            
+            if not self.is_ready:
+                return self.reload_data()
+            
+            if not new_coins:
+                return True
             
-            return self.reload_data()
+            return self._upsert_documents(self.data_fetcher.fetch_crypto_data(new_coins))
             
         except Exception as e:
             logger.error(f"Özel coin ekleme hatası: {str(e)}")
@@ -0,0 +1,19 @@
+"""
+Gunicorn Ayarları - Preload + Thread'li Worker'lar
+Uygulama master'da yüklenir (index bir kez oluşturulur), worker'lar fork ile paylaşır
+"""
+from config import SERVER_BIND, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT
+
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+worker_class = "gthread"
+threads = SERVER_THREADS
+# LLM calls and SSE streams can be slow
+timeout = SERVER_TIMEOUT
+preload_app = True
+
+
+# Start index reload and leader-only refresh jobs in each worker
+def post_fork(server, worker):
+    import wsgi
+    wsgi.post_fork()
@@ -0,0 +1,202 @@
+"""
+Hierarchical Index - Özet → Detay Doküman Hiyerarşisi
+Her varlık için ana index'te tek özet doküman, dönem bazlı detay parçaları ise varlık başına küçük matrislerde tutulur
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DETAIL_RECENT_WEEKS
+from instrumentation import timed
+from answer_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), ("year", "month", "day")),
+    (re.compile(r"\b(\d{1,2})[./](\d{1,2})[./](\d{4})\b"), ("day", "month", "year"))
+]
+
+MONTHS = ["ocak", "şubat", "mart", "nisan", "mayıs", "haziran",
+          "temmuz", "ağustos", "eylül", "ekim", "kasım", "aralık"]
+
+# "15 mart 2024" (a day) or "mart 2024" / "mart 2024'te" (the whole month); matched on normalized text
+MONTH_PATTERN = re.compile(r"\b(?:(\d{1,2}) )?(" + "|".join(MONTHS) + r")\w* (\d{4})\b")
+
+# "son 3 ay", "son bir hafta": the trailing window ending today
+LAST_PATTERN = re.compile(r"\bson (\d+|bir) (gün|hafta|ay|yıl)")
+
+# "geçen hafta", "bu ay": a calendar period relative to today
+CALENDAR_PATTERN = re.compile(r"\b(geçen|geçtiğimiz|önceki|bu) (hafta|ay|yıl)")
+
+UNIT_FREQS = {"hafta": "W", "ay": "M", "yıl": "Y"}
+UNIT_OFFSETS = {
+    "gün": lambda n: pd.DateOffset(days=n),
+    "hafta": lambda n: pd.DateOffset(weeks=n),
+    "ay": lambda n: pd.DateOffset(months=n),
+    "yıl": lambda n: pd.DateOffset(years=n)
+}
+
+
+# Check whether a document is a detail chunk
+def is_detail(doc) -> bool:
+    return doc.metadata.get("level") == "detail"
+
+
+# Split documents into asset summaries and detail chunks
+def split_levels(docs: List) -> Tuple[List, List]:
+    summaries, details = [], []
+    for doc in docs:
+        (details if is_detail(doc) else summaries).append(doc)
+    return summaries, details
+
+
+# Find the date range a question asks about: a date (ISO, day.month.year, "15 Mart 2024"), a month
+# ("Mart 2024") or a period relative to today ("geçen hafta", "son 3 ay", "dün"); bounds are inclusive days
+def parse_question_period(question: str, today: Optional[pd.Timestamp] = None
+                          ) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    for pattern, order in DATE_PATTERNS:
+        match = pattern.search(question)
+        if not match:
+            continue
+        parts = dict(zip(order, (int(group) for group in match.groups())))
+        try:
+            day = pd.Timestamp(datetime(parts["year"], parts["month"], parts["day"]))
+            return day, day
+        except ValueError:
+            continue
+
+    text = normalize_question(question)
+    match = MONTH_PATTERN.search(text)
+    if match:
+        day, month, year = match.groups()
+        try:
+            if day:
+                date = pd.Timestamp(datetime(int(year), MONTHS.index(month) + 1, int(day)))
+                return date, date
+            period = pd.Period(year=int(year), month=MONTHS.index(month) + 1, freq="M")
+            return period.start_time, period.end_time.normalize()
+        except ValueError:
+            pass
+
+    today = (today if today is not None else pd.Timestamp.now()).normalize()
+    match = LAST_PATTERN.search(text)
+    if match:
+        count = 1 if match.group(1) == "bir" else int(match.group(1))
+        return today - UNIT_OFFSETS[match.group(2)](count), today
+
+    match = CALENDAR_PATTERN.search(text)
+    if match:
+        period = pd.Period(today, freq=UNIT_FREQS[match.group(2)])
+        if match.group(1) == "bu":
+            return period.start_time, today
+        period -= 1
+        return period.start_time, period.end_time.normalize()
+
+    if re.search(r"\bdün\b", text):
+        return today - pd.Timedelta(days=1), today - pd.Timedelta(days=1)
+    if re.search(r"\bbugün\b", text):
+        return today, today
+    return None
+
+
+# Reduce a price frame (daily bars or intraday points) to daily close/high/low/volume
+def daily_bars(frame: pd.DataFrame) -> pd.DataFrame:
+    close = frame["close"]
+    high = frame["high"].fillna(close) if "high" in frame else close
+    low = frame["low"].fillna(close) if "low" in frame else close
+    volume = frame["volume"] if "volume" in frame else pd.Series(np.nan, index=frame.index)
+
+    daily = pd.DataFrame({
+        "close": close.resample("1D").last(),
+        "high": high.resample("1D").max(),
+        "low": low.resample("1D").min(),
+        "volume": volume.resample("1D").mean()
+    })
+    return daily.dropna(subset=["close"])
+
+
+# Split daily bars into weekly chunks for recent history and monthly chunks before that
+def period_chunks(daily: pd.DataFrame, recent_weeks: int = DETAIL_RECENT_WEEKS) -> List[Tuple[str, pd.DataFrame]]:
+    if daily.empty:
+        return []
+
+    # older history is coarser, so the chunk count grows by ~12 a year instead of ~52
+    cutoff = daily.index[-1] - pd.Timedelta(weeks=recent_weeks)
+    older, recent = daily[daily.index <= cutoff], daily[daily.index > cutoff]
+    chunks = [("month", group) for _, group in older.groupby(older.index.to_period("M")) if len(group)]
+    chunks += [("week", group) for _, group in recent.groupby(recent.index.to_period("W")) if len(group)]
+    return chunks
+
+
+class DetailIndex:
+    """Özet dokümana bağlı detay parçaları; arama yalnızca seçilen varlıkların parçalarında yapılır"""
+
+    # Initialize from per-parent (documents, vectors) pairs
+    def __init__(self, parents: Optional[Dict[str, Tuple[List, np.ndarray]]] = None):
+        self.parents: Dict[str, Tuple[List, np.ndarray]] = parents or {}
+
+    # Embed detail chunks and group them by parent
+    @classmethod
+    def build(cls, details: List, embeddings) -> "DetailIndex":
+        return cls().with_parents(details, embeddings)
+
+    # Get a copy where the parents of the given chunks hold exactly these chunks
+    def with_parents(self, details: List, embeddings) -> "DetailIndex":
+        parents = dict(self.parents)
+        if not details:
+            return DetailIndex(parents)
+
+        # one batched call; unchanged chunks are embedding cache hits
+        with timed("index_embed", level="detail"):
+            vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in details]), dtype=np.float32)
+
+        grouped: Dict[str, List[int]] = {}
+        for position, doc in enumerate(details):
+            grouped.setdefault(doc.metadata["parent_id"], []).append(position)
+        for parent_id, positions in grouped.items():
+            parents[parent_id] = ([details[p] for p in positions], vectors[positions])
+
+        logger.info(f"{len(details)} detay parçası {len(grouped)} varlık için güncellendi")
+        return DetailIndex(parents)
+
+    # Get a copy without the given parents' chunks
+    def without_parents(self, parent_ids: List[str]) -> "DetailIndex":
+        removed = set(parent_ids)
+        return DetailIndex({parent_id: entry for parent_id, entry in self.parents.items() if parent_id not in removed})
+
+    # Search only the chunks of the given parents; with `period`, only chunks overlapping it (if any) are ranked
+    def search(self, query_embedding: List[float], parent_ids: List[str], k: int,
+               period: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> List[Tuple[object, float]]:
+        docs, blocks = [], []
+        for parent_id in dict.fromkeys(parent_ids):
+            entry = self.parents.get(parent_id)
+            if entry:
+                docs.extend(entry[0])
+                blocks.append(entry[1])
+        if not docs:
+            return []
+
+        matrix = np.vstack(blocks)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        distances = ((matrix - query) ** 2).sum(axis=1)
+
+        positions = np.arange(len(docs))
+        if period is not None:
+            start, end = (bound.strftime("%Y-%m-%d") for bound in period)
+            dated = [i for i, doc in enumerate(docs)
+                     if doc.metadata.get("period_start", "") <= end and doc.metadata.get("period_end", "") >= start]
+            if dated:
+                positions = np.asarray(dated)
+
+        # same 1/(1+d) similarity as summary hits, so the context builder's distance cutoff applies to both
+        best = positions[np.argsort(distances[positions])[:k]]
+        return [(docs[i], 1.0 / (1.0 + float(distances[i]))) for i in best]
+
+    # Get the number of detail chunks
+    def __len__(self) -> int:
+        return sum(len(docs) for docs, _ in self.parents.values())
@@ -0,0 +1,111 @@
+"""
+Hybrid Retriever - Metadata Ön Filtreleme + BM25 + FAISS Skor Birleştirme
+Sorudaki hisse/coin ve varlık tipine göre aday dokümanlar daraltılır, sıralamalar RRF ile birleştirilir
+"""
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import HYBRID_BM25_K1, HYBRID_BM25_B, HYBRID_RRF_K, HYBRID_DENSE_WEIGHT, HYBRID_BM25_WEIGHT
+from metrics_table import MetricsTable, tokenize
+from query_router import detect_asset_type
+from answer_cache import normalize_question
+
+
+class BM25Index:
+    """Bellek içi Okapi BM25 keyword index'i"""
+
+    # Build postings from (doc_id, text) pairs
+    def __init__(self, doc_ids: List[str], texts: List[str], k1: float = HYBRID_BM25_K1, b: float = HYBRID_BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = doc_ids
+        self._postings: Dict[str, List] = defaultdict(list)
+        self._lengths = []
+
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings[term].append((position, tf))
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        n = len(doc_ids)
+        self._idf = {term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                     for term, postings in self._postings.items()}
+
+    # Score documents for a query, optionally only within a candidate set; best first
+    def search(self, query: str, candidates: Optional[Set[str]] = None) -> List[str]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for position, tf in self._postings[term]:
+                if candidates is not None and self.doc_ids[position] not in candidates:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / (self._avg_length or 1.0))
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [self.doc_ids[position] for position in ranked]
+
+
+class HybridRetriever:
+    """Sembol/tip ön filtresi, BM25 ve yoğun (FAISS) sıralamayı birleştiren retriever"""
+
+    # Build the metadata inverted index and BM25 index for the served documents
+    def __init__(self, documents: List, table: MetricsTable, doc_ids: List[str]):
+        self.table = table
+        self.by_symbol: Dict[str, Set[str]] = defaultdict(set)
+        self.by_type: Dict[str, Set[str]] = defaultdict(set)
+
+        for doc_id, doc in zip(doc_ids, documents):
+            symbol = doc.metadata.get("ticker") or doc.metadata.get("coin")
+            if symbol:
+                self.by_symbol[symbol].add(doc_id)
+            if doc.metadata.get("type"):
+                self.by_type[doc.metadata["type"]].add(doc_id)
+
+        self.bm25 = BM25Index(doc_ids, [doc.page_content for doc in documents])
+
+    # Narrow the candidates by named symbols, else by asset type (None means no filter)
+    def candidates(self, question: str) -> Optional[Set[str]]:
+        symbols = self.table.resolve_symbols(question)
+        if symbols:
+            return set().union(*(self.by_symbol.get(symbol, set()) for symbol in symbols))
+
+        asset_type = detect_asset_type(f" {normalize_question(question)} ")
+        if asset_type:
+            return set(self.by_type.get(asset_type, set()))
+        return None
+
+    # Fuse dense and BM25 rankings within the candidates and return the best document IDs
+    def rank(self, question: str, dense_ids: List[str], k: int) -> List[str]:
+        return [doc_id for doc_id, _ in self.rank_scored(question, dense_ids, k)]
+
+    # Like rank, with fused scores; pinned documents (named symbols) get None (always kept)
+    def rank_scored(self, question: str, dense_ids: List[str], k: int) -> List[Tuple[str, Optional[float]]]:
+        candidates = self.candidates(question)
+        if candidates is not None and not candidates:
+            candidates = None
+
+        dense = [doc_id for doc_id in dense_ids if candidates is None or doc_id in candidates]
+        keyword = self.bm25.search(question, candidates)
+
+        # reciprocal rank fusion: scale-free, so L2 distances and BM25 scores need no calibration
+        scores: Dict[str, float] = defaultdict(float)
+        for rank, doc_id in enumerate(dense):
+            scores[doc_id] += HYBRID_DENSE_WEIGHT / (HYBRID_RRF_K + rank + 1)
+        for rank, doc_id in enumerate(keyword):
+            scores[doc_id] += HYBRID_BM25_WEIGHT / (HYBRID_RRF_K + rank + 1)
+
+        # a small candidate set (e.g. the named symbols) is kept whole
+        pinned = candidates if candidates is not None and len(candidates) <= k else set()
+        for doc_id in pinned:
+            scores.setdefault(doc_id, 0.0)
+
+        # RRF scores only order the documents (ranks, not relevance), so k is the only limit here;
+        # weak chunks are dropped by the context builder's distance cutoff
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [(doc_id, None if doc_id in pinned else scores[doc_id]) for doc_id in ranked]
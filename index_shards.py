@@ -0,0 +1,87 @@
+"""
+Index Shards - Piyasa Bazlı Index Parçaları
+Hisse ve kripto dokümanları ayrı FAISS index'lerinde tutulur; her parça bağımsız güncellenir, sorgular ilgili parçaya yönlendirilir
+"""
+import logging
+from typing import Dict, List, Optional
+
+from config import SHARDED_INDEX_ENABLED, HYBRID_RETRIEVAL_ENABLED
+from answer_cache import normalize_question
+from hierarchical_index import DetailIndex
+from hybrid_retriever import HybridRetriever
+from metrics_table import MetricsTable
+from query_router import detect_asset_type
+
+logger = logging.getLogger(__name__)
+
+# single shard name used when sharding is disabled
+UNSHARDED = "all"
+
+
+# Get the shard a document belongs to (its asset type)
+def shard_of(doc) -> str:
+    return doc.metadata.get("type", "doc") if SHARDED_INDEX_ENABLED else UNSHARDED
+
+
+# Get the shard of a stable document ID ("stock:ASELS.IS" -> "stock")
+def shard_of_id(doc_id: str) -> str:
+    return doc_id.split(":", 1)[0] if SHARDED_INDEX_ENABLED else UNSHARDED
+
+
+# Group documents by shard, preserving order
+def group_by_shard(docs: List) -> Dict[str, List]:
+    groups: Dict[str, List] = {}
+    for doc in docs:
+        groups.setdefault(shard_of(doc), []).append(doc)
+    return groups
+
+
+# Get documents of a vector store in index order
+def documents_of(vector_store) -> List:
+    return [vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            for i in range(len(vector_store.index_to_docstore_id))]
+
+
+# Pick the shards a question targets: the markets of named symbols, else a named asset type, else all
+def route_shards(question: Optional[str], table: Optional[MetricsTable], names: List[str]) -> List[str]:
+    if len(names) <= 1 or not question:
+        return names
+
+    symbols = table.resolve_symbols(question) if table is not None else []
+    if symbols:
+        markets = set(table.select(symbols)["type"])
+    else:
+        asset_type = detect_asset_type(f" {normalize_question(question)} ")
+        markets = {asset_type} if asset_type else set()
+
+    targets = [name for name in names if name in markets]
+    return targets or names
+
+
+class Shard:
+    """Tek piyasanın servis edilen index'i: FAISS store, özet dokümanlar, metrik tablosu ve detay parçaları"""
+
+    # Wrap a fully built vector store; version is the saved IndexStore version (None until saved)
+    def __init__(self, name: str, vector_store, detail_index: Optional[DetailIndex] = None,
+                 version: Optional[str] = None, documents: Optional[List] = None):
+        self.name = name
+        self.vector_store = vector_store
+        self.detail_index = detail_index or DetailIndex()
+        self.version = version
+        self.documents = documents if documents is not None else documents_of(vector_store)
+        # set when swapped into service; cached answers remember the generations they read
+        self.generation = 0
+        
+        # built with the shard (outside the swap lock), so updating one market never re-reads the others
+        doc_ids = [vector_store.index_to_docstore_id[i] for i in range(len(self.documents))]
+        self.table = MetricsTable(self.documents)
+        self.retriever = HybridRetriever(self.documents, self.table, doc_ids) if HYBRID_RETRIEVAL_ENABLED else None
+
+    # Get the document stored under a stable ID (None if this shard doesn't have it)
+    def get(self, doc_id: str):
+        doc = self.vector_store.docstore.search(doc_id)
+        return None if isinstance(doc, str) else doc
+
+    # Get document and detail chunk counts
+    def get_stats(self) -> Dict:
+        return {"documents": len(self.documents), "detail_chunks": len(self.detail_index), "version": self.version}
@@ -0,0 +1,184 @@
+"""
+Index Store - FAISS Vector Store Kalıcılık Sınıfı
+Index ve docstore'u versiyonlu dizinlere kaydeder, açılışta geri yükler
+"""
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from config import INDEX_DIR, INDEX_KEEP_VERSIONS, INDEX_MMAP
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+INDEX_NAME = "index"
+DETAILS_FILE = "details.pkl"
+
+
+class IndexStore:
+    """Versiyonlu dizinlerde FAISS index kalıcılığı"""
+
+    # Initialize store rooted at the given directory
+    def __init__(self, root: str = INDEX_DIR, keep_versions: int = INDEX_KEEP_VERSIONS, mmap: bool = INDEX_MMAP):
+        self.root = root
+        self.keep_versions = max(1, keep_versions)
+        self.mmap = mmap
+        os.makedirs(self.root, exist_ok=True)
+
+    # Get the store of one index shard (a subdirectory with its own versions and LATEST pointer)
+    def shard(self, name: str) -> "IndexStore":
+        return IndexStore(os.path.join(self.root, name), self.keep_versions, self.mmap)
+
+    # List existing version directory names, oldest first
+    def _versions(self) -> List[str]:
+        versions = [d for d in os.listdir(self.root)
+                    if d.startswith("v") and d[1:].isdigit() and os.path.isdir(os.path.join(self.root, d))]
+        return sorted(versions, key=lambda d: int(d[1:]))
+
+    # Get the directory name the LATEST pointer refers to
+    def latest_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, LATEST_FILE), encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        return version if os.path.isdir(os.path.join(self.root, version)) else None
+
+    # Read the manifest of the latest version
+    def latest_manifest(self) -> Optional[Dict]:
+        version = self.latest_version()
+        if not version:
+            return None
+
+        try:
+            with open(os.path.join(self.root, version, MANIFEST_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Index manifest okunamadı ({version}): {str(e)}")
+            return None
+
+    # Save vector store, docstore and detail chunks as a new version and point LATEST at it
+    def save(self, vector_store: FAISS, embedding_model: str, data_key: str = "", details=None) -> str:
+        tmp_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        vector_store.save_local(tmp_dir, index_name=INDEX_NAME)
+        if details is not None:
+            with open(os.path.join(tmp_dir, DETAILS_FILE), "wb") as f:
+                pickle.dump(details, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = {
+            "created_at": time.time(),
+            "embedding_model": embedding_model,
+            "data_key": data_key,
+            "document_count": len(vector_store.index_to_docstore_id),
+            "detail_count": len(details) if details is not None else 0,
+            "faiss_version": getattr(faiss, "__version__", None)
+        }
+
+        # claim the next free version number; rename is atomic on the same filesystem
+        versions = self._versions()
+        number = int(versions[-1][1:]) + 1 if versions else 1
+        while True:
+            version = f"v{number:06d}"
+            manifest["version"] = version
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            try:
+                os.rename(tmp_dir, os.path.join(self.root, version))
+                break
+            except OSError:
+                number += 1
+
+        pointer_tmp = os.path.join(self.root, f".{LATEST_FILE}-{uuid.uuid4().hex}")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(self.root, LATEST_FILE))
+
+        self._prune(version)
+        logger.info(f"Vector store diske kaydedildi: {version} ({manifest['document_count']} doküman)")
+        return version
+
+    # Remove old versions beyond the retention count
+    def _prune(self, current: str) -> None:
+        versions = [v for v in self._versions() if v != current]
+        for version in versions[:max(0, len(versions) - (self.keep_versions - 1))]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+    # Check whether the latest manifest can serve a warm start
+    def is_fresh(self, manifest: Optional[Dict], embedding_model: str, data_key: str = "",
+                 max_age: Optional[float] = None) -> bool:
+        if not manifest:
+            return False
+
+        if manifest.get("embedding_model") != embedding_model:
+            logger.info("Kayıtlı index farklı bir embedding modeliyle oluşturulmuş, yeniden oluşturulacak")
+            return False
+
+        if manifest.get("data_key") != data_key:
+            logger.info("Kayıtlı index farklı bir sembol listesiyle oluşturulmuş, yeniden oluşturulacak")
+            return False
+
+        if max_age is not None and time.time() - manifest.get("created_at", 0) > max_age:
+            logger.info("Kayıtlı index eskimiş, yeniden oluşturulacak")
+            return False
+
+        return True
+
+    # Load the latest version if it is fresh; returns None otherwise
+    def load(self, embeddings, embedding_model: str, data_key: str = "",
+             max_age: Optional[float] = None) -> Optional[FAISS]:
+        manifest = self.latest_manifest()
+        if not self.is_fresh(manifest, embedding_model, data_key, max_age):
+            return None
+
+        return self.load_version(manifest["version"], embeddings)
+
+    # Load a specific version, memory-mapping the FAISS index when possible
+    def load_version(self, version: str, embeddings) -> Optional[FAISS]:
+        path = os.path.join(self.root, version)
+        try:
+            index = self._read_index(os.path.join(path, f"{INDEX_NAME}.faiss"))
+            with open(os.path.join(path, f"{INDEX_NAME}.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+        except (OSError, RuntimeError, pickle.UnpicklingError) as e:
+            logger.warning(f"Kayıtlı index yüklenemedi ({version}): {str(e)}")
+            return None
+
+        logger.info(f"Vector store diskten yüklendi: {version}")
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+
+    # Load the detail chunks saved with a version (None if it has none)
+    def load_details(self, version: str):
+        path = os.path.join(self.root, version, DETAILS_FILE)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Kayıtlı detay parçaları yüklenemedi ({version}): {str(e)}")
+            return None
+
+    # Read a FAISS index file, falling back to a full read if mmap is unsupported
+    def _read_index(self, path: str):
+        if self.mmap:
+            try:
+                return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                logger.info("Index tipi mmap desteklemiyor, belleğe okunuyor")
+        return faiss.read_index(path)
@@ -0,0 +1,124 @@
+"""
+Indicators - Vektörel Teknik Gösterge Hesaplama
+Tüm semboller için getiri, volatilite, düşüş, ortalama, RSI ve korelasyon tek geçişte hesaplanır
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import (INDICATOR_MA_SHORT, INDICATOR_MA_LONG, INDICATOR_RSI_WINDOW,
+                    INDICATOR_VOLATILITY_WINDOW, INDICATOR_MIN_CORRELATION_PERIODS)
+
+
+# Align close series of many symbols into one date x symbol panel
+def price_panel(closes: Dict[str, pd.Series], freq: Optional[str] = None) -> pd.DataFrame:
+    series = {}
+    for symbol, close in closes.items():
+        if close is None or close.empty:
+            continue
+        close = close.astype(float)
+        # intraday points (e.g. hourly crypto) are reduced to one close per bar
+        series[symbol] = close.resample(freq).last().dropna() if freq else close
+
+    if not series:
+        return pd.DataFrame()
+
+    # gaps inside a symbol's history carry the last close; leading gaps stay NaN
+    return pd.concat(series, axis=1).sort_index().ffill()
+
+
+# Get simple returns of each column (first row is NaN)
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    result = np.full(prices.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[1:] = prices[1:] / prices[:-1] - 1.0
+    return result
+
+
+# Rolling mean over the time axis, NaN until a full window of values is available
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+
+    result = np.full(values.shape, np.nan)
+    full = counts == window
+    result[full] = sums[full] / window
+    return result
+
+
+# Rolling sample standard deviation over the time axis
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    mean = rolling_mean(values, window)
+    mean_sq = rolling_mean(values ** 2, window)
+    variance = np.maximum(mean_sq - mean ** 2, 0.0) * window / max(window - 1, 1)
+    return np.sqrt(variance)
+
+
+# Drawdown from the running peak (0 at a new high, negative below it)
+def drawdown(prices: np.ndarray) -> np.ndarray:
+    peaks = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return prices / peaks - 1.0
+
+
+# Relative strength index using simple averages of gains and losses
+def rsi(prices: np.ndarray, window: int) -> np.ndarray:
+    changes = np.full(prices.shape, np.nan)
+    changes[1:] = np.diff(prices, axis=0)
+    avg_gain = rolling_mean(np.where(np.isnan(changes), np.nan, np.maximum(changes, 0.0)), window)
+    avg_loss = rolling_mean(np.where(np.isnan(changes), np.nan, np.maximum(-changes, 0.0)), window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # no losses in the window means maximum strength
+    return np.where((avg_loss == 0) & (avg_gain > 0), 100.0, result)
+
+
+# Get the last non-NaN value of each column
+def last_valid(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    rows = values.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    result = values[rows, np.arange(values.shape[1])]
+    result[~valid.any(axis=0)] = np.nan
+    return result
+
+
+# Compute the latest indicator values for every symbol in the panel
+def compute_indicators(panel: pd.DataFrame, periods_per_year: int) -> pd.DataFrame:
+    columns = ["return_pct", "rolling_volatility_pct", "max_drawdown_pct", "drawdown_pct",
+               "ma_short", "ma_long", "rsi", "most_correlated", "correlation"]
+    if panel.empty:
+        return pd.DataFrame(columns=columns)
+
+    prices = panel.to_numpy(dtype=float)
+    returns = simple_returns(prices)
+    drawdowns = drawdown(prices)
+
+    indicators = pd.DataFrame({
+        "return_pct": last_valid(returns) * 100,
+        "rolling_volatility_pct": last_valid(rolling_std(returns, INDICATOR_VOLATILITY_WINDOW))
+                                  * np.sqrt(periods_per_year) * 100,
+        "max_drawdown_pct": np.where(np.isnan(drawdowns), 0.0, drawdowns).min(axis=0) * 100,
+        "drawdown_pct": last_valid(drawdowns) * 100,
+        "ma_short": last_valid(rolling_mean(prices, INDICATOR_MA_SHORT)),
+        "ma_long": last_valid(rolling_mean(prices, INDICATOR_MA_LONG)),
+        "rsi": last_valid(rsi(prices, INDICATOR_RSI_WINDOW))
+    }, index=panel.columns)
+
+    # strongest positive return correlation with another symbol
+    indicators["most_correlated"] = None
+    indicators["correlation"] = np.nan
+    if len(panel.columns) > 1:
+        corr = pd.DataFrame(returns, columns=panel.columns).corr(min_periods=INDICATOR_MIN_CORRELATION_PERIODS)
+        matrix = corr.to_numpy(copy=True)
+        np.fill_diagonal(matrix, np.nan)
+        has_peer = ~np.isnan(matrix).all(axis=1)
+        best = np.argmax(np.where(np.isnan(matrix), -np.inf, matrix), axis=1)
+        indicators.loc[has_peer, "most_correlated"] = panel.columns[best[has_peer]].tolist()
+        indicators.loc[has_peer, "correlation"] = matrix[np.arange(len(best)), best][has_peer]
+
+    return indicators[columns]
@@ -0,0 +1,142 @@
+"""
+Initialization Job - Arka Plan Başlatma İşi ve İlerleme Takibi
+RAG servisini HTTP isteğinden bağımsız olarak başlatır
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from instrumentation import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class InitializationProgress:
+    """Başlatma aşamaları ve sayaçları - thread-safe"""
+
+    # Initialize empty progress state
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phase = None
+        self.phases: Dict[str, Dict] = {}
+        self.counters = {"tickers_fetched": 0, "coins_fetched": 0, "docs_embedded": 0}
+
+    # Mark the start of a phase, closing the previous one
+    def start_phase(self, name: str) -> None:
+        with self._lock:
+            self._close_phase()
+            self.phase = name
+            self.phases[name] = {"started_at": time.monotonic(), "elapsed_sec": None}
+        logger.info(f"Başlatma aşaması: {name}")
+
+    # Close the current phase
+    def end_phase(self) -> None:
+        with self._lock:
+            self._close_phase()
+            self.phase = None
+
+    # Record elapsed time of the current phase (lock must be held)
+    def _close_phase(self) -> None:
+        if self.phase and self.phases[self.phase]["elapsed_sec"] is None:
+            phase = self.phases[self.phase]
+            elapsed = time.monotonic() - phase["started_at"]
+            phase["elapsed_sec"] = round(elapsed, 3)
+            STAGE_SECONDS.observe(elapsed, stage=f"init_{self.phase}")
+            logger.info(f"Başlatma aşaması tamamlandı: {self.phase} ({elapsed:.2f} sn)")
+
+    # Add to a counter
+    def increment(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    # Set a counter
+    def set(self, key: str, value: int) -> None:
+        with self._lock:
+            self.counters[key] = value
+
+    # Get a JSON-serializable snapshot
+    def snapshot(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "phase": self.phase,
+                "phases": {
+                    name: phase["elapsed_sec"] if phase["elapsed_sec"] is not None
+                    else round(now - phase["started_at"], 3)
+                    for name, phase in self.phases.items()
+                },
+                **self.counters
+            }
+
+
+class InitializationJob:
+    """Tek seferlik arka plan başlatma işi"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    # Create a job that builds its result with the given factory; error_of explains an unsuccessful result
+    def __init__(self, factory: Callable[[InitializationProgress], Any],
+                 is_success: Callable[[Any], bool] = lambda result: result is not None,
+                 error_of: Callable[[Any], Optional[str]] = lambda result: None):
+        self.factory = factory
+        self.is_success = is_success
+        self.error_of = error_of
+        self.progress = InitializationProgress()
+        self.state = self.PENDING
+        self.result = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Start the job thread
+    def start(self) -> "InitializationJob":
+        self.state = self.RUNNING
+        self.started_at = datetime.now()
+        self._thread = threading.Thread(target=self._run, name="rag-initialization", daemon=True)
+        self._thread.start()
+        return self
+
+    # Build the result and record the final state
+    def _run(self) -> None:
+        try:
+            self.result = self.factory(self.progress)
+            if self.is_success(self.result):
+                self.state = self.SUCCEEDED
+            else:
+                self.state = self.FAILED
+                self.error = self.error_of(self.result) or "Başlatma başarısız oldu"
+        except Exception as e:
+            logger.error(f"Başlatma işi hatası: {str(e)}")
+            self.state = self.FAILED
+            self.error = str(e)
+        finally:
+            self.progress.end_phase()
+            self.finished_at = datetime.now()
+            self._done.set()
+
+    # Check whether the job is still running
+    def is_running(self) -> bool:
+        return self.state in (self.PENDING, self.RUNNING)
+
+    # Block until the job finishes
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    # Get a JSON-serializable job status
+    def snapshot(self) -> Dict:
+        end = self.finished_at or datetime.now()
+        return {
+            "state": self.state,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_sec": round((end - self.started_at).total_seconds(), 3) if self.started_at else None,
+            "progress": self.progress.snapshot()
+        }
@@ -0,0 +1,222 @@
+"""
+Instrumentation - Aşama Süreleri, Sayaçlar ve Prometheus Metin Çıktısı
+Veri çekme, embedding, index, retrieval, LLM ve serileştirme süreleri histogram olarak tutulur
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import METRICS_LATENCY_BUCKETS
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+# Turn label keyword arguments into a hashable, ordered key
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+# Escape a label value for the Prometheus text format
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Format labels in Prometheus text syntax ({a="1",b="2"})
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+# Format a number the way Prometheus expects
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Etiketli, yalnızca artan sayaç"""
+
+    type_name = "counter"
+
+    # Initialize counter with its name and help text
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    # Add to the counter for the given labels
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    # Render samples in Prometheus text format
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Etiketli, anlık değer göstergesi"""
+
+    type_name = "gauge"
+
+    # Set the gauge for the given labels
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    """Etiketli, kümülatif bucket'lı süre histogramı"""
+
+    type_name = "histogram"
+
+    # Initialize histogram with its name, help text and bucket bounds (seconds)
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, Dict] = {}
+        self._lock = threading.Lock()
+
+    # Record one observation
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][position] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    # Get the observation count and sum (seconds) recorded for the given labels
+    def total(self, **labels) -> Tuple[int, float]:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return (series["count"], series["sum"]) if series else (0, 0.0)
+
+    # Render samples in Prometheus text format
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    """Metriklerin kaydı ve Prometheus metin çıktısı"""
+
+    # Initialize empty registry
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    # Register a metric once and return the registered instance
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    # Get or create a counter
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    # Get or create a gauge
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    # Get or create a histogram
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    # Render all metrics in the Prometheus text exposition format
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("finance_rag_stage_duration_seconds",
+                                   "Aşama süreleri (fetch, embedding, index, retrieval, llm, serialization)")
+ERRORS = REGISTRY.counter("finance_rag_errors_total", "Aşama bazında hata sayısı")
+CACHE_LOOKUPS = REGISTRY.counter("finance_rag_cache_lookups_total", "Cache sorguları (cache, result)")
+LLM_TOKENS = REGISTRY.counter("finance_rag_llm_tokens_total", "LLM token kullanımı (kind=input|output)")
+COALESCED_REQUESTS = REGISTRY.counter("finance_rag_coalesced_requests_total",
+                                      "Devam eden aynı soruya bağlanan istekler (mode)")
+CONTEXT_TOKENS = REGISTRY.counter("finance_rag_context_tokens_total", "Prompt bağlamına giren token sayısı")
+SHARD_SEARCHES = REGISTRY.counter("finance_rag_shard_searches_total",
+                                  "Index parçası aramaları (mode=routed|fanout)")
+QUESTIONS = REGISTRY.counter("finance_rag_questions_total", "Cevaplanan sorular (route)")
+DOCUMENTS = REGISTRY.gauge("finance_rag_documents", "Index'teki doküman sayısı (shard)")
+
+
+# Time a stage and count it as an error if it raises
+@contextmanager
+def timed(stage: str, **labels) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, **labels)
+
+
+# Iterate while timing only the waits for each next item (not the consumer's work in between);
+# the total is observed once when the iteration ends
+def timed_iter(stage: str, items: Iterable, **labels) -> Iterator:
+    iterator = iter(items)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    except Exception:
+        ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(elapsed, stage=stage, **labels)
+
+
+# Record token usage reported on an LLM response message (if the provider reports it)
+def record_token_usage(message) -> None:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    else:
+        usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        input_tokens, output_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, kind="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, kind="output")
@@ -0,0 +1,138 @@
+"""
+Metrics Table - Doküman Metadata'sından Kolonsal Metrik Tablosu
+Sıralama, karşılaştırma ve filtreleme sorguları için vektörel hesaplama
+"""
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["latest_price", "price_change_pct", "volatility"]
+
+# common short names that don't appear in CoinGecko IDs
+COIN_ALIASES = {
+    "btc": "bitcoin",
+    "eth": "ethereum",
+    "ada": "cardano",
+    "sol": "solana",
+    "xrp": "ripple",
+    "bnb": "binancecoin",
+    "doge": "dogecoin",
+    "dot": "polkadot",
+    "avax": "avalanche-2",
+    "matic": "matic-network",
+    "ltc": "litecoin",
+    "trx": "tron"
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9çğıöşü\-]+")
+
+
+# Lowercase with the Turkish dotted/dotless I mapping questions are normalized with
+def turkish_lower(text: str) -> str:
+    return text.replace("İ", "i").replace("I", "ı").lower()
+
+
+# Split lowercased text into word tokens (apostrophe suffixes become separate tokens)
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(turkish_lower(text))
+
+
+# Get every form a name takes in a normalized question: typed lowercase ("bimas") or upper case ("BIMAS" -> "bımas")
+def lookup_keys(name: str) -> List[str]:
+    return list(dict.fromkeys([name.lower(), turkish_lower(name), turkish_lower(name.upper())]))
+
+
+# Get the short display name of a symbol ("ASELS.IS" -> "ASELS")
+def display_name(symbol: str, asset_type: str) -> str:
+    return symbol.split(".")[0].upper() if asset_type == "stock" else symbol.upper()
+
+
+class MetricsTable:
+    """Varlık başına bir satırlık metrik tablosu (pandas)"""
+
+    # Build the table from loaded documents' metadata
+    def __init__(self, documents: List):
+        rows = []
+        for doc in documents:
+            metadata = doc.metadata
+            asset_type = metadata.get("type")
+            symbol = metadata.get("ticker") or metadata.get("coin")
+            if asset_type not in ("stock", "crypto") or not symbol:
+                continue
+
+            rows.append({
+                "symbol": symbol,
+                "name": display_name(symbol, asset_type),
+                "type": asset_type,
+                **{column: metadata.get(column, np.nan) for column in METRIC_COLUMNS},
+                "metadata": metadata
+            })
+
+        self.frame = pd.DataFrame(rows, columns=["symbol", "name", "type", *METRIC_COLUMNS, "metadata"])
+        self.frame[METRIC_COLUMNS] = self.frame[METRIC_COLUMNS].astype(float)
+        self.frame = self.frame.drop_duplicates("symbol", keep="last").reset_index(drop=True)
+
+        # lookup keys in every normalized form: short name for stocks, CoinGecko ID for coins
+        self._lookup: Dict[str, str] = {}
+        for symbol, name in zip(self.frame["symbol"], self.frame["name"]):
+            for key in lookup_keys(name) + lookup_keys(symbol):
+                self._lookup[key] = symbol
+        for alias, coin in COIN_ALIASES.items():
+            if coin in self._lookup:
+                for key in lookup_keys(alias):
+                    self._lookup[key] = coin
+
+    # Combine per-shard tables without re-reading document metadata
+    @classmethod
+    def merge(cls, tables: List["MetricsTable"]) -> "MetricsTable":
+        merged = cls([])
+        frames = [table.frame for table in tables if len(table)]
+        if frames:
+            merged.frame = pd.concat(frames, ignore_index=True)
+        for table in tables:
+            merged._lookup.update(table._lookup)
+        return merged
+
+    # Get number of assets in the table
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # Restrict the table to one asset type (None keeps all)
+    def _scope(self, asset_type: Optional[str]) -> pd.DataFrame:
+        if asset_type is None:
+            return self.frame
+        return self.frame[self.frame["type"] == asset_type]
+
+    # Find symbols mentioned in free text, in order of appearance
+    def resolve_symbols(self, text: str) -> List[str]:
+        found = []
+        for token in tokenize(text):
+            symbol = self._lookup.get(token)
+            if symbol is None and len(token) > 4:
+                # Turkish suffixes written without an apostrophe ("bitcoinin")
+                symbol = next((s for key, s in self._lookup.items()
+                               if len(key) > 4 and token.startswith(key)), None)
+            if symbol and symbol not in found:
+                found.append(symbol)
+        return found
+
+    # Get the n rows with the largest (or smallest) metric value
+    def top(self, metric: str, n: int = 1, ascending: bool = False,
+            asset_type: Optional[str] = None) -> pd.DataFrame:
+        frame = self._scope(asset_type).dropna(subset=[metric])
+        return frame.nsmallest(n, metric) if ascending else frame.nlargest(n, metric)
+
+    # Get rows for the given symbols, in the given order
+    def select(self, symbols: List[str]) -> pd.DataFrame:
+        frame = self.frame.set_index("symbol", drop=False)
+        return frame.loc[[s for s in symbols if s in frame.index]].reset_index(drop=True)
+
+    # Get rows whose metric is above (or below) a threshold, sorted by the metric
+    def filter(self, metric: str, threshold: float, above: bool = True,
+               asset_type: Optional[str] = None) -> pd.DataFrame:
+        frame = self._scope(asset_type)
+        values = frame[metric].to_numpy()
+        mask = values > threshold if above else values < threshold
+        return frame[mask].sort_values(metric, ascending=not above)
@@ -0,0 +1,193 @@
+"""
+Providers - Takılabilir Embedding ve LLM Sağlayıcıları
+OpenAI, yerel CPU embedding modeli veya ağ gerektirmeyen deterministik sahte modeller
+"""
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from config import (EMBEDDING_PROVIDER, LLM_PROVIDER, OPENAI_EMBEDDING_MODEL, LOCAL_EMBEDDING_MODEL, LOCAL_EMBEDDING_DEVICE,
+                    HASH_EMBEDDING_DIM, EMBEDDING_BATCH_SIZE, DEFAULT_MODEL, DEFAULT_TEMPERATURE,
+                    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS)
+from metrics_table import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class LocalEmbeddings(Embeddings):
+    """sentence-transformers ile CPU üzerinde toplu embedding"""
+
+    # Load the local model (sentence-transformers is an optional dependency)
+    def __init__(self, model_name: str = LOCAL_EMBEDDING_MODEL, device: str = LOCAL_EMBEDDING_DEVICE,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("Yerel embedding için 'pip install sentence-transformers' çalıştırın")
+
+        self.model = model_name
+        self.batch_size = max(1, batch_size)
+        self._model = SentenceTransformer(model_name, device=device)
+        logger.info(f"Yerel embedding modeli yüklendi: {model_name} ({device})")
+
+    # Embed texts in batches with normalized vectors
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self._model.encode(list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+                                     convert_to_numpy=True, show_progress_bar=False)
+        return vectors.astype(np.float32).tolist()
+
+    # Embed a single query
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class HashEmbeddings(Embeddings):
+    """Token hash'lerinden deterministik embedding (ağ ve model gerektirmez)"""
+
+    # Initialize with the vector dimension
+    def __init__(self, dim: int = HASH_EMBEDDING_DIM):
+        self.dim = dim
+        self.model = f"hash-{dim}"
+
+    # Embed one text as a signed bag of hashed tokens
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # Embed texts
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    # Embed a single query
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
+
+
+class LazyEmbeddings(Embeddings):
+    """Backend'i (ve API istemcisini) ilk embedding çağrısında oluşturan sarmalayıcı"""
+
+    # Initialize with a backend factory and the model name used for cache keys
+    def __init__(self, factory: Callable[[], Embeddings], model: str):
+        self.factory = factory
+        self.model = model
+        self._backend = None
+        self._lock = threading.Lock()
+
+    # Get the backend, creating it on first use
+    def backend(self) -> Embeddings:
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self.factory()
+        return self._backend
+
+    # Drop the backend so the next call creates a fresh client (e.g. after fork)
+    def reset(self) -> None:
+        self._backend = None
+        self._lock = threading.Lock()
+
+    # Embed texts
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.backend().embed_documents(texts)
+
+    # Embed a single query
+    def embed_query(self, text: str) -> List[float]:
+        return self.backend().embed_query(text)
+
+    # Embed texts without blocking the event loop
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.backend().aembed_documents(texts)
+
+    # Embed a single query without blocking the event loop
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.backend().aembed_query(text)
+
+
+class StubChatModel(BaseChatModel):
+    """Bağlamın ilk satırlarını döndüren deterministik sahte sohbet modeli"""
+
+    max_lines: int = 5
+
+    # Get the model type name
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    # Build the answer from the prompt: headline lines of the context plus the question
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        context = "\n".join(m.content for m in messages[:-1] if isinstance(m.content, str))
+        question = messages[-1].content if messages else ""
+        lines = [line.strip() for line in context.splitlines()
+                 if line.strip() and not line.startswith(("Use the following", "If you don't know", "---"))]
+        summary = "\n".join(lines[:self.max_lines]) or "Bağlamda ilgili veri bulunamadı."
+        return f"[stub] Soru: {question}\n{summary}"
+
+    # Generate a full answer
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    # Stream the answer word by word
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for word in self._answer(messages).split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+# Model names of the embedding providers (cache keys; known before the backend is created)
+EMBEDDING_MODELS = {
+    "openai": OPENAI_EMBEDDING_MODEL,
+    "local": LOCAL_EMBEDDING_MODEL,
+    "hash": f"hash-{HASH_EMBEDDING_DIM}"
+}
+
+
+# Create the embedding backend selected in config; lazy defers the backend (API client, or the
+# sentence-transformers/torch import and model load) to the first call
+def create_embeddings(provider: str = EMBEDDING_PROVIDER, lazy: bool = False) -> Embeddings:
+    if provider not in EMBEDDING_MODELS:
+        raise ValueError(f"Bilinmeyen embedding sağlayıcısı: {provider}")
+    if lazy:
+        return LazyEmbeddings(lambda: create_embeddings(provider), EMBEDDING_MODELS[provider])
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL)
+    if provider == "local":
+        return LocalEmbeddings()
+    return HashEmbeddings()
+
+
+# Create the chat model selected in config
+def create_llm(provider: str = LLM_PROVIDER, model: str = DEFAULT_MODEL,
+               temperature: float = DEFAULT_TEMPERATURE) -> BaseChatModel:
+    if provider == "openai":
+        import httpx
+        from langchain_openai import ChatOpenAI
+
+        # pooled keep-alive connections for both the sync and the async client
+        limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                              max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS)
+        # stream_usage adds a final usage chunk to streamed answers, so their tokens are counted too
+        return ChatOpenAI(model=model, temperature=temperature, stream_usage=True,
+                          http_client=httpx.Client(limits=limits),
+                          http_async_client=httpx.AsyncClient(limits=limits))
+    if provider == "stub":
+        return StubChatModel()
+    raise ValueError(f"Bilinmeyen LLM sağlayıcısı: {provider}")
@@ -0,0 +1,181 @@
+"""
+Query Router - Sayısal Sorular İçin LLM'siz Hızlı Yol
+Sıralama, karşılaştırma ve filtre sorularını metrik tablosundan cevaplar
+"""
+import logging
+import re
+from typing import Dict, Optional
+
+import pandas as pd
+
+from answer_cache import normalize_question
+from metrics_table import MetricsTable, lookup_keys
+
+logger = logging.getLogger(__name__)
+
+# (phrases, metric, ascending) - checked in order, first match wins
+RANKING_RULES = [
+    (("en az volatil", "en düşük volatil", "en stabil", "en istikrarlı", "least volatile"),
+     "volatility", True),
+    (("en volatil", "en oynak", "en yüksek volatil", "en çok dalgalan", "most volatile"),
+     "volatility", False),
+    (("en çok kaybet", "en fazla kaybet", "en çok düş", "en fazla düş", "en kötü performans",
+      "en çok değer kaybet", "worst perform", "top loser"),
+     "price_change_pct", True),
+    (("en çok kazan", "en fazla kazan", "en iyi performans", "en çok yüksel", "en fazla yüksel",
+      "en çok art", "en çok değer kazan", "best perform", "top gainer"),
+     "price_change_pct", False),
+    (("en pahalı", "en yüksek fiyat", "most expensive"), "latest_price", False),
+    (("en ucuz", "en düşük fiyat", "cheapest"), "latest_price", True),
+]
+
+COMPARE_WORDS = ("karşılaştır", "kıyasla", "compare", " vs ", " versus ")
+
+FILTER_PATTERN = re.compile(
+    r"(?:%|yüzde\s*)(-?\d+(?:[.,]\d+)?)\S*\s*(?:ten|tan|den|dan)?\s*"
+    r"(fazla|çok|yüksek|büyük|üzeri|üstü|az|düşük|küçük|altı)"
+)
+ABOVE_WORDS = ("fazla", "çok", "yüksek", "büyük", "üzeri", "üstü")
+
+# "ilk 3", "top 5", "3 hisse" - but not "son 30 gün"
+COUNT_PATTERN = re.compile(r"(?:\b(?:ilk|top)\s*(\d{1,2})\b|\b(\d{1,2})\s+(?:hisse|kripto|coin|varlık|stock))")
+
+METRIC_LABELS = {
+    "price_change_pct": "değişim",
+    "volatility": "volatilite",
+    "latest_price": "son fiyat"
+}
+TYPE_LABELS = {"stock": "hisse senedi", "crypto": "kripto para", None: "varlık"}
+
+
+# asset type keywords in every normalized form ("BIST" -> "bıst")
+STOCK_WORDS = tuple(key for word in ("hisse", "bist", "borsa", "stock") for key in lookup_keys(word))
+CRYPTO_WORDS = tuple(key for word in ("kripto", "coin", "crypto") for key in lookup_keys(word))
+
+
+# Detect which asset class a question is about (None means both)
+def detect_asset_type(text: str) -> Optional[str]:
+    stock = any(word in text for word in STOCK_WORDS)
+    crypto = any(word in text for word in CRYPTO_WORDS)
+    if stock and not crypto:
+        return "stock"
+    if crypto and not stock:
+        return "crypto"
+    return None
+
+
+# Format a price with the asset's currency
+def _format_price(row: pd.Series) -> str:
+    if row["type"] == "stock":
+        return f"{row['latest_price']:,.2f} TL"
+    return f"${row['latest_price']:,.2f}"
+
+
+# Format one asset row as a compact summary line
+def _format_row(row: pd.Series) -> str:
+    parts = [f"{row['symbol']}: son fiyat {_format_price(row)}", f"değişim {row['price_change_pct']:.2f}%"]
+    if pd.notna(row["volatility"]):
+        parts.append(f"volatilite {row['volatility']:.2f}%")
+    return ", ".join(parts)
+
+
+class QueryRouter:
+    """Sayısal soruları metrik tablosuna, diğerlerini RAG'e yönlendiren sınıf"""
+
+    # Answer the question from the metrics table, or return None to fall back to RAG
+    def route(self, question: str, table: Optional[MetricsTable]) -> Optional[Dict]:
+        if table is None or len(table) == 0:
+            return None
+
+        text = f" {normalize_question(question)} "
+        asset_type = detect_asset_type(text)
+
+        try:
+            result = (self._route_comparison(text, table)
+                      or self._route_filter(text, table, asset_type)
+                      or self._route_ranking(text, table, asset_type))
+        except Exception as e:
+            logger.warning(f"Sayısal yönlendirme başarısız, RAG'e dönülüyor: {str(e)}")
+            return None
+
+        if result:
+            logger.info(f"Soru metrik tablosundan cevaplandı ({result['route']})")
+        return result
+
+    # Build the routed result dict
+    def _result(self, route: str, answer: str, rows: pd.DataFrame) -> Dict:
+        return {"answer": answer, "sources": list(rows["metadata"]), "route": route}
+
+    # "X ve Y'yi karşılaştır"
+    def _route_comparison(self, text: str, table: MetricsTable) -> Optional[Dict]:
+        if not any(word in text for word in COMPARE_WORDS):
+            return None
+
+        symbols = table.resolve_symbols(text)
+        if len(symbols) < 2:
+            return None
+
+        rows = table.select(symbols)
+        best = rows.loc[rows["price_change_pct"].idxmax()]
+        lines = [_format_row(row) for _, row in rows.iterrows()]
+
+        answer = "Karşılaştırma:\n" + "\n".join(f"- {line}" for line in lines)
+        answer += f"\nDönem içinde en iyi performansı {best['symbol']} gösterdi ({best['price_change_pct']:.2f}%)."
+
+        volatile = rows.dropna(subset=["volatility"])
+        if len(volatile) >= 2:
+            most = volatile.loc[volatile["volatility"].idxmax()]
+            answer += f" En volatil olanı {most['symbol']} ({most['volatility']:.2f}%)."
+        return self._result("compare", answer, rows)
+
+    # "%5'ten fazla kazanan hisseler"
+    def _route_filter(self, text: str, table: MetricsTable, asset_type: Optional[str]) -> Optional[Dict]:
+        match = FILTER_PATTERN.search(text)
+        if not match:
+            return None
+
+        threshold = float(match.group(1).replace(",", "."))
+        above = match.group(2) in ABOVE_WORDS
+        metric = "volatility" if "volatil" in text else "price_change_pct"
+        if metric == "price_change_pct" and any(word in text for word in ("kaybet", "düş")):
+            # "%5'ten fazla düşen" means a change below -5%
+            threshold, above = -abs(threshold), not above
+
+        rows = table.filter(metric, threshold, above, asset_type)
+        label = TYPE_LABELS[asset_type]
+        condition = f"{METRIC_LABELS[metric]} {'>' if above else '<'} {threshold:.2f}%"
+
+        if rows.empty:
+            return self._result("filter", f"Koşulu ({condition}) sağlayan {label} bulunamadı.", rows)
+
+        lines = [f"{i}. {_format_row(row)}" for i, (_, row) in enumerate(rows.iterrows(), start=1)]
+        answer = f"Koşulu ({condition}) sağlayan {len(rows)} {label}:\n" + "\n".join(lines)
+        return self._result("filter", answer, rows)
+
+    # "Hangi hisse en çok kazandı?", "En volatil 3 kripto"
+    def _route_ranking(self, text: str, table: MetricsTable, asset_type: Optional[str]) -> Optional[Dict]:
+        rule = next(((metric, ascending) for phrases, metric, ascending in RANKING_RULES
+                     if any(phrase in text for phrase in phrases)), None)
+        if rule is None:
+            return None
+
+        metric, ascending = rule
+        if metric == "latest_price" and asset_type is None:
+            # TL and USD prices can't be ranked together
+            return None
+
+        count = COUNT_PATTERN.search(text)
+        n = max(1, min(int(count.group(1) or count.group(2)), len(table))) if count else 1
+
+        rows = table.top(metric, n, ascending, asset_type)
+        if rows.empty:
+            return None
+
+        label = TYPE_LABELS[asset_type]
+        if n == 1:
+            row = rows.iloc[0]
+            answer = f"Bu kritere göre öne çıkan {label} {row['symbol']}. {_format_row(row)}."
+        else:
+            lines = [f"{i}. {_format_row(row)}" for i, (_, row) in enumerate(rows.iterrows(), start=1)]
+            answer = f"{METRIC_LABELS[metric].capitalize()} sıralamasına göre ilk {len(rows)} {label}:\n" + "\n".join(lines)
+        return self._result("top_n", answer, rows)
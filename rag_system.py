@@ -1,22 +1,107 @@
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-from config import validate_config, DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_K_RETRIEVAL
-from typing import List, Dict, Optional
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.prompts import ChatPromptTemplate
+from config import (validate_config, DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_K_RETRIEVAL,
+                    INDEX_MAX_AGE_SECONDS, EMBEDDING_CACHE_ENABLED, ANSWER_CACHE_ENABLED,
+                    BATCH_LLM_CONCURRENCY, EMBEDDING_PROVIDER, LLM_PROVIDER,
+                    HYBRID_RETRIEVAL_ENABLED, HYBRID_DENSE_FETCH_K, SINGLE_FLIGHT_ENABLED,
+                    HIERARCHICAL_ENABLED, DETAIL_MAX_PARENTS, DETAIL_TOP_K, SHARD_SEARCH_WORKERS)
+from answer_cache import AnswerCache, normalize_question, question_terms
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from index_store import IndexStore
+from metrics_table import MetricsTable
+from hierarchical_index import DetailIndex, split_levels, is_detail, parse_question_period
+from index_shards import Shard, shard_of_id, group_by_shard, documents_of, route_shards
+from instrumentation import (timed, timed_iter, record_token_usage, CACHE_LOOKUPS, COALESCED_REQUESTS, CONTEXT_TOKENS,
+                             SHARD_SEARCHES)
+from context_builder import ContextBuilder
+from providers import create_embeddings, create_llm
+from single_flight import SingleFlight
+from vector_index import create_vector_store, configure_index, supports_removal
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List, Dict, Optional, Tuple
+import faiss
 import logging
+import numpy as np
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# same prompt the default "stuff" chain uses for chat models
+QA_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "Use the following pieces of context to answer the user's question. \n"
+               "If you don't know the answer, just say that you don't know, don't try to make up an answer.\n"
+               "----------------\n"
+               "{context}"),
+    ("human", "{question}")
+])
+
+# Get the stable ID of a document (e.g. "stock:ASELS.IS", "crypto:bitcoin")
+def document_id(doc) -> str:
+    metadata = doc.metadata
+    symbol = metadata.get("ticker") or metadata.get("coin")
+    doc_id = f"{metadata.get('type', 'doc')}:{symbol}"
+    return f"{doc_id}:{metadata['period_start']}" if is_detail(doc) else doc_id
+
+# Keep the last document for each stable ID, preserving first-seen order
+def _dedupe_documents(docs: List) -> Dict[str, object]:
+    by_id = {}
+    for doc in docs:
+        by_id[document_id(doc)] = doc
+    return by_id
+
 class FinanceRAG:
-    def __init__(self, llm_model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    def __init__(self, llm_model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                 index_store: Optional[IndexStore] = None, embedding_provider: str = EMBEDDING_PROVIDER,
+                 llm_provider: str = LLM_PROVIDER):
         validate_config()
         
-        self.llm = ChatOpenAI(model=llm_model, temperature=temperature)
-        self.embeddings = OpenAIEmbeddings()
-        self.vector_store = None
-        self.qa_chain = None
+        self.llm_model = llm_model
+        self.temperature = temperature
+        self.llm_provider = llm_provider
+        self.embedding_provider = embedding_provider
+        # API clients are created on first use, not at startup
+        self._llm = None
+        self._llm_lock = threading.Lock()
+        base_embeddings = create_embeddings(embedding_provider, lazy=True)
+        self.embedding_model = getattr(base_embeddings, "model", type(base_embeddings).__name__)
+        logger.info(f"Sağlayıcılar: embedding={embedding_provider} ({self.embedding_model}), LLM={llm_provider}")
+        
+        # unchanged documents reuse their cached vectors across reloads
+        if EMBEDDING_CACHE_ENABLED:
+            self.embeddings = CachedEmbeddings(base_embeddings, EmbeddingCache(), self.embedding_model)
+        else:
+            self.embeddings = base_embeddings
+        self.index_store = index_store
+        self._shard_stores: Dict[str, IndexStore] = {}
+        # one index per market; the dict is replaced (never mutated) so readers can take a snapshot
+        self.shards: Dict[str, Shard] = {}
+        # answering uses the LLM directly; the RetrievalQA chain is only built when accessed
+        self.qa_ready = False
+        self._qa_chain = None
+        self._qa_chain_shards = None
         self.documents = []
+        # per-period detail chunks are staged here until built into their shard's detail index
+        self.detail_documents = []
+        self.k = DEFAULT_K_RETRIEVAL
+        
+        # bumped whenever a shard is swapped; the swapped shards take it as their generation
+        self.index_version = 0
+        self.answer_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
+        # concurrent identical questions share one embedding, retrieval and LLM call
+        self.single_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+        self.context_builder = ContextBuilder(model=llm_model)
+        # (shards, table) merged from the per-shard metrics tables on first use
+        self._merged_table = None
+        
+        # per-shard update locks serialize updates of one market; readers never take them.
+        # _swap_lock only covers installing a built shard
+        self._swap_lock = threading.Lock()
+        self._shard_locks: Dict[str, threading.Lock] = {}
+        # fan-out searches and concurrent shard builds
+        self._shard_executor = ThreadPoolExecutor(max_workers=SHARD_SEARCH_WORKERS, thread_name_prefix="shard")
 
     # Load documents into the RAG system
     def load_documents(self, docs: List) -> None:
@@ -24,34 +109,390 @@ class FinanceRAG:
             logger.warning("Yüklenecek doküman bulunamadı!")
             return
         
-        self.documents.extend(docs)
-        logger.info(f"{len(docs)} doküman yüklendi. Toplam: {len(self.documents)}")
+        summaries, details = split_levels(docs)
+        self.documents.extend(summaries)
+        self.detail_documents.extend(details)
+        logger.info(f"{len(summaries)} doküman ve {len(details)} detay parçası yüklendi. "
+                    f"Toplam: {len(self.documents)}")
 
-    # Build FAISS vector store from loaded documents
+    # Build one FAISS index per shard from loaded documents
     def build_vector_store(self) -> None:
         if not self.documents:
             raise ValueError("Önce veri yüklemelisiniz!")
         
         logger.info("Vector store oluşturuluyor...")
-        self.vector_store = FAISS.from_documents(self.documents, self.embeddings)
-        logger.info("Vector store başarıyla oluşturuldu!")
+        summaries = group_by_shard(self.documents)
+        details = group_by_shard(self.detail_documents)
+        with self._locked(summaries):
+            self._swap_shards(self._build_shards(summaries, details))
+        self.detail_documents = []
+        
+        if isinstance(self.embeddings, CachedEmbeddings):
+            logger.info(f"Embedding cache durumu: {self.embeddings.get_stats()}")
+        logger.info(f"Vector store başarıyla oluşturuldu! Parçalar: {list(self.shards)}")
+
+    # Persist shards not saved since they were last changed, each as a new version of its own store
+    def save_index(self, data_keys: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        if not self.index_store:
+            return {}
+        
+        saved = {}
+        for name in list(self.shards):
+            # the shard lock keeps concurrent savers (and updates) from writing the same shard twice
+            with self._shard_lock(name):
+                shard = self.shards.get(name)
+                if shard is None or shard.version is not None:
+                    continue
+                try:
+                    shard.version = self._shard_store(name).save(shard.vector_store, self.embedding_model,
+                                                                  (data_keys or {}).get(name, ""),
+                                                                  details=shard.detail_index)
+                    saved[name] = shard.version
+                except Exception as e:
+                    logger.error(f"'{name}' index parçası kaydedilemedi: {str(e)}")
+        return saved
+
+    # Warm start from the persisted shards if every expected one is fresh for this model and data
+    def load_index(self, data_keys: Optional[Dict[str, str]] = None,
+                   max_age: Optional[float] = INDEX_MAX_AGE_SECONDS) -> bool:
+        if not self.index_store or not data_keys:
+            return False
+        
+        versions = {}
+        for name, data_key in data_keys.items():
+            store = self._shard_store(name)
+            manifest = store.latest_manifest()
+            if not store.is_fresh(manifest, self.embedding_model, data_key, max_age):
+                return False
+            versions[name] = manifest["version"]
+        
+        shards = {name: self._load_shard(name, version) for name, version in versions.items()}
+        if any(shard is None for shard in shards.values()):
+            return False
+        
+        with self._locked(shards):
+            self._swap_shards(shards)
+        logger.info(f"Vector store diskten yüklendi! Toplam: {len(self.documents)} doküman")
+        return True
+
+    # Swap in shards another process has saved a newer version of; other shards keep serving
+    def reload_latest_index(self, data_keys: Optional[Dict[str, str]] = None, force: bool = False) -> bool:
+        if not self.index_store or not data_keys:
+            return False
+        
+        reloaded = []
+        for name, data_key in data_keys.items():
+            store = self._shard_store(name)
+            version = store.latest_version()
+            served = self.shards.get(name)
+            if not version or (served and version == served.version and not force):
+                continue
+            
+            manifest = store.latest_manifest()
+            if not store.is_fresh(manifest, self.embedding_model, data_key) or manifest["version"] != version:
+                continue
+            
+            shard = self._load_shard(name, version)
+            if shard is None:
+                continue
+            with self._shard_lock(name):
+                self._swap_shards({name: shard})
+            reloaded.append(f"{name}={version}")
+        
+        if reloaded:
+            logger.info(f"Index parçaları yeni versiyona geçti: {', '.join(reloaded)} ({len(self.documents)} doküman)")
+        return bool(reloaded)
+
+    # Get the data key (symbol list) each shard's latest saved version was built from
+    def saved_data_keys(self, names: List[str]) -> Dict[str, str]:
+        if not self.index_store:
+            return {}
+        
+        keys = {}
+        for name in names:
+            manifest = self._shard_store(name).latest_manifest()
+            if manifest:
+                keys[name] = manifest.get("data_key", "")
+        return keys
+
+    # Load a saved shard version (memory-mapped when possible)
+    def _load_shard(self, name: str, version: str) -> Optional[Shard]:
+        store = self._shard_store(name)
+        with timed("index_load", shard=name):
+            vector_store = store.load_version(version, self.embeddings)
+            detail_index = store.load_details(version)
+        if vector_store is None:
+            return None
+        
+        documents = documents_of(vector_store)
+        
+        # indexes saved without stable IDs can't be updated incrementally
+        if any(document_id(doc) != vector_store.index_to_docstore_id[i] for i, doc in enumerate(documents)):
+            logger.info("Kayıtlı index kararlı doküman ID'leri içermiyor, yeniden oluşturulacak")
+            return None
+        
+        # search-time parameters follow the current config, not the saved index
+        configure_index(vector_store.index)
+        return Shard(name, vector_store, detail_index, version=version, documents=documents)
 
-    # Create QA chain for question answering
+    # Get the persistent store of one shard
+    def _shard_store(self, name: str) -> IndexStore:
+        store = self._shard_stores.get(name)
+        if store is None:
+            store = self._shard_stores[name] = self.index_store.shard(name)
+        return store
+
+    # Recreate process-local clients in a forked worker (sockets and SQLite handles can't be shared)
+    def after_fork(self) -> None:
+        self._swap_lock = threading.Lock()
+        self._shard_locks = {}
+        self._shard_executor = ThreadPoolExecutor(max_workers=SHARD_SEARCH_WORKERS, thread_name_prefix="shard")
+        self._llm = None
+        self._llm_lock = threading.Lock()
+        self._qa_chain = None
+        
+        # API clients hold sockets and a torch model loaded in the master can deadlock its thread pools
+        # (OpenMP) after fork, so every non-hash backend is recreated lazily in the worker
+        base_embeddings = self.embeddings.embeddings if isinstance(self.embeddings, CachedEmbeddings) else self.embeddings
+        if self.embedding_provider != "hash":
+            base_embeddings = create_embeddings(self.embedding_provider, lazy=True)
+        
+        if isinstance(self.embeddings, CachedEmbeddings):
+            self.embeddings.embeddings = base_embeddings
+            self.embeddings.cache.reopen()
+        else:
+            self.embeddings = base_embeddings
+        
+        for shard in self.shards.values():
+            shard.vector_store.embedding_function = self.embeddings
+
+    # Get the chat model, creating its client on first use
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = create_llm(self.llm_provider, self.llm_model, self.temperature)
+        return self._llm
+
+    # Get a LangChain RetrievalQA chain over the served shards (built on first access)
+    @property
+    def qa_chain(self):
+        shards = self.shards
+        if not self.qa_ready or not shards:
+            return None
+        if self._qa_chain is None or self._qa_chain_shards is not shards:
+            self._qa_chain = self._create_qa_chain(self._merged_vector_store(shards))
+            self._qa_chain_shards = shards
+        return self._qa_chain
+
+    # Prepare question answering
     def build_qa_chain(self, k: int = DEFAULT_K_RETRIEVAL) -> None:
-        if not self.vector_store:
+        if not self.shards:
             raise ValueError("Önce vector store oluşturmalısınız!")
         
-        logger.info(f"QA chain oluşturuluyor (k={k})...")
-        self.qa_chain = RetrievalQA.from_chain_type(
+        self.k = k
+        self.qa_ready = True
+        logger.info(f"Soru cevaplama hazır (k={k})")
+
+    # Create a retrieval QA chain bound to the given vector store
+    def _create_qa_chain(self, vector_store: FAISS):
+        from langchain.chains import RetrievalQA
+        
+        return RetrievalQA.from_chain_type(
             llm=self.llm,
-            retriever=self.vector_store.as_retriever(search_kwargs={"k": k}),
-            return_source_documents=True
+            retriever=vector_store.as_retriever(search_kwargs={"k": self.k}),
+            return_source_documents=True,
+            chain_type_kwargs={"prompt": QA_PROMPT}
+        )
+
+    # Get a single vector store over all shards for the RetrievalQA chain (vectors come from the embedding cache)
+    def _merged_vector_store(self, shards: Dict[str, Shard]) -> FAISS:
+        if len(shards) == 1:
+            return next(iter(shards.values())).vector_store
+        
+        documents = [doc for shard in shards.values() for doc in shard.documents]
+        return create_vector_store(documents, [document_id(doc) for doc in documents], self.embeddings)
+
+    # Get the metrics table over all served shards (merged once per shard set, never rebuilt from documents)
+    @property
+    def metrics_table(self) -> MetricsTable:
+        return self._table(self.shards)
+
+    # Get the metrics table of a shards snapshot (the served set's merge is cached)
+    def _table(self, shards: Dict[str, Shard]) -> MetricsTable:
+        merged = self._merged_table
+        if merged is not None and merged[0] is shards:
+            return merged[1]
+        
+        table = MetricsTable.merge([shard.table for shard in shards.values()])
+        # a request still holding an older snapshot must not evict the served set's table
+        if shards is self.shards:
+            self._merged_table = (shards, table)
+        return table
+
+    # Get the served generation of each shard (or only the named ones) in a snapshot
+    def _versions(self, shards: Dict[str, Shard], names: Optional[List[str]] = None) -> Dict[str, int]:
+        return {name: shards[name].generation for name in (shards if names is None else names) if name in shards}
+
+    # Copy a vector store so it can be modified while the original keeps serving
+    def _copy_vector_store(self, vector_store: FAISS) -> FAISS:
+        return FAISS(
+            embedding_function=vector_store.embedding_function,
+            index=faiss.clone_index(vector_store.index),
+            docstore=InMemoryDocstore(dict(vector_store.docstore._dict)),
+            index_to_docstore_id=dict(vector_store.index_to_docstore_id)
         )
-        logger.info("QA chain başarıyla oluşturuldu!")
+
+    # Get the update lock of one shard; updates of different shards never wait for each other
+    def _shard_lock(self, name: str) -> threading.Lock:
+        with self._swap_lock:
+            return self._shard_locks.setdefault(name, threading.Lock())
+
+    # Hold the update locks of several shards (in a fixed order, so concurrent callers can't deadlock)
+    @contextmanager
+    def _locked(self, names) -> Iterator[None]:
+        with ExitStack() as stack:
+            for name in sorted(set(names)):
+                stack.enter_context(self._shard_lock(name))
+            yield
+
+    # Swap fully built shards into service (None drops a shard); the others are left untouched
+    def _swap_shards(self, updates: Dict[str, Optional[Shard]]) -> None:
+        # shards arrive with their table and retriever built, so the swap itself is only bookkeeping
+        with self._swap_lock:
+            self.index_version += 1
+            for shard in updates.values():
+                if shard is not None:
+                    shard.generation = self.index_version
+            shards = {**self.shards, **updates}
+            self.shards = {name: shard for name, shard in shards.items() if shard is not None}
+            self.documents = [doc for shard in self.shards.values() for doc in shard.documents]
+        
+        # answers that only read other shards stay cached
+        if self.answer_cache:
+            self.answer_cache.invalidate(list(updates))
+
+    # Build a shard from its summary documents and detail chunks
+    def _build_shard(self, name: str, summaries: List, details: List) -> Shard:
+        by_id = _dedupe_documents(summaries)
+        vector_store = create_vector_store(list(by_id.values()), list(by_id), self.embeddings)
+        detail_index = DetailIndex.build(list(_dedupe_documents(details).values()), self.embeddings)
+        logger.info(f"'{name}' index parçası oluşturuldu: {len(by_id)} doküman, {len(detail_index)} detay parçası")
+        return Shard(name, vector_store, detail_index)
+
+    # Build several shards concurrently (their embedding calls overlap)
+    def _build_shards(self, summaries: Dict[str, List], details: Dict[str, List]) -> Dict[str, Shard]:
+        names = list(summaries)
+        def build(name: str) -> Shard:
+            return self._build_shard(name, summaries[name], details.get(name, []))
+        
+        if len(names) == 1:
+            return {names[0]: build(names[0])}
+        return dict(zip(names, self._shard_executor.map(build, names)))
+
+    # Insert or replace documents by stable ID; only the shards they belong to are touched
+    def upsert_documents(self, docs: List) -> None:
+        if not docs:
+            logger.warning("Güncellenecek doküman bulunamadı!")
+            return
+        
+        summaries, details = split_levels(docs)
+        summaries_by_shard, details_by_shard = group_by_shard(summaries), group_by_shard(details)
+        for name in dict.fromkeys([*summaries_by_shard, *details_by_shard]):
+            with self._shard_lock(name):
+                self._upsert_shard(name, summaries_by_shard.get(name, []), details_by_shard.get(name, []))
+
+    # Upsert one shard's documents without rebuilding its index (caller holds the shard lock)
+    def _upsert_shard(self, name: str, summaries: List, details: List) -> None:
+        by_id = _dedupe_documents(summaries)
+        shard = self.shards.get(name)
+        if shard is None:
+            if not by_id:
+                logger.warning(f"'{name}' index parçası yok, detay parçaları atlandı")
+                return
+            self._swap_shards({name: self._build_shard(name, summaries, details)})
+            return
+        
+        # an asset's chunks are always replaced as a whole
+        detail_index = shard.detail_index.with_parents(list(_dedupe_documents(details).values()), self.embeddings)
+        if not by_id:
+            self._swap_shards({name: Shard(name, shard.vector_store, detail_index, documents=shard.documents)})
+            logger.info(f"'{name}': {len(details)} detay parçası güncellendi")
+            return
+        
+        existing = [doc_id for doc_id in by_id if doc_id in shard.vector_store.docstore._dict]
+        if existing and not supports_removal(shard.vector_store.index):
+            # IVF/HNSW can't drop vectors safely; rebuild (unchanged documents hit the embedding cache)
+            merged = {document_id(doc): doc for doc in shard.documents}
+            merged.update(by_id)
+            vector_store = create_vector_store(list(merged.values()), list(merged), self.embeddings)
+        else:
+            # only the changed documents are embedded; queries keep using the old store meanwhile
+            with timed("index_update", shard=name):
+                vector_store = self._copy_vector_store(shard.vector_store)
+                if existing:
+                    vector_store.delete(existing)
+                vector_store.add_documents(list(by_id.values()), ids=list(by_id))
+        
+        self._swap_shards({name: Shard(name, vector_store, detail_index)})
+        logger.info(f"'{name}': {len(by_id)} doküman güncellendi ({len(existing)} değişti). "
+                    f"Toplam: {len(self.documents)}")
+
+    # Rebuild the index from a new document set off to the side and swap it in
+    def replace_documents(self, docs: List) -> None:
+        if not docs:
+            raise ValueError("Önce veri yüklemelisiniz!")
+        
+        summaries, details = split_levels(docs)
+        if not summaries:
+            raise ValueError("Önce veri yüklemelisiniz!")
+        
+        summaries_by_shard = group_by_shard(summaries)
+        with self._locked([*self.shards, *summaries_by_shard]):
+            logger.info("Yeni vector store arka planda oluşturuluyor...")
+            shards: Dict[str, Optional[Shard]] = {name: None for name in self.shards}
+            shards.update(self._build_shards(summaries_by_shard, group_by_shard(details)))
+            self._swap_shards(shards)
+        logger.info(f"Vector store yenilendi! Toplam: {len(self.documents)} doküman")
+
+    # Remove documents by stable ID without rebuilding the index; a shard left empty is dropped
+    def remove_documents(self, doc_ids: List[str]) -> int:
+        by_shard: Dict[str, List[str]] = {}
+        for doc_id in dict.fromkeys(doc_ids):
+            by_shard.setdefault(shard_of_id(doc_id), []).append(doc_id)
+        
+        removed = 0
+        for name, ids in by_shard.items():
+            with self._shard_lock(name):
+                shard = self.shards.get(name)
+                if shard is None:
+                    continue
+                
+                existing = [doc_id for doc_id in ids if doc_id in shard.vector_store.docstore._dict]
+                if not existing:
+                    continue
+                
+                kept = {document_id(doc): doc for doc in shard.documents if document_id(doc) not in existing}
+                if not kept:
+                    updated = None
+                elif supports_removal(shard.vector_store.index):
+                    vector_store = self._copy_vector_store(shard.vector_store)
+                    vector_store.delete(existing)
+                    updated = Shard(name, vector_store, shard.detail_index.without_parents(existing))
+                else:
+                    vector_store = create_vector_store(list(kept.values()), list(kept), self.embeddings)
+                    updated = Shard(name, vector_store, shard.detail_index.without_parents(existing))
+                self._swap_shards({name: updated})
+                removed += len(existing)
+        
+        if removed:
+            logger.info(f"{removed} doküman silindi. Toplam: {len(self.documents)}")
+        return removed
 
     # Ask a question and get answer with sources
     def ask_question(self, question: str) -> Dict:
-        if not self.qa_chain:
+        if not self.qa_ready:
             raise ValueError("Önce QA chain oluşturmalısınız!")
         
         if not question.strip():
@@ -59,24 +500,446 @@ class FinanceRAG:
         
         logger.info(f"Soru soruluyor: {question}")
         try:
-            result = self.qa_chain.invoke({"query": question})
-            logger.info("Cevap başarıyla alındı!")
-            return {
-                "question": question,
-                "answer": result["result"],
-                "sources": [doc.metadata for doc in result["source_documents"]]
-            }
+            # read the shards once so a concurrent swap can't mix two indexes
+            shards = self.shards
+            
+            cached = self._lookup_exact(question, self._versions(shards))
+            if cached:
+                return cached
+            
+            if not self.single_flight:
+                return self._answer(question, shards)
+            
+            result, shared = self.single_flight.do(self._flight_key(question, shards),
+                                                   lambda: self._answer(question, shards))
+            return self._shared_result(question, result, "sync") if shared else result
+        except Exception as e:
+            logger.error(f"Soru cevaplanırken hata oluştu: {str(e)}")
+            raise
+
+    # Async variant of ask_question: embedding and LLM calls are awaited, not run on a thread
+    async def aask_question(self, question: str) -> Dict:
+        if not self.qa_ready:
+            raise ValueError("Önce QA chain oluşturmalısınız!")
+        
+        if not question.strip():
+            raise ValueError("Soru boş olamaz!")
+        
+        logger.info(f"Soru soruluyor (async): {question}")
+        try:
+            shards = self.shards
+            
+            cached = self._lookup_exact(question, self._versions(shards))
+            if cached:
+                return cached
+            
+            if not self.single_flight:
+                return await self._aanswer(question, shards)
+            
+            result, shared = await self.single_flight.ado(self._flight_key(question, shards),
+                                                          lambda: self._aanswer(question, shards))
+            return self._shared_result(question, result, "async") if shared else result
         except Exception as e:
             logger.error(f"Soru cevaplanırken hata oluştu: {str(e)}")
             raise
 
+    # Stream sources first, then answer tokens as the LLM produces them
+    def stream_question(self, question: str) -> Iterator[Dict]:
+        if not self.qa_ready:
+            raise ValueError("Önce QA chain oluşturmalısınız!")
+        
+        if not question.strip():
+            raise ValueError("Soru boş olamaz!")
+        
+        logger.info(f"Soru soruluyor (stream): {question}")
+        shards = self.shards
+        
+        cached = self._lookup_exact(question, self._versions(shards))
+        if cached:
+            yield from self._result_events(cached)
+            return
+        
+        if not self.single_flight:
+            yield from self._stream_answer(question, shards)
+            return
+        
+        # subscribers that join late get the already streamed tokens replayed first
+        events, shared = self.single_flight.stream(
+            self._flight_key(question, shards),
+            lambda: self._stream_answer(question, shards),
+            result_events=self._result_events,
+            result_of=lambda event: event["data"] if event["event"] == "done" else None
+        )
+        if shared:
+            COALESCED_REQUESTS.inc(mode="stream")
+            logger.info("Aynı soru zaten cevaplanıyor, stream'e bağlanıldı")
+        yield from events
+
+    # Embed, retrieve and stream one answer (exact cache already checked)
+    def _stream_answer(self, question: str, shards: Dict[str, Shard]) -> Iterator[Dict]:
+        query_embedding = self.embeddings.embed_query(question)
+        terms = self._question_terms(question, shards)
+        cached = self._lookup_semantic(question, query_embedding, self._versions(shards), terms)
+        if cached:
+            yield from self._result_events(cached)
+            return
+        
+        route = route_shards(question, self._table(shards), list(shards))
+        context = self._build_context(self._retrieve(shards, query_embedding, question, route))
+        sources = [doc.metadata for doc in context["documents"]]
+        yield {"event": "sources", "data": sources}
+        
+        messages = QA_PROMPT.format_messages(context=context["text"], question=question)
+        tokens = []
+        aggregate = None
+        # only waits on the LLM are timed, not the time the consumer holds each token
+        for chunk in timed_iter("llm_stream", self.llm.stream(messages)):
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            if chunk.content:
+                tokens.append(chunk.content)
+                yield {"event": "token", "data": chunk.content}
+        record_token_usage(aggregate)
+        
+        result = {"question": question, "answer": "".join(tokens), "sources": sources,
+                  "context_tokens": context["tokens"]}
+        if self.answer_cache:
+            self.answer_cache.put(question, query_embedding, result, self._versions(shards, route), terms)
+        
+        logger.info("Cevap başarıyla stream edildi!")
+        yield {"event": "done", "data": result}
+
+    # Answer many questions with one embedding call, one FAISS search per shard and parallel LLM calls
+    def ask_batch(self, questions: List[str], max_workers: int = BATCH_LLM_CONCURRENCY) -> List[Dict]:
+        if not self.qa_ready:
+            raise ValueError("Önce QA chain oluşturmalısınız!")
+        
+        logger.info(f"{len(questions)} soru toplu olarak soruluyor...")
+        shards = self.shards
+        versions = self._versions(shards)
+        results: List[Optional[Dict]] = [None] * len(questions)
+        
+        pending = []
+        for position, question in enumerate(questions):
+            if not isinstance(question, str) or not question.strip():
+                results[position] = {"question": question, "error": "Soru boş olamaz!"}
+                continue
+            
+            cached = self.answer_cache.get_exact(question, versions) if self.answer_cache else None
+            if cached:
+                results[position] = {**cached, "question": question, "cache": "exact"}
+            else:
+                pending.append(position)
+        
+        if pending:
+            try:
+                query_embeddings = self._embed_queries([questions[p] for p in pending])
+            except Exception as e:
+                logger.error(f"Toplu embedding hatası: {str(e)}")
+                for position in pending:
+                    results[position] = {"question": questions[position], "error": str(e)}
+                return results
+            
+            to_answer = []
+            for position, query_embedding in zip(pending, query_embeddings):
+                terms = self._question_terms(questions[position], shards)
+                cached = self.answer_cache.get_semantic(query_embedding, versions, terms) if self.answer_cache else None
+                if cached:
+                    results[position] = {**cached, "question": questions[position], "cache": "semantic"}
+                else:
+                    to_answer.append((position, query_embedding, terms))
+            
+            if to_answer:
+                table = self._table(shards)
+                routes = [route_shards(questions[position], table, list(shards)) for position, _, _ in to_answer]
+                retrieved = self._retrieve_batch(shards, [embedding for _, embedding, _ in to_answer],
+                                                 [questions[position] for position, _, _ in to_answer], routes)
+                
+                def answer(item):
+                    (position, query_embedding, terms), scored_docs, route = item
+                    question = questions[position]
+                    try:
+                        context = self._build_context(scored_docs)
+                        result = {
+                            "question": question,
+                            "answer": self._generate(question, context["text"]),
+                            "sources": [doc.metadata for doc in context["documents"]],
+                            "context_tokens": context["tokens"]
+                        }
+                    except Exception as e:
+                        logger.error(f"Toplu soru cevaplanırken hata ({question}): {str(e)}")
+                        return position, {"question": question, "error": str(e)}
+                    
+                    if self.answer_cache:
+                        self.answer_cache.put(question, query_embedding, result, self._versions(shards, route), terms)
+                    return position, result
+                
+                workers = max(1, min(max_workers, len(to_answer)))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for position, result in executor.map(answer, zip(to_answer, retrieved, routes)):
+                        results[position] = result
+        
+        logger.info(f"{len(questions)} soru toplu olarak cevaplandı")
+        return results
+
+    # Embed many questions in one call without writing them to the document embedding cache
+    def _embed_queries(self, questions: List[str]) -> List[List[float]]:
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.embed_queries(questions)
+        with timed("embed_query"):
+            return self.embeddings.embed_documents(questions)
+
+    # Retrieve ranked (document, score) pairs for many questions with one FAISS search per shard
+    def _retrieve_batch(self, shards: Dict[str, Shard], query_embeddings: List[List[float]],
+                        questions: Optional[List[str]] = None, routes: Optional[List[List[str]]] = None
+                        ) -> List[List[Tuple[object, Optional[float]]]]:
+        vectors = np.asarray(query_embeddings, dtype=np.float32)
+        questions = questions or [None] * len(vectors)
+        
+        # the hybrid retrievers re-rank a wider dense candidate list
+        fetch_k = max(self.k, HYBRID_DENSE_FETCH_K) if HYBRID_RETRIEVAL_ENABLED else self.k
+        
+        with timed("retrieval"):
+            if routes is None:
+                table = self._table(shards)
+                routes = [route_shards(question, table, list(shards)) for question in questions]
+            hits = self._search_shards(shards, vectors, routes, fetch_k)
+            
+            results = []
+            for shard_hits, question, route in zip(hits, questions, routes):
+                ranked = self._rank(shards, shard_hits, question, route)
+                
+                # IDs missing from the snapshot's shards (index swapped meanwhile) are skipped
+                scored = [(self._get_document(shards, doc_id), score) for doc_id, score in ranked]
+                results.append([(doc, score) for doc, score in scored if doc is not None])
+            
+            if HIERARCHICAL_ENABLED and any(shard.detail_index.parents for shard in shards.values()):
+                results = [self._with_details(shards, scored, embedding, question)
+                           for scored, embedding, question in zip(results, query_embeddings, questions)]
+        return results
+
+    # Search each shard once for the questions routed to it; hits are kept per shard
+    def _search_shards(self, shards: Dict[str, Shard], vectors: np.ndarray, routes: List[List[str]],
+                       fetch_k: int) -> List[Dict[str, List[Tuple[str, float]]]]:
+        jobs = []
+        for name, shard in shards.items():
+            rows = [row for row, route in enumerate(routes) if name in route]
+            if rows:
+                jobs.append((shard, rows))
+        for route in routes:
+            SHARD_SEARCHES.inc(mode="routed" if len(route) < len(shards) else "fanout")
+        
+        def search(job: Tuple[Shard, List[int]]) -> Tuple[Shard, List[int], np.ndarray, np.ndarray]:
+            shard, rows = job
+            queries = vectors[rows]
+            if getattr(shard.vector_store, "_normalize_L2", False):
+                faiss.normalize_L2(queries)
+            distances, indices = shard.vector_store.index.search(queries, fetch_k)
+            return shard, rows, distances, indices
+        
+        # FAISS releases the GIL while searching, so shards are searched in parallel
+        searched = list(self._shard_executor.map(search, jobs)) if len(jobs) > 1 else [search(job) for job in jobs]
+        
+        hits: List[Dict[str, List[Tuple[str, float]]]] = [{} for _ in routes]
+        for shard, rows, distances, indices in searched:
+            ids = shard.vector_store.index_to_docstore_id
+            for row, row_distances, row_indices in zip(rows, distances, indices):
+                # L2 distance -> similarity; shards share one embedding space, so scores compare across them
+                hits[row][shard.name] = [(ids[i], 1.0 / (1.0 + max(float(d), 0.0)))
+                                         for i, d in zip(row_indices, row_distances) if i != -1]
+        return hits
+
+    # Rank one question's hits: each routed shard's hybrid retriever fuses its dense and BM25 lists, then shards merge
+    def _rank(self, shards: Dict[str, Shard], hits: Dict[str, List[Tuple[str, float]]], question: Optional[str],
+              route: List[str]) -> List[Tuple[str, Optional[float]]]:
+        if not HYBRID_RETRIEVAL_ENABLED or not question:
+            dense = [hit for shard_hits in hits.values() for hit in shard_hits]
+            return sorted(dense, key=lambda hit: hit[1], reverse=True)[:self.k]
+        
+        ranked = []
+        for name in route:
+            if name in shards:
+                dense = dict(hits.get(name, []))
+                # keyword-only hits weren't among the nearest fetch_k, so they're no closer than the last one
+                floor = min(dense.values()) if dense else None
+                ranked.extend((doc_id, fused, None if fused is None else dense.get(doc_id, floor))
+                              for doc_id, fused in shards[name].retriever.rank_scored(question, list(dense), self.k))
+        # pinned documents (no score) first; RRF scores are rank based, so they compare across shards.
+        # The context builder gets the dense similarity, which keeps its distance cutoff meaningful
+        ranked = sorted(ranked, key=lambda hit: (hit[1] is not None, -(hit[1] or 0.0)))[:self.k]
+        return [(doc_id, similarity) for doc_id, _, similarity in ranked]
+
+    # Look up a document by stable ID in the shard it belongs to
+    def _get_document(self, shards: Dict[str, Shard], doc_id: str):
+        shard = shards.get(shard_of_id(doc_id))
+        return shard.get(doc_id) if shard else None
+
+    # Add the best detail chunks of the named (else top-ranked) assets to their summaries
+    def _with_details(self, shards: Dict[str, Shard], scored: List[Tuple[object, Optional[float]]],
+                      query_embedding: List[float], question: Optional[str]) -> List[Tuple[object, Optional[float]]]:
+        # a question naming assets only gets their chunks, not those of whatever else ranked high;
+        # symbols resolve against the snapshot's table, so they match the shards being searched
+        table = self._table(shards)
+        named = table.select(table.resolve_symbols(question)) if question else None
+        if named is not None and len(named):
+            parent_ids = [f"{asset_type}:{symbol}" for symbol, asset_type in zip(named["symbol"], named["type"])]
+        else:
+            parent_ids = [document_id(doc) for doc, _ in scored]
+        
+        parents: Dict[str, List[str]] = {}
+        for parent_id in parent_ids[:DETAIL_MAX_PARENTS]:
+            parents.setdefault(shard_of_id(parent_id), []).append(parent_id)
+        
+        period = parse_question_period(question) if question else None
+        details = []
+        for name, ids in parents.items():
+            if name in shards:
+                details.extend(shards[name].detail_index.search(query_embedding, ids, DETAIL_TOP_K, period))
+        details = sorted(details, key=lambda detail: detail[1], reverse=True)[:DETAIL_TOP_K]
+        
+        # chunks keep their similarity, so the context builder weighs them like any other hit
+        return details + scored if period is not None else scored + details
+
+    # Embed, retrieve and generate one answer (exact cache already checked)
+    def _answer(self, question: str, shards: Dict[str, Shard]) -> Dict:
+        # the query embedding serves both the semantic cache and retrieval
+        query_embedding = self.embeddings.embed_query(question)
+        terms = self._question_terms(question, shards)
+        cached = self._lookup_semantic(question, query_embedding, self._versions(shards), terms)
+        if cached:
+            return cached
+        
+        route = route_shards(question, self._table(shards), list(shards))
+        context = self._build_context(self._retrieve(shards, query_embedding, question, route))
+        result = {
+            "question": question,
+            "answer": self._generate(question, context["text"]),
+            "sources": [doc.metadata for doc in context["documents"]],
+            "context_tokens": context["tokens"]
+        }
+        
+        if self.answer_cache:
+            self.answer_cache.put(question, query_embedding, result, self._versions(shards, route), terms)
+        
+        logger.info("Cevap başarıyla alındı!")
+        return result
+
+    # Async variant of _answer
+    async def _aanswer(self, question: str, shards: Dict[str, Shard]) -> Dict:
+        query_embedding = await self.embeddings.aembed_query(question)
+        terms = self._question_terms(question, shards)
+        cached = self._lookup_semantic(question, query_embedding, self._versions(shards), terms)
+        if cached:
+            return cached
+        
+        # FAISS and BM25 lookups take milliseconds and stay on the event loop
+        route = route_shards(question, self._table(shards), list(shards))
+        context = self._build_context(self._retrieve(shards, query_embedding, question, route))
+        result = {
+            "question": question,
+            "answer": await self._agenerate(question, context["text"]),
+            "sources": [doc.metadata for doc in context["documents"]],
+            "context_tokens": context["tokens"]
+        }
+        
+        if self.answer_cache:
+            self.answer_cache.put(question, query_embedding, result, self._versions(shards, route), terms)
+        
+        logger.info("Cevap başarıyla alındı!")
+        return result
+
+    # Get the single-flight key of a question: same wording, same shard generations (from the caller's
+    # snapshot, so a swap between reading the version and the shards can't pair a key with the wrong index)
+    def _flight_key(self, question: str, shards: Dict[str, Shard]) -> Tuple[str, Tuple]:
+        return normalize_question(question), tuple(sorted(self._versions(shards).items()))
+
+    # Hand a result computed for an identical in-flight question to another caller
+    def _shared_result(self, question: str, result: Dict, mode: str) -> Dict:
+        COALESCED_REQUESTS.inc(mode=mode)
+        logger.info("Aynı soru zaten cevaplanıyordu, sonucu paylaşıldı")
+        return {**result, "question": question, "coalesced": True}
+
+    # Emit a finished result with the same events as a streamed answer
+    def _result_events(self, result: Dict) -> Iterator[Dict]:
+        yield {"event": "sources", "data": result["sources"]}
+        yield {"event": "token", "data": result["answer"]}
+        yield {"event": "done", "data": result}
+
+    # Get the symbols and numbers/dates a cached answer must share with the question
+    def _question_terms(self, question: str, shards: Dict[str, Shard]) -> Tuple:
+        return question_terms(question, self._table(shards).resolve_symbols(question))
+
+    # Look up an answer by question text
+    def _lookup_exact(self, question: str, versions: Dict[str, int]) -> Optional[Dict]:
+        cached = self.answer_cache.get_exact(question, versions) if self.answer_cache else None
+        CACHE_LOOKUPS.inc(cache="answer_exact", result="hit" if cached else "miss")
+        if not cached:
+            return None
+        logger.info("Cevap cache'ten alındı (tam eşleşme)")
+        return {**cached, "question": question, "cache": "exact"}
+
+    # Look up an answer by question embedding
+    def _lookup_semantic(self, question: str, query_embedding: List[float],
+                         versions: Dict[str, int], terms: Tuple) -> Optional[Dict]:
+        cached = self.answer_cache.get_semantic(query_embedding, versions, terms) if self.answer_cache else None
+        CACHE_LOOKUPS.inc(cache="answer_semantic", result="hit" if cached else "miss")
+        if not cached:
+            return None
+        logger.info("Cevap cache'ten alındı (anlamsal eşleşme)")
+        return {**cached, "question": question, "cache": "semantic"}
+
+    # Retrieve the ranked (document, score) pairs for a question and its embedding
+    def _retrieve(self, shards: Dict[str, Shard], query_embedding: List[float], question: Optional[str] = None,
+                  route: Optional[List[str]] = None) -> List[Tuple[object, Optional[float]]]:
+        return self._retrieve_batch(shards, [query_embedding], [question], [route] if route else None)[0]
+
+    # Build the token-budgeted prompt context from ranked documents
+    def _build_context(self, scored_docs: List[Tuple[object, Optional[float]]]) -> Dict:
+        context = self.context_builder.build(scored_docs)
+        CONTEXT_TOKENS.inc(context["tokens"])
+        logger.info(f"Bağlam: {context['tokens']} token, {len(context['documents'])} doküman "
+                    f"({context['dropped']} atıldı)")
+        return context
+
+    # Generate an answer from the LLM for the given context
+    def _generate(self, question: str, context: str) -> str:
+        messages = QA_PROMPT.format_messages(context=context, question=question)
+        with timed("llm"):
+            response = self.llm.invoke(messages)
+        record_token_usage(response)
+        return response.content
+
+    # Generate an answer without blocking the event loop
+    async def _agenerate(self, question: str, context: str) -> str:
+        messages = QA_PROMPT.format_messages(context=context, question=question)
+        with timed("llm"):
+            response = await self.llm.ainvoke(messages)
+        record_token_usage(response)
+        return response.content
+
+    # Get answer cache hit/miss statistics
+    def get_cache_stats(self) -> Optional[Dict]:
+        return self.answer_cache.get_stats() if self.answer_cache else None
+
+    # Get single-flight (request coalescing) statistics
+    def get_single_flight_stats(self) -> Optional[Dict]:
+        return self.single_flight.get_stats() if self.single_flight else None
+
     # Get total number of loaded documents
     def get_document_count(self) -> int:
         return len(self.documents)
     
+    # Get the number of detail chunks under the summary documents
+    def get_detail_count(self) -> int:
+        return sum(len(shard.detail_index) for shard in self.shards.values())
+    
+    # Get per-shard document counts and served versions
+    def get_shard_stats(self) -> Dict[str, Dict]:
+        return {name: shard.get_stats() for name, shard in self.shards.items()}
+    
     # Clear all documents and reset system
     def clear_documents(self) -> None:
-        self.documents.clear()
-        self.vector_store = None
-        self.qa_chain = None
+        with self._locked(self.shards):
+            self.detail_documents = []
+            self.qa_ready = False
+            self._swap_shards({name: None for name in self.shards})
         logger.info("Tüm dokümanlar temizlendi!")
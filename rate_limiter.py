@@ -0,0 +1,159 @@
+"""
+Rate Limiter - Token Bucket ve Paralel İstek Zamanlayıcı
+Harici API kotalarına uyarak istekleri eşzamanlı çalıştırır
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Get the HTTP response an exception (or one it was raised from) carries; pycoingecko re-raises
+# requests' HTTPError as a ValueError of the JSON body, leaving the response on the chained error
+def _response_of(exc: Optional[BaseException]):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        response = getattr(exc, "response", None)
+        if response is not None:
+            return response
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+# Check whether an exception represents an HTTP 429 response
+def is_rate_limit_error(exc: Exception) -> bool:
+    return getattr(_response_of(exc), "status_code", None) == 429
+
+
+# Read the Retry-After header (seconds) from an exception, if present
+def _retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(_response_of(exc), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket hız sınırlayıcı - thread-safe"""
+
+    # Initialize bucket with a per-minute refill rate and burst capacity
+    def __init__(self, requests_per_minute: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute pozitif olmalı!")
+
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    # Add tokens accumulated since the last update (lock must be held)
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Take a token if available; otherwise return seconds until one is
+    def try_acquire(self) -> float:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    # Block until a token is available
+    def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+    # Drain the bucket so the next token is available only after the given seconds
+    def penalize(self, seconds: float) -> None:
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class RequestScheduler:
+    """Hız sınırlı, eşzamanlı ve 429'da yeniden deneyen istek zamanlayıcı"""
+
+    # Initialize scheduler with a shared bucket and retry policy
+    def __init__(self, rate_limiter: TokenBucket, max_in_flight: int = 1,
+                 max_retries: int = 3, backoff_base: float = 2.0, backoff_max: float = 60.0):
+        self.rate_limiter = rate_limiter
+        # more in-flight requests than the burst size would only queue on the bucket
+        self.max_in_flight = max(1, min(max_in_flight, rate_limiter.capacity))
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "retries": 0, "failures": 0}
+
+    # Increment a stats counter
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # Run a single call under the rate limit, retrying on 429 with backoff
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            self._count("requests")
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+
+                self._count("rate_limited")
+                self._count("retries")
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    delay += random.uniform(0, delay / 2)
+
+                attempt += 1
+                logger.warning(f"Rate limit aşıldı (429), {delay:.1f} sn sonra tekrar denenecek "
+                               f"({attempt}/{self.max_retries})")
+                # every worker sharing the bucket backs off, not only this one
+                self.rate_limiter.penalize(delay)
+
+    # Run fn for every item concurrently; returns (item, result, error) in input order
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any],
+            on_result: Optional[Callable[[Any, Any, Optional[Exception]], None]] = None
+            ) -> List[Tuple[Any, Any, Optional[Exception]]]:
+        items = list(items)
+        if not items:
+            return []
+
+        def run(item):
+            try:
+                outcome = item, self.call(fn, item), None
+            except Exception as e:
+                outcome = item, None, e
+            if on_result:
+                on_result(*outcome)
+            return outcome
+
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(items))) as executor:
+            return list(executor.map(run, items))
+
+    # Get a snapshot of scheduler counters
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
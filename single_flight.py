@@ -0,0 +1,173 @@
+"""
+Single Flight - Devam Eden Aynı İsteklerin Birleştirilmesi
+Aynı anahtarla gelen eşzamanlı isteklerde işi yalnızca ilki yapar, diğerleri onun sonucunu (veya event akışını) paylaşır
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """Devam eden tek bir iş: sonucu ve (stream ise) yayınlanan event'leri"""
+
+    # Initialize an unfinished flight
+    def __init__(self, streaming: bool = False):
+        self.streaming = streaming
+        self.future: Future = Future()
+        self._events: List[Dict] = []
+        self._done = False
+        self._condition = threading.Condition()
+
+    # Append an event for current and future subscribers
+    def publish(self, event: Dict) -> None:
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+
+    # Finish with a result
+    def finish(self, result: Any) -> None:
+        self.future.set_result(result)
+        self._close()
+
+    # Finish with an error that every waiter re-raises
+    def fail(self, error: BaseException) -> None:
+        self.future.set_exception(error)
+        self._close()
+
+    # Wake up subscribers after the flight finished
+    def _close(self) -> None:
+        with self._condition:
+            self._done = True
+            self._condition.notify_all()
+
+    # Block until the result is available
+    def wait(self) -> Any:
+        return self.future.result()
+
+    # Replay published events, then follow new ones until the flight finishes
+    def subscribe(self) -> Iterator[Dict]:
+        position = 0
+        while True:
+            with self._condition:
+                while position >= len(self._events) and not self._done:
+                    self._condition.wait()
+                pending = self._events[position:]
+                position = len(self._events)
+                done = self._done
+
+            for event in pending:
+                yield event
+            if done:
+                break
+
+        if self.future.exception() is not None:
+            raise self.future.exception()
+
+
+class SingleFlight:
+    """Anahtar başına en fazla bir devam eden iş - thread-safe, sync/async/stream"""
+
+    # Initialize with no flights in progress
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "shared": 0}
+
+    # Join the flight for a key; returns (flight, True) if the caller has to do the work
+    def _join(self, key: Hashable, streaming: bool) -> Tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.stats["shared"] += 1
+                return flight, False
+
+            flight = self._flights[key] = Flight(streaming)
+            self.stats["leaders"] += 1
+            return flight, True
+
+    # Forget a finished flight so later requests start fresh
+    def _leave(self, key: Hashable, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    # Run fn once per key at a time; returns (result, shared)
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        flight, leader = self._join(key, streaming=False)
+        if not leader:
+            return flight.wait(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        else:
+            flight.finish(result)
+            return result, False
+        finally:
+            self._leave(key, flight)
+
+    # Async variant of do; followers await the result without blocking the event loop
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        flight, leader = self._join(key, streaming=False)
+        if not leader:
+            return await asyncio.wrap_future(flight.future), True
+
+        # the work runs as its own task: cancelling the leader (client gone) doesn't fail the followers
+        task = asyncio.ensure_future(self._arun(key, flight, fn))
+        # an error is re-raised to the waiters; retrieving it here avoids "never retrieved" warnings
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task), False
+
+    # Run the leader's coroutine and finish its flight
+    async def _arun(self, key: Hashable, flight: Flight, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await fn()
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        else:
+            flight.finish(result)
+            return result
+        finally:
+            self._leave(key, flight)
+
+    # Stream events once per key at a time; returns (events, shared)
+    # The producer runs on its own thread, so one subscriber disconnecting doesn't cut off the others;
+    # result_events turns the result of a non-streaming flight into the same events.
+    def stream(self, key: Hashable, events: Callable[[], Iterator[Dict]],
+               result_events: Callable[[Any], Iterator[Dict]],
+               result_of: Callable[[Dict], Optional[Any]]) -> Tuple[Iterator[Dict], bool]:
+        flight, leader = self._join(key, streaming=True)
+        if not leader:
+            return (flight.subscribe() if flight.streaming else result_events(flight.wait())), True
+
+        threading.Thread(target=self._produce, args=(key, flight, events, result_of),
+                         name="single-flight-stream", daemon=True).start()
+        return flight.subscribe(), False
+
+    # Drain a streaming producer into its flight
+    def _produce(self, key: Hashable, flight: Flight, events: Callable[[], Iterator[Dict]],
+                 result_of: Callable[[Dict], Optional[Any]]) -> None:
+        result = None
+        try:
+            for event in events():
+                flight.publish(event)
+                result = result_of(event) or result
+        except BaseException as e:
+            logger.error(f"Paylaşılan stream hatası: {str(e)}")
+            flight.fail(e)
+        else:
+            flight.finish(result)
+        finally:
+            self._leave(key, flight)
+
+    # Get the number of flights started and requests that joined one
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._flights)}
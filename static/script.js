@@ -81,6 +81,9 @@ class FinanceRAGApp {
                 this.isInitialized = true;
                 this.updateStatus('ready', 'Sistem Hazır');
                 this.showChatSection();
+            } else if (data.initialization && data.initialization.state === 'running') {
+                // another tab or client already started initialization
+                this.initializeSystem();
             } else {
                 this.updateStatus('loading', 'Başlatılıyor...');
             }
@@ -107,14 +110,18 @@ class FinanceRAGApp {
             
             const data = await response.json();
             
-            if (data.success) {
-                this.isInitialized = true;
-                this.updateStatus('ready', 'Sistem Hazır');
-                this.showChatSection();
-                this.showSuccessMessage('Sistem başarıyla başlatıldı!');
-            } else {
+            if (!data.success) {
                 throw new Error(data.message || 'Başlatma hatası');
             }
+            
+            if (!data.status.initialized) {
+                await this.waitForInitialization();
+            }
+            
+            this.isInitialized = true;
+            this.updateStatus('ready', 'Sistem Hazır');
+            this.showChatSection();
+            this.showSuccessMessage('Sistem başarıyla başlatıldı!');
         } catch (error) {
             console.error('Initialize error:', error);
             this.showError(error.message || 'Sistem başlatılamadı');
@@ -126,6 +133,39 @@ class FinanceRAGApp {
         }
     }
     
+    async waitForInitialization() {
+        const phaseLabels = {
+            load_index: 'Kayıtlı index kontrol ediliyor',
+            fetch_stocks: 'Hisse verileri çekiliyor',
+            fetch_crypto: 'Kripto verileri çekiliyor',
+            build_index: 'Vector store oluşturuluyor',
+            build_qa_chain: 'QA chain oluşturuluyor'
+        };
+        
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1500));
+            
+            const response = await fetch('/api/status');
+            const data = await response.json();
+            
+            if (data.initialized) {
+                return;
+            }
+            
+            const job = data.initialization;
+            if (!job || job.state === 'failed') {
+                throw new Error((job && job.error) || data.message || 'Sistem başlatılamadı');
+            }
+            
+            const progress = job.progress;
+            const label = phaseLabels[progress.phase] || 'Sistem başlatılıyor';
+            this.showLoading(
+                `${label}... (${progress.tickers_fetched} hisse, ${progress.coins_fetched} kripto, ` +
+                `${Math.round(job.elapsed_sec)} sn)`
+            );
+        }
+    }
+    
     async sendQuestion() {
         const question = this.elements.questionInput.value.trim();
         
@@ -147,8 +187,11 @@ class FinanceRAGApp {
         this.elements.sendBtn.disabled = true;
         this.elements.questionInput.disabled = true;
         
+        // Bot message is filled in as the answer streams
+        const message = this.addMessage('bot', '');
+        
         try {
-            const response = await fetch('/api/ask', {
+            const response = await fetch('/api/ask/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -156,16 +199,28 @@ class FinanceRAGApp {
                 body: JSON.stringify({ question })
             });
             
-            const data = await response.json();
-            
-            if (data.success) {
-                this.addMessage('bot', data.answer, data.sources);
-            } else {
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!contentType.includes('text/event-stream')) {
+                const data = await response.json();
                 throw new Error(data.message || 'Soru cevaplanamadı');
             }
+            
+            await this.readEventStream(response, (event, data) => {
+                if (event === 'sources') {
+                    message.record.sources = data;
+                    this.renderSources(message, data);
+                } else if (event === 'token') {
+                    message.text.textContent += data;
+                    message.record.content = message.text.textContent;
+                    this.elements.chatMessages.scrollTop = this.elements.chatMessages.scrollHeight;
+                } else if (event === 'error') {
+                    throw new Error(data.message || 'Soru cevaplanamadı');
+                }
+            });
         } catch (error) {
             console.error('Ask error:', error);
-            this.addMessage('bot', `Üzgünüm, bir hata oluştu: ${error.message}`);
+            message.text.textContent = `Üzgünüm, bir hata oluştu: ${error.message}`;
+            message.record.content = message.text.textContent;
         } finally {
             // Re-enable send button
             this.elements.sendBtn.disabled = false;
@@ -174,6 +229,40 @@ class FinanceRAGApp {
         }
     }
     
+    async readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            
+            // SSE messages are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const raw = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                const dataLines = [];
+                raw.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        dataLines.push(line.slice(5).trimStart());
+                    }
+                });
+                
+                if (dataLines.length > 0) {
+                    onEvent(event, JSON.parse(dataLines.join('\n')));
+                }
+            }
+        }
+    }
+    
     addMessage(type, content, sources = null) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${type}-message`;
@@ -189,39 +278,6 @@ class FinanceRAGApp {
         messageText.textContent = content;
         messageContent.appendChild(messageText);
         
-        // Add sources if available
-        if (sources && sources.length > 0) {
-            const sourcesDiv = document.createElement('div');
-            sourcesDiv.className = 'sources';
-            
-            const sourcesTitle = document.createElement('h4');
-            sourcesTitle.textContent = `Kaynaklar (${sources.length})`;
-            sourcesDiv.appendChild(sourcesTitle);
-            
-            sources.forEach(source => {
-                const sourceItem = document.createElement('div');
-                sourceItem.className = 'source-item';
-                
-                let sourceText = '';
-                if (source.ticker) {
-                    sourceText = `Hisse: ${source.ticker}`;
-                    if (source.price_change_pct !== undefined) {
-                        sourceText += ` (${source.price_change_pct.toFixed(2)}%)`;
-                    }
-                } else if (source.coin) {
-                    sourceText = `Kripto: ${source.coin}`;
-                    if (source.price_change_pct !== undefined) {
-                        sourceText += ` (${source.price_change_pct.toFixed(2)}%)`;
-                    }
-                }
-                
-                sourceItem.textContent = sourceText;
-                sourcesDiv.appendChild(sourceItem);
-            });
-            
-            messageContent.appendChild(sourcesDiv);
-        }
-        
         // Add timestamp
         const messageMeta = document.createElement('div');
         messageMeta.className = 'message-meta';
@@ -232,10 +288,54 @@ class FinanceRAGApp {
         messageDiv.appendChild(messageContent);
         
         this.elements.chatMessages.appendChild(messageDiv);
-        this.elements.chatMessages.scrollTop = this.elements.chatMessages.scrollHeight;
         
         // Store message
-        this.chatMessages.push({ type, content, sources, timestamp: new Date() });
+        const record = { type, content, sources, timestamp: new Date() };
+        this.chatMessages.push(record);
+        
+        const message = { content: messageContent, text: messageText, meta: messageMeta, record };
+        
+        // Add sources if available
+        this.renderSources(message, sources);
+        
+        this.elements.chatMessages.scrollTop = this.elements.chatMessages.scrollHeight;
+        return message;
+    }
+    
+    renderSources(message, sources) {
+        if (!sources || sources.length === 0) {
+            return;
+        }
+        
+        const sourcesDiv = document.createElement('div');
+        sourcesDiv.className = 'sources';
+        
+        const sourcesTitle = document.createElement('h4');
+        sourcesTitle.textContent = `Kaynaklar (${sources.length})`;
+        sourcesDiv.appendChild(sourcesTitle);
+        
+        sources.forEach(source => {
+            const sourceItem = document.createElement('div');
+            sourceItem.className = 'source-item';
+            
+            let sourceText = '';
+            if (source.ticker) {
+                sourceText = `Hisse: ${source.ticker}`;
+                if (source.price_change_pct !== undefined) {
+                    sourceText += ` (${source.price_change_pct.toFixed(2)}%)`;
+                }
+            } else if (source.coin) {
+                sourceText = `Kripto: ${source.coin}`;
+                if (source.price_change_pct !== undefined) {
+                    sourceText += ` (${source.price_change_pct.toFixed(2)}%)`;
+                }
+            }
+            
+            sourceItem.textContent = sourceText;
+            sourcesDiv.appendChild(sourceItem);
+        });
+        
+        message.content.insertBefore(sourcesDiv, message.meta);
     }
     
     async loadSampleQuestions() {
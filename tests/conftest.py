@@ -0,0 +1,16 @@
+"""
+Test ortamı - offline sağlayıcılar ve geçici cache dizinleri
+"""
+import os
+import sys
+import tempfile
+
+# config reads these at import time: hash embeddings, the stub LLM and throwaway cache/index directories
+_ROOT = tempfile.mkdtemp(prefix="finance-rag-tests-")
+os.environ.setdefault("EMBEDDING_PROVIDER", "hash")
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("INDEX_DIR", os.path.join(_ROOT, "index"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_ROOT, "embeddings.sqlite"))
+os.environ.setdefault("TIMESERIES_DIR", os.path.join(_ROOT, "timeseries"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
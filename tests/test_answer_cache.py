@@ -0,0 +1,53 @@
+"""
+Answer Cache testleri - anlamsal eşleşmede sembol ve sayı koruması
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_cache import AnswerCache, question_terms  # noqa: E402
+
+EMBEDDING = [0.6, 0.8, 0.0]
+VERSIONS = {"stock": 1}
+
+
+def test_semantic_hit_requires_same_ticker():
+    cache = AnswerCache(similarity_threshold=0.97)
+    asels = "ASELS hissesinin son durumu nasıl?"
+    thyao = "THYAO hissesinin son durumu nasıl?"
+    cache.put(asels, EMBEDDING, {"answer": "ASELS"}, VERSIONS, question_terms(asels, ["ASELS.IS"]))
+
+    # template questions embed (almost) identically; only the resolved symbol differs
+    assert cache.get_semantic(EMBEDDING, VERSIONS, question_terms(thyao, ["THYAO.IS"])) is None
+    assert cache.get_semantic(EMBEDDING, VERSIONS, question_terms(asels, ["ASELS.IS"]))["answer"] == "ASELS"
+
+
+def test_semantic_hit_requires_same_numbers():
+    cache = AnswerCache(similarity_threshold=0.97)
+    question = "En çok yükselen 3 hisse hangisi?"
+    cache.put(question, EMBEDDING, {"answer": "3"}, VERSIONS, question_terms(question, []))
+
+    other = "En çok yükselen 5 hisse hangisi?"
+    assert cache.get_semantic(EMBEDDING, VERSIONS, question_terms(other, [])) is None
+
+
+def test_invalidate_drops_only_entries_that_read_the_shard():
+    cache = AnswerCache()
+    cache.put("ASELS fiyatı", EMBEDDING, {"answer": "stock"}, {"stock": 1}, ())
+    cache.put("bitcoin fiyatı", [0.0, 0.6, 0.8], {"answer": "crypto"}, {"crypto": 1}, ())
+
+    cache.invalidate(["crypto"])
+    assert cache.get_exact("ASELS fiyatı", {"stock": 1, "crypto": 2})["answer"] == "stock"
+    assert cache.get_exact("bitcoin fiyatı", {"stock": 1, "crypto": 1}) is None
+
+    cache.invalidate()
+    assert cache.get_exact("ASELS fiyatı", {"stock": 1, "crypto": 2}) is None
+
+
+def test_entry_of_an_older_generation_is_not_served():
+    cache = AnswerCache()
+    cache.put("ASELS fiyatı", EMBEDDING, {"answer": "old"}, {"stock": 1}, ())
+
+    assert cache.get_exact("asels fiyatı?", {"stock": 2}) is None
+    assert cache.get_semantic(EMBEDDING, {"stock": 2}, ()) is None
@@ -0,0 +1,33 @@
+"""
+Background Refresher testleri - işler birbirini beklemez, süren iş tekrar başlatılmaz
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from background_refresher import BackgroundRefresher  # noqa: E402
+
+
+def test_slow_job_does_not_block_others_and_is_skipped_while_running():
+    release = threading.Event()
+    fast_runs = []
+
+    refresher = BackgroundRefresher()
+    refresher.add_job("slow", 0.05, lambda: release.wait(5))
+    refresher.add_job("fast", 0.05, lambda: fast_runs.append(time.monotonic()) or True)
+    refresher.start()
+    try:
+        time.sleep(0.5)
+        status = refresher.get_status()["jobs"]
+        # the slow job is still in its first run while the fast one kept its schedule
+        assert status["slow"]["running"] and status["slow"]["runs"] == 0
+        assert status["slow"]["skipped"] >= 1
+        assert len(fast_runs) >= 3
+    finally:
+        release.set()
+        refresher.stop()
+
+    assert refresher.get_status()["jobs"]["slow"]["runs"] == 1
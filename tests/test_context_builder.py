@@ -0,0 +1,63 @@
+"""
+Context Builder testleri - token bütçesi, mesafe eşiği, tekrar ve tabloda olan satırlar
+"""
+import os
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_builder import ContextBuilder, count_tokens  # noqa: E402
+
+
+# Build a stock summary document with a few detail lines
+def stock_doc(ticker: str, price: float, extra_lines: int = 0) -> Document:
+    lines = [f"{ticker} Hisse Senedi Analizi:", f"- Son kapanış fiyatı: {price:.2f} TL",
+             f"- Dönem değişimi: 1.00 TL (1.50%)", "- Volatilite: 5.00%"]
+    lines += [f"- Not {i}: {ticker} için uzun açıklama satırı numara {i}" for i in range(extra_lines)]
+    return Document(page_content="\n".join(lines),
+                    metadata={"ticker": ticker, "type": "stock", "latest_price": price,
+                              "price_change_pct": 1.5, "volatility": 5.0})
+
+
+# Convert an L2 distance to the 1/(1+d) score the retriever returns
+def score(distance: float) -> float:
+    return 1.0 / (1.0 + distance)
+
+
+def test_context_stays_within_the_token_budget():
+    docs = [(stock_doc(f"T{i}.IS", 10.0 + i, extra_lines=20), score(0.1)) for i in range(10)]
+    context = ContextBuilder(max_tokens=200).build(docs)
+
+    assert context["tokens"] <= 200
+    # the table rows fit, the detail lines of the best-ranked document come before the others'
+    assert "T0.IS için uzun açıklama satırı numara 0" in context["text"]
+    assert "T9.IS için" not in context["text"]
+
+
+def test_distant_and_duplicate_documents_are_dropped():
+    near, duplicate, far = stock_doc("ASELS.IS", 60.0), stock_doc("ASELS.IS", 60.0), stock_doc("THYAO.IS", 300.0)
+    context = ContextBuilder(max_tokens=1000).build([(near, score(0.2)), (duplicate, score(0.2)),
+                                                     (far, score(0.2 * 1.5 + 0.1))])
+
+    assert [doc.metadata["ticker"] for doc in context["documents"]] == ["ASELS.IS"]
+    assert context["dropped"] == 2
+
+
+def test_pinned_documents_ignore_the_distance_cutoff():
+    pinned = stock_doc("THYAO.IS", 300.0)
+    context = ContextBuilder(max_tokens=1000).build([(stock_doc("ASELS.IS", 60.0), score(0.1)), (pinned, None)])
+
+    assert {doc.metadata["ticker"] for doc in context["documents"]} == {"ASELS.IS", "THYAO.IS"}
+
+
+def test_lines_covered_by_the_table_are_not_repeated():
+    context = ContextBuilder(max_tokens=1000).build([(stock_doc("ASELS.IS", 60.0), score(0.1))])
+
+    assert "Özet tablo:" in context["text"]
+    assert "Son kapanış fiyatı" not in context["text"]
+    assert "Volatilite:" not in context["text"]
+    # the absolute change is not in the table, so its line stays
+    assert "Dönem değişimi" in context["text"]
+    assert context["tokens"] == count_tokens(context["text"])
@@ -0,0 +1,73 @@
+"""
+Hybrid Retriever testleri - BM25 sıralaması, sembol/tip ön filtresi ve RRF birleştirme
+"""
+import os
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hybrid_retriever import BM25Index, HybridRetriever  # noqa: E402
+from metrics_table import MetricsTable  # noqa: E402
+
+
+# Build a summary document for a symbol
+def make_doc(symbol: str, asset_type: str, text: str) -> Document:
+    key = "ticker" if asset_type == "stock" else "coin"
+    return Document(page_content=text, metadata={key: symbol, "type": asset_type, "latest_price": 1.0,
+                                                 "price_change_pct": 0.0, "volatility": 1.0})
+
+
+DOCS = [
+    make_doc("ASELS.IS", "stock", "ASELS savunma sanayi hissesi yükseliş"),
+    make_doc("THYAO.IS", "stock", "THYAO havayolu hissesi yolcu sayısı"),
+    make_doc("KCHOL.IS", "stock", "KCHOL holding hissesi temettü"),
+    make_doc("bitcoin", "crypto", "BITCOIN kripto para halving"),
+    make_doc("ethereum", "crypto", "ETHEREUM kripto para staking")
+]
+IDS = ["stock:ASELS.IS", "stock:THYAO.IS", "stock:KCHOL.IS", "crypto:bitcoin", "crypto:ethereum"]
+
+
+# Build the retriever over the sample documents
+def make_retriever() -> HybridRetriever:
+    return HybridRetriever(DOCS, MetricsTable(DOCS), IDS)
+
+
+def test_bm25_ranks_term_matches_first_and_respects_candidates():
+    index = BM25Index(IDS, [doc.page_content for doc in DOCS])
+
+    assert index.search("temettü veren holding")[0] == "stock:KCHOL.IS"
+    assert set(index.search("halving staking")) == {"crypto:bitcoin", "crypto:ethereum"}
+    assert index.search("temettü", candidates={"stock:ASELS.IS"}) == []
+    assert index.search("bilinmeyen kelime") == []
+
+
+def test_candidates_follow_named_symbols_then_asset_type():
+    retriever = make_retriever()
+
+    assert retriever.candidates("ASELS ne durumda?") == {"stock:ASELS.IS"}
+    assert retriever.candidates("en iyi kripto hangisi?") == {"crypto:bitcoin", "crypto:ethereum"}
+    assert retriever.candidates("piyasa nasıl?") is None
+
+
+def test_named_symbols_are_pinned():
+    ranked = make_retriever().rank_scored("ASELS ve THYAO karşılaştır", ["crypto:bitcoin", "stock:KCHOL.IS"], k=3)
+
+    assert {doc_id for doc_id, _ in ranked} == {"stock:ASELS.IS", "stock:THYAO.IS"}
+    assert all(score is None for _, score in ranked)
+
+
+def test_rrf_prefers_documents_ranked_by_both_lists():
+    # dense ranks THYAO first, but only KCHOL also matches the keywords
+    dense = ["stock:THYAO.IS", "stock:KCHOL.IS", "stock:ASELS.IS"]
+    ranked = make_retriever().rank_scored("temettü veren hisse hangisi", dense, k=2)
+
+    assert [doc_id for doc_id, _ in ranked] == ["stock:KCHOL.IS", "stock:THYAO.IS"]
+    scores = [score for _, score in ranked]
+    assert scores[0] > scores[1] > 0
+
+
+def test_rank_is_limited_to_k_without_a_score_cutoff():
+    dense = ["stock:ASELS.IS", "stock:THYAO.IS", "stock:KCHOL.IS", "crypto:bitcoin", "crypto:ethereum"]
+    assert len(make_retriever().rank("piyasa özeti", dense, k=4)) == 4
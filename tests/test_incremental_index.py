@@ -0,0 +1,98 @@
+"""
+Artımlı index testleri - doküman ekleme/güncelleme/silme, parça versiyonları ve cevap cache'i
+"""
+import os
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_store import IndexStore  # noqa: E402
+from rag_system import FinanceRAG  # noqa: E402
+
+
+# Build a stock summary document
+def stock_doc(ticker: str, price: float) -> Document:
+    return Document(page_content=f"{ticker} Hisse Senedi Analizi:\n- Son kapanış fiyatı: {price:.2f} TL",
+                    metadata={"ticker": ticker, "type": "stock", "latest_price": price,
+                              "price_change_pct": 1.0, "volatility": 5.0})
+
+
+# Build a crypto summary document
+def crypto_doc(coin: str, price: float) -> Document:
+    return Document(page_content=f"{coin.upper()} Kripto Para Analizi:\n- Son fiyat: ${price:,.2f} USD",
+                    metadata={"coin": coin, "type": "crypto", "vs_currency": "usd", "latest_price": price,
+                              "price_change_pct": -1.0, "volatility": 8.0})
+
+
+# Build a ready RAG system over two stocks and one coin
+def make_rag(index_store=None) -> FinanceRAG:
+    rag = FinanceRAG(embedding_provider="hash", llm_provider="stub", index_store=index_store)
+    rag.load_documents([stock_doc("ASELS.IS", 60.0), stock_doc("THYAO.IS", 300.0), crypto_doc("bitcoin", 60000.0)])
+    rag.build_vector_store()
+    rag.build_qa_chain()
+    return rag
+
+
+def test_upsert_replaces_by_id_and_only_touches_its_shard():
+    rag = make_rag()
+    crypto_generation = rag.shards["crypto"].generation
+
+    rag.upsert_documents([stock_doc("ASELS.IS", 65.0), stock_doc("KCHOL.IS", 150.0)])
+
+    assert rag.get_document_count() == 4
+    assert rag.shards["stock"].get("stock:ASELS.IS").metadata["latest_price"] == 65.0
+    assert rag.shards["stock"].get("stock:KCHOL.IS") is not None
+    assert rag.shards["crypto"].generation == crypto_generation
+    assert rag.metrics_table.select(["ASELS.IS"])["latest_price"].tolist() == [65.0]
+
+
+def test_remove_documents_drops_ids_and_empty_shards():
+    rag = make_rag()
+
+    assert rag.remove_documents(["stock:THYAO.IS", "stock:MISSING.IS"]) == 1
+    assert rag.shards["stock"].get("stock:THYAO.IS") is None
+    assert rag.get_document_count() == 2
+
+    assert rag.remove_documents(["crypto:bitcoin"]) == 1
+    assert "crypto" not in rag.shards
+
+
+def test_updating_a_shard_invalidates_only_answers_that_read_it():
+    rag = make_rag()
+    stock_question = "ASELS hissesinin son fiyatı nedir?"
+    crypto_question = "bitcoin kripto son fiyatı nedir?"
+    rag.ask_question(stock_question)
+    rag.ask_question(crypto_question)
+    hits = rag.get_cache_stats()["exact_hits"]
+
+    rag.upsert_documents([crypto_doc("bitcoin", 61000.0)])
+
+    # the stock answer read only the stock shard, so it is still served from the cache
+    rag.ask_question(stock_question)
+    assert rag.get_cache_stats()["exact_hits"] == hits + 1
+    # the crypto answer is recomputed from the new document
+    answer = rag.ask_question(crypto_question)
+    assert rag.get_cache_stats()["exact_hits"] == hits + 1
+    assert answer["sources"][0]["latest_price"] == 61000.0
+
+
+def test_saved_shards_reload_from_latest(tmp_path):
+    writer = make_rag(IndexStore(str(tmp_path), mmap=False))
+    writer.save_index({"stock": "stocks", "crypto": "coins"})
+
+    reader = FinanceRAG(embedding_provider="hash", llm_provider="stub", index_store=IndexStore(str(tmp_path), mmap=False))
+    assert reader.load_index({"stock": "stocks", "crypto": "coins"})
+    assert reader.get_document_count() == 3
+
+    # a newer stock version written by another process is picked up; crypto keeps its version
+    writer.upsert_documents([stock_doc("KCHOL.IS", 150.0)])
+    writer.save_index({"stock": "stocks", "crypto": "coins"})
+    crypto_version = reader.shards["crypto"].version
+
+    assert reader.reload_latest_index({"stock": "stocks", "crypto": "coins"})
+    assert reader.shards["stock"].version == "v000002"
+    assert reader.shards["crypto"].version == crypto_version
+    assert reader.get_document_count() == 4
+    assert not reader.reload_latest_index({"stock": "stocks", "crypto": "coins"})
@@ -0,0 +1,48 @@
+"""
+Index Shards testleri - doküman/ID'den parça bulma ve soruların parçalara yönlendirilmesi
+"""
+import os
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_shards import shard_of, shard_of_id, group_by_shard, route_shards  # noqa: E402
+from metrics_table import MetricsTable  # noqa: E402
+
+STOCK = Document(page_content="", metadata={"ticker": "ASELS.IS", "type": "stock", "latest_price": 60.0,
+                                            "price_change_pct": 1.0, "volatility": 5.0})
+CRYPTO = Document(page_content="", metadata={"coin": "bitcoin", "type": "crypto", "latest_price": 60000.0,
+                                             "price_change_pct": -1.0, "volatility": 8.0})
+NAMES = ["stock", "crypto"]
+
+
+def test_shard_of_document_and_id():
+    assert shard_of(STOCK) == "stock"
+    assert shard_of(CRYPTO) == "crypto"
+    assert shard_of_id("stock:ASELS.IS") == "stock"
+    assert shard_of_id("crypto:bitcoin:2024-03-01") == "crypto"
+    assert group_by_shard([STOCK, CRYPTO, STOCK]) == {"stock": [STOCK, STOCK], "crypto": [CRYPTO]}
+
+
+def test_named_symbols_route_to_their_markets():
+    table = MetricsTable([STOCK, CRYPTO])
+
+    assert route_shards("ASELS son fiyatı?", table, NAMES) == ["stock"]
+    assert route_shards("bitcoin son fiyatı?", table, NAMES) == ["crypto"]
+    assert route_shards("ASELS ve bitcoin karşılaştır", table, NAMES) == NAMES
+
+
+def test_asset_type_words_route_without_symbols():
+    table = MetricsTable([STOCK, CRYPTO])
+
+    assert route_shards("en çok yükselen hisse hangisi?", table, NAMES) == ["stock"]
+    assert route_shards("en çok düşen kripto hangisi?", table, NAMES) == ["crypto"]
+    assert route_shards("piyasa nasıl?", table, NAMES) == NAMES
+
+
+def test_missing_market_falls_back_to_all_shards():
+    assert route_shards("en çok yükselen hisse hangisi?", None, ["crypto"]) == ["crypto"]
+    assert route_shards("en çok yükselen hisse hangisi?", None, ["crypto", "all"]) == ["crypto", "all"]
+    assert route_shards(None, None, NAMES) == NAMES
@@ -0,0 +1,71 @@
+"""
+Index Store testleri - versiyonlu kayıt, LATEST işaretçisi ve tazelik kontrolü
+"""
+import os
+import sys
+
+from langchain_community.vectorstores import FAISS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_store import IndexStore, LATEST_FILE  # noqa: E402
+from providers import HashEmbeddings  # noqa: E402
+
+MODEL = "hash-test"
+
+
+# Build a small FAISS store over the given texts
+def make_vector_store(texts):
+    return FAISS.from_texts(texts, HashEmbeddings(), ids=[f"stock:{text}" for text in texts])
+
+
+def test_save_creates_versions_and_moves_latest(tmp_path):
+    store = IndexStore(str(tmp_path), keep_versions=5, mmap=False)
+    assert store.latest_version() is None
+
+    first = store.save(make_vector_store(["ASELS"]), MODEL, "key-1")
+    second = store.save(make_vector_store(["ASELS", "THYAO"]), MODEL, "key-2")
+
+    assert (first, second) == ("v000001", "v000002")
+    assert store.latest_version() == second
+    assert (tmp_path / LATEST_FILE).read_text() == second
+    manifest = store.latest_manifest()
+    assert manifest["version"] == second and manifest["document_count"] == 2
+
+
+def test_old_versions_are_pruned(tmp_path):
+    store = IndexStore(str(tmp_path), keep_versions=2, mmap=False)
+    for count in range(1, 5):
+        store.save(make_vector_store([f"T{i}" for i in range(count)]), MODEL)
+
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.startswith("v")) == ["v000003", "v000004"]
+    assert store.latest_version() == "v000004"
+
+
+def test_load_requires_matching_model_and_data_key(tmp_path):
+    store = IndexStore(str(tmp_path), mmap=False)
+    store.save(make_vector_store(["ASELS", "THYAO"]), MODEL, "key")
+
+    assert store.load(HashEmbeddings(), "other-model", "key") is None
+    assert store.load(HashEmbeddings(), MODEL, "other-key") is None
+    assert store.load(HashEmbeddings(), MODEL, "key", max_age=-1) is None
+
+    loaded = store.load(HashEmbeddings(), MODEL, "key")
+    assert sorted(loaded.docstore._dict) == ["stock:ASELS", "stock:THYAO"]
+
+
+def test_latest_pointing_to_missing_version_is_ignored(tmp_path):
+    store = IndexStore(str(tmp_path), mmap=False)
+    (tmp_path / LATEST_FILE).write_text("v000009")
+    assert store.latest_version() is None
+    assert store.latest_manifest() is None
+
+
+def test_shards_keep_separate_versions(tmp_path):
+    root = IndexStore(str(tmp_path), mmap=False)
+    root.shard("stock").save(make_vector_store(["ASELS"]), MODEL)
+    root.shard("stock").save(make_vector_store(["THYAO"]), MODEL)
+    root.shard("crypto").save(make_vector_store(["bitcoin"]), MODEL)
+
+    assert root.shard("stock").latest_version() == "v000002"
+    assert root.shard("crypto").latest_version() == "v000001"
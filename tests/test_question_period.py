@@ -0,0 +1,43 @@
+"""
+Soru tarih aralığı testleri - açık tarih, Türkçe ay adı ve göreli dönemler
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hierarchical_index import parse_question_period  # noqa: E402
+
+# a Friday
+TODAY = pd.Timestamp("2026-10-16")
+
+
+def days(start: str, end: str):
+    return pd.Timestamp(start), pd.Timestamp(end)
+
+
+def test_explicit_dates():
+    assert parse_question_period("ASELS 2024-03-05 kapanışı?", TODAY) == days("2024-03-05", "2024-03-05")
+    assert parse_question_period("ASELS 05.03.2024 kapanışı?", TODAY) == days("2024-03-05", "2024-03-05")
+    assert parse_question_period("ASELS 5 Mart 2024 kapanışı?", TODAY) == days("2024-03-05", "2024-03-05")
+
+
+def test_turkish_month_names():
+    assert parse_question_period("THYAO Mart 2024'te ne kadar yükseldi?", TODAY) == days("2024-03-01", "2024-03-31")
+    assert parse_question_period("Şubat 2024 bitcoin performansı", TODAY) == days("2024-02-01", "2024-02-29")
+    assert parse_question_period("ARALIK 2023 özeti", TODAY) == days("2023-12-01", "2023-12-31")
+
+
+def test_relative_periods():
+    assert parse_question_period("Geçen hafta ASELS nasıldı?", TODAY) == days("2026-10-05", "2026-10-11")
+    assert parse_question_period("Son 3 ayda en çok düşen hisse?", TODAY) == days("2026-07-16", "2026-10-16")
+    assert parse_question_period("son bir hafta bitcoin", TODAY) == days("2026-10-09", "2026-10-16")
+    assert parse_question_period("geçen ay ethereum", TODAY) == days("2026-09-01", "2026-09-30")
+    assert parse_question_period("bu yıl THYAO", TODAY) == days("2026-01-01", "2026-10-16")
+    assert parse_question_period("dün BIST nasıl kapandı?", TODAY) == days("2026-10-15", "2026-10-15")
+
+
+def test_no_period():
+    assert parse_question_period("ASELS hissesinin son durumu nasıl?", TODAY) is None
@@ -0,0 +1,141 @@
+"""
+Rate Limiter testleri - 429 tespiti, Retry-After ve üstel geri çekilme
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucket, RequestScheduler, is_rate_limit_error  # noqa: E402
+
+
+class FakeResponse:
+    """Durum kodu ve başlık taşıyan HTTP cevabı"""
+
+    # Initialize with status code and headers
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    """requests.HTTPError gibi cevabı taşıyan hata"""
+
+    # Initialize with the response
+    def __init__(self, response: FakeResponse):
+        super().__init__(f"{response.status_code} error")
+        self.response = response
+
+
+class FakeClock:
+    """Uyuyunca ilerleyen sahte saat"""
+
+    # Start at zero with no sleeps
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    # Get the current time
+    def __call__(self) -> float:
+        return self.now
+
+    # Advance the time instead of sleeping
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+# Build a scheduler on a fake clock with a generous bucket
+def make_scheduler(clock: FakeClock, **kwargs) -> RequestScheduler:
+    bucket = TokenBucket(600, burst=5, clock=clock, sleep=clock.sleep)
+    return RequestScheduler(bucket, **kwargs)
+
+
+# Build a callable that raises the given errors in turn, then returns "ok"
+def failing(*errors):
+    remaining = list(errors)
+
+    def call():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return call
+
+
+def test_rate_limit_detected_from_status_only():
+    assert is_rate_limit_error(FakeHTTPError(FakeResponse(429)))
+    assert not is_rate_limit_error(FakeHTTPError(FakeResponse(500)))
+    # a message mentioning 429 is not a rate limit
+    assert not is_rate_limit_error(ValueError("order 429 not found"))
+
+
+def test_rate_limit_detected_through_exception_chain():
+    # pycoingecko re-raises the HTTPError as a ValueError of the response body
+    try:
+        try:
+            raise FakeHTTPError(FakeResponse(429))
+        except FakeHTTPError as e:
+            raise ValueError("{'status': 'rate limited'}") from e
+    except ValueError as chained:
+        assert is_rate_limit_error(chained)
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_retry_after_header_is_honoured():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_retries=3)
+    result = scheduler.call(failing(FakeHTTPError(FakeResponse(429, {"Retry-After": "7"}))))
+
+    assert result == "ok"
+    # the whole bucket is drained, so the retry waits the server's delay
+    assert clock.now == pytest.approx(7.0)
+    assert scheduler.get_stats()["rate_limited"] == 1
+
+
+def test_exponential_backoff_until_retries_run_out():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_retries=2, backoff_base=1.0, backoff_max=60.0)
+    errors = [FakeHTTPError(FakeResponse(429)) for _ in range(3)]
+
+    with pytest.raises(FakeHTTPError):
+        scheduler.call(failing(*errors))
+
+    stats = scheduler.get_stats()
+    assert stats["requests"] == 3 and stats["retries"] == 2 and stats["failures"] == 1
+    # 1s then 2s base delays, each with up to 50% jitter
+    assert 3.0 <= clock.now <= 4.5 + 1e-9
+
+
+def test_other_errors_are_not_retried():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    with pytest.raises(FakeHTTPError):
+        scheduler.call(failing(FakeHTTPError(FakeResponse(500))))
+    assert scheduler.get_stats()["requests"] == 1
+    assert clock.sleeps == []
+
+
+def test_map_keeps_input_order_and_isolates_errors():
+    scheduler = make_scheduler(FakeClock(), max_in_flight=3)
+
+    def fetch(item):
+        if item == "bad":
+            raise ValueError("boom")
+        return item.upper()
+
+    results = scheduler.map(fetch, ["a", "bad", "c"])
+    assert [(item, result) for item, result, _ in results] == [("a", "A"), ("bad", None), ("c", "C")]
+    assert isinstance(results[1][2], ValueError)
@@ -0,0 +1,106 @@
+"""
+Single Flight testleri - aynı anahtarlı eşzamanlı isteklerin tek işte birleşmesi
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "key", work) for _ in range(4)]
+        while flights.get_stats()["shared"] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result == "answer" for result, _ in results)
+    assert flights.get_stats()["in_flight"] == 0
+
+
+def test_leader_error_reaches_followers_and_next_call_starts_fresh():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", fail)
+        started.wait(5)
+        follower = executor.submit(flights.do, "key", lambda: "unused")
+        while flights.get_stats()["shared"] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert flights.do("key", lambda: "fresh") == ("fresh", False)
+
+
+def test_cancelled_async_leader_does_not_fail_followers():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.ado("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.ado("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == ("answer", True)
+
+
+def test_late_stream_subscriber_gets_replayed_events():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def events():
+        yield {"event": "token", "data": "a"}
+        release.wait(5)
+        yield {"event": "token", "data": "b"}
+        yield {"event": "done", "data": "ab"}
+
+    def result_events(result):
+        yield {"event": "done", "data": result}
+
+    def result_of(event):
+        return event["data"] if event["event"] == "done" else None
+
+    first, shared = flights.stream("key", events, result_events, result_of)
+    assert not shared
+    assert next(first) == {"event": "token", "data": "a"}
+
+    second, shared = flights.stream("key", events, result_events, result_of)
+    assert shared
+    release.set()
+    assert [event["data"] for event in second] == ["a", "b", "ab"]
+    assert [event["data"] for event in first] == ["b", "ab"]
@@ -0,0 +1,30 @@
+"""
+Time Series Store testleri - zaman damgası çözünürlüğü ve artımlı birleştirme
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeseries_store import TimeSeriesStore  # noqa: E402
+
+
+# Build a daily close frame on an index of the given resolution
+def closes(start: str, values, unit: str) -> pd.DataFrame:
+    index = pd.date_range(start, periods=len(values), freq="D").as_unit(unit)
+    return pd.DataFrame({"Close": values}, index=index)
+
+
+def test_bars_keep_their_dates_whatever_the_index_resolution(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.append("ASELS.IS", closes("2024-03-01", [1.0, 2.0], "us"))
+    store.append("ASELS.IS", closes("2024-03-02", [2.5, 3.0], "s"))
+
+    frame = store.read("ASELS.IS")
+    assert frame.index.strftime("%Y-%m-%d").tolist() == ["2024-03-01", "2024-03-02", "2024-03-03"]
+    # the newer bar replaces the stored one
+    assert frame["close"].tolist() == [1.0, 2.5, 3.0]
+    assert store.last_timestamp("ASELS.IS") == pd.Timestamp("2024-03-03")
+    assert store.read("ASELS.IS", days=1).index.strftime("%Y-%m-%d").tolist() == ["2024-03-02", "2024-03-03"]
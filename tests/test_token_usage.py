@@ -0,0 +1,50 @@
+"""
+Token kullanımı testleri - stream edilen cevapların usage chunk'ı sayaca yansır
+"""
+import os
+import sys
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import LLM_TOKENS  # noqa: E402
+from providers import StubChatModel  # noqa: E402
+from rag_system import FinanceRAG  # noqa: E402
+
+
+class UsageStubChatModel(StubChatModel):
+    """Stream sonunda OpenAI (stream_usage=True) gibi usage chunk'ı gönderen sahte model"""
+
+    # Stream the stub answer, then an empty chunk carrying the token usage
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        yield from super()._stream(messages, stop, run_manager, **kwargs)
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+        ))
+
+
+# Read the counter value of one token kind
+def tokens(kind: str) -> float:
+    return LLM_TOKENS._values.get((("kind", kind),), 0)
+
+
+def test_streamed_answer_records_token_usage():
+    rag = FinanceRAG(embedding_provider="hash", llm_provider="stub")
+    rag.load_documents([Document(page_content="ASELS.IS Hisse Senedi Analizi: son fiyat 60 TL",
+                                 metadata={"ticker": "ASELS.IS", "type": "stock", "latest_price": 60.0,
+                                           "price_change_pct": 1.0, "volatility": 4.0})])
+    rag.build_vector_store()
+    rag.build_qa_chain()
+    rag._llm = UsageStubChatModel()
+
+    input_before, output_before = tokens("input"), tokens("output")
+    events = list(rag.stream_question("ASELS son fiyatı nedir?"))
+
+    assert events[-1]["event"] == "done"
+    assert tokens("input") - input_before == 120
+    assert tokens("output") - output_before == 30
@@ -0,0 +1,130 @@
+"""
+Time Series Store - Sembol Başına Memory-Mapped NumPy OHLCV Deposu
+Ham fiyat serileri saklanır, yenilemede sadece yeni barlar çekilir
+"""
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import TIMESERIES_DIR
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["open", "high", "low", "close", "volume"]
+RECORD_DTYPE = np.dtype([("timestamp", "<i8")] + [(column, "<f8") for column in COLUMNS])
+
+# yfinance period strings -> lookback in days (None means all stored history)
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 182,
+    "1y": 365, "2y": 730, "5y": 1826, "10y": 3652, "ytd": None, "max": None
+}
+
+
+# Convert a yfinance period string to a lookback in days
+def period_to_days(period: str) -> Optional[int]:
+    return PERIOD_DAYS.get(period)
+
+
+# Get the shortest yfinance period covering a lookback in days
+def days_to_period(days: int) -> str:
+    return next((period for period, period_days in PERIOD_DAYS.items()
+                 if period_days is not None and period_days >= days), "max")
+
+
+# Normalize a frame to naive timestamps and lowercase OHLCV columns
+def normalize_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.rename(columns=str.lower)
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        # keep exchange wall-clock time so daily bars keep their trading date
+        index = index.tz_localize(None)
+    # records store nanoseconds; pandas may hand out second/microsecond resolution indexes
+    index = index.as_unit("ns")
+
+    normalized = pd.DataFrame(index=index)
+    for column in COLUMNS:
+        normalized[column] = frame[column].to_numpy(dtype=float) if column in frame else np.nan
+    return normalized
+
+
+class TimeSeriesStore:
+    """Her sembol için tek bir yapılandırılmış .npy dosyası (mmap ile okunur)"""
+
+    # Initialize store rooted at the given directory
+    def __init__(self, root: str = TIMESERIES_DIR):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # Get the file path of a symbol
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9._-]", "_", symbol) + ".npy")
+
+    # Get the write lock of a symbol
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    # Memory-map the raw records of a symbol (empty array if none)
+    def _records(self, symbol: str) -> np.ndarray:
+        try:
+            return np.load(self._path(symbol), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+    # Get the timestamp of the first stored bar
+    def first_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        records = self._records(symbol)
+        return pd.Timestamp(int(records["timestamp"][0])) if len(records) else None
+
+    # Get the timestamp of the last stored bar
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        records = self._records(symbol)
+        return pd.Timestamp(int(records["timestamp"][-1])) if len(records) else None
+
+    # Read stored bars, optionally only the last `days` days
+    def read(self, symbol: str, days: Optional[int] = None) -> pd.DataFrame:
+        records = self._records(symbol)
+        if len(records) and days is not None:
+            cutoff = records["timestamp"][-1] - int(timedelta(days=days).total_seconds() * 1e9)
+            records = records[np.searchsorted(records["timestamp"], cutoff, side="left"):]
+
+        frame = pd.DataFrame({column: np.array(records[column]) for column in COLUMNS},
+                             index=pd.DatetimeIndex(np.array(records["timestamp"]).astype("datetime64[ns]")))
+        return frame
+
+    # Merge new bars into the stored series (new values win) and return the stored length
+    def append(self, symbol: str, frame: pd.DataFrame) -> int:
+        if frame is None or frame.empty:
+            return len(self._records(symbol))
+
+        frame = normalize_frame(frame)
+        incoming = np.empty(len(frame), dtype=RECORD_DTYPE)
+        incoming["timestamp"] = frame.index.asi8
+        for column in COLUMNS:
+            incoming[column] = frame[column].to_numpy()
+
+        with self._lock(symbol):
+            existing = np.array(self._records(symbol))
+            merged = np.concatenate([existing, incoming]) if len(existing) else incoming
+
+            # stable sort keeps later (incoming) rows last among equal timestamps
+            merged = merged[np.argsort(merged["timestamp"], kind="stable")]
+            keep = np.append(merged["timestamp"][1:] != merged["timestamp"][:-1], True)
+            merged = merged[keep]
+
+            # write to a temp file and rename so readers never see a partial file
+            tmp_path = f"{self._path(symbol)}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, merged)
+            os.replace(tmp_path, self._path(symbol))
+
+        return len(merged)
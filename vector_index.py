@@ -0,0 +1,109 @@
+"""
+Vector Index - Yapılandırılabilir FAISS Index Tipleri
+Flat, IVF (nprobe) ve HNSW (efSearch) index'leri, isteğe bağlı PQ sıkıştırması ile
+"""
+import logging
+from typing import List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from config import (FAISS_INDEX_TYPE, FAISS_MIN_ANN_VECTORS, FAISS_IVF_NLIST, FAISS_IVF_NPROBE,
+                    FAISS_HNSW_M, FAISS_HNSW_EF_CONSTRUCTION, FAISS_HNSW_EF_SEARCH,
+                    FAISS_PQ_M, FAISS_PQ_NBITS, FAISS_TRAIN_SAMPLE)
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+
+# Get the IVF list count for a corpus size (4 * sqrt(n) unless configured)
+def ivf_nlist(n: int, nlist: int = FAISS_IVF_NLIST) -> int:
+    return max(1, min(nlist or int(4 * np.sqrt(n)), n))
+
+
+# Build and fill a FAISS index of the given type; small corpora fall back to flat
+def build_index(vectors: np.ndarray, index_type: str = FAISS_INDEX_TYPE, pq_m: int = FAISS_PQ_M,
+                min_vectors: int = FAISS_MIN_ANN_VECTORS, seed: int = 0) -> faiss.Index:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Bilinmeyen FAISS index tipi: {index_type}")
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+
+    if index_type != "flat" and n < min_vectors:
+        # exact search is both faster and exact at this size
+        logger.info(f"{n} vektör için {index_type} yerine flat index kullanılıyor (eşik: {min_vectors})")
+        index_type, pq_m = "flat", 0
+
+    if pq_m and dim % pq_m:
+        logger.warning(f"PQ devre dışı: boyut ({dim}) alt vektör sayısına ({pq_m}) bölünmüyor")
+        pq_m = 0
+
+    if index_type == "ivf":
+        quantizer = faiss.IndexFlatL2(dim)
+        nlist = ivf_nlist(n)
+        index = (faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, FAISS_PQ_NBITS) if pq_m
+                 else faiss.IndexIVFFlat(quantizer, dim, nlist))
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWPQ(dim, pq_m, FAISS_HNSW_M) if pq_m else faiss.IndexHNSWFlat(dim, FAISS_HNSW_M)
+        index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+    else:
+        index = faiss.IndexPQ(dim, pq_m, FAISS_PQ_NBITS) if pq_m else faiss.IndexFlatL2(dim)
+
+    if not index.is_trained:
+        sample = vectors
+        if n > FAISS_TRAIN_SAMPLE:
+            sample = vectors[np.random.default_rng(seed).choice(n, FAISS_TRAIN_SAMPLE, replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    configure_index(index)
+    return index
+
+
+# Apply the configured search-time parameters (nprobe, efSearch)
+def configure_index(index: faiss.Index, nprobe: int = FAISS_IVF_NPROBE,
+                    ef_search: int = FAISS_HNSW_EF_SEARCH) -> faiss.Index:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+
+    concrete = faiss.downcast_index(index)
+    if hasattr(concrete, "hnsw"):
+        concrete.hnsw.efSearch = ef_search
+    return index
+
+
+# Check whether vectors can be removed in place the way LangChain's FAISS.delete expects
+# Only flat-code indexes compact their ids (0..n-1) on removal; IVF keeps the original ids, so later
+# adds would collide with survivors, and HNSW graphs can't remove at all - both are rebuilt instead
+def supports_removal(index: faiss.Index) -> bool:
+    return isinstance(faiss.downcast_index(index), (faiss.IndexFlat, faiss.IndexPQ))
+
+
+# Get a short description of an index ("IndexIVFFlat, 12000 vectors")
+def describe_index(index: faiss.Index) -> str:
+    return f"{type(faiss.downcast_index(index)).__name__}, {index.ntotal} vektör"
+
+
+# Embed documents and build a LangChain FAISS store on the configured index type
+def create_vector_store(documents: List, ids: List[str], embeddings,
+                        index_type: Optional[str] = None) -> FAISS:
+    texts = [doc.page_content for doc in documents]
+    # timed here as well: with the embedding cache off, backend calls aren't timed anywhere else
+    with timed("index_embed", level="summary"):
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    with timed("index_build"):
+        index = build_index(vectors, index_type or FAISS_INDEX_TYPE)
+
+    # the index is already filled; only the docstore mapping is added here
+    vector_store = FAISS(embedding_function=embeddings, index=index,
+                         docstore=InMemoryDocstore(dict(zip(ids, documents))),
+                         index_to_docstore_id=dict(enumerate(ids)))
+
+    logger.info(f"FAISS index oluşturuldu ({describe_index(index)})")
+    return vector_store
@@ -0,0 +1,37 @@
+"""
+WSGI Entry Point - Çok Worker'lı Production Sunucu Giriş Noktası
+Index master süreçte bir kez hazırlanır, worker'lar fork sonrası onu copy-on-write paylaşır (yeniden yüklemede flat index'ler her worker'a kopyalanır, FAISS mmap yalnızca IVF'de çalışır)
+
+Kullanım:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+import logging
+import os
+
+from app import app, web_app
+from background_refresher import LeaderLock
+from config import INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+
+# Build (or warm-load) the index once, before workers are forked
+def preload() -> None:
+    # refresh threads must not run in the master; workers elect a leader instead
+    web_app.background_refresh = False
+    if not web_app.initialize_rag_service():
+        raise RuntimeError(f"RAG servisi başlatılamadı: {web_app.init_job.error}")
+
+    # serve the saved versions; IVF indexes are memory-mapped (shared page cache), flat ones are read
+    # into memory here and shared copy-on-write with the forked workers
+    web_app.rag_service.reload_index(force=True)
+    logger.info(f"Index worker'lar için hazır (pid={os.getpid()})")
+
+
+# Start per-worker services (called from gunicorn's post_fork hook)
+def post_fork() -> None:
+    web_app.rag_service.start_worker_services(LeaderLock(os.path.join(INDEX_DIR, "refresh.lock")))
+
+
+preload()
+application = app